@@ -11,7 +11,7 @@ import uvicorn
 from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydub import AudioSegment
 from sse_starlette import EventSourceResponse
 from starlette.concurrency import iterate_in_threadpool
@@ -23,6 +23,7 @@ import extensions.openai.models as OAImodels
 from extensions.openai.errors import ServiceUnavailableError
 from extensions.openai.tokens import token_count, token_decode, token_encode
 from extensions.openai.utils import _start_cloudflared
+from modules import extensions as extensions_module
 from modules import shared
 from modules.logging_colors import logger
 from modules.models import unload_model
@@ -277,6 +278,38 @@ async def handle_health_check():
     return JSONResponse(content={"status": "ok"})
 
 
+@app.get("/v1/internal/ready", dependencies=check_key)
+async def handle_readiness_check():
+    '''
+    Returns 503 until every loaded extension exposing is_ready() reports True
+    (e.g. orion_ltm while its embedder and indexes are still warming up).
+    '''
+    pending = []
+    for extension, name in extensions_module.iterator():
+        check = getattr(extension, "is_ready", None)
+        if callable(check) and not check():
+            pending.append(name)
+
+    if pending:
+        return JSONResponse(status_code=503, content={"status": "warming", "pending": pending})
+
+    return JSONResponse(content={"status": "ready"})
+
+
+@app.get("/metrics", dependencies=check_key)
+async def handle_metrics():
+    '''
+    Prometheus text exposition of the in-process histograms (orion_ltm
+    per-stage LTM timings, embedding scheduler).
+    '''
+    try:
+        from orion_cli.utils.metrics import render_prometheus
+    except ImportError:
+        return PlainTextResponse("")
+
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/v1/internal/encode", response_model=EncodeResponse, dependencies=check_key)
 async def handle_token_encode(request_data: EncodeRequest):
     response = token_encode(request_data.text)
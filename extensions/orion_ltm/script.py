@@ -1,138 +1,244 @@
 # C:\Orion\text-generation-webui\extensions\orion_ltm\script.py
 
-from pathlib import Path
-import yaml
 from uuid import uuid4
-from orion_cli.utils.embedding import embed
 from modules import chat
 from modules.logging_colors import logger
+from orion_cli.utils.metrics import timed, turn
 
 pooled_buffer = []
 
+# 🛰️ Thin-client mode: if an LTM service is running, don't load our own embedder/Chroma
 try:
-    from orion_cli.orion_ltm_integration import (
-        initialize_chromadb_for_ltm,
-        get_relevant_ltm,
-        on_user_turn,
-        on_assistant_turn,
-    )
+    from orion_cli.utils.ltm_client import get_service_client
+    _service = get_service_client()
 except Exception as e:
-    initialize_chromadb_for_ltm = get_relevant_ltm = None
-    def on_user_turn(*a, **k): pass
-    def on_assistant_turn(*a, **k): pass
-    logger.warning(f"[orion_ltm] LTM back-end not available yet: {e}")
+    _service = None
+    logger.warning(f"[orion_ltm] LTM service client unavailable: {e}")
+
+if _service is not None:
+    initialize_chromadb_for_ltm = None
+
+    def get_relevant_ltm(query, *a, mood=None, **k):
+        return _service.retrieve(query, mood=mood)
+
+    def on_user_turn(text, *a, conversation_id=None, **k):
+        _service.user_turn(text, conversation_id=conversation_id)
+
+    def on_assistant_turn(text, *a, last_user_input=None, conversation_id=None, **k):
+        _service.assistant_turn(text, last_user_input=last_user_input, conversation_id=conversation_id)
+
+    logger.info(f"[orion_ltm] Using LTM service at {_service.url}")
+else:
+    try:
+        from orion_cli.orion_ltm_integration import (
+            initialize_chromadb_for_ltm,
+            get_relevant_ltm,
+            on_user_turn,
+            on_assistant_turn,
+        )
+    except Exception as e:
+        initialize_chromadb_for_ltm = get_relevant_ltm = None
+        def on_user_turn(*a, **k): pass
+        def on_assistant_turn(*a, **k): pass
+        logger.warning(f"[orion_ltm] LTM back-end not available yet: {e}")
 
 _EMBED_READY = False
 _persona = _episodic = None
+_sentences = None  # sentence-span collection (ltm.sentences.enabled)
+_log_watcher = None  # stop Event when history files are tail-followed instead of per-turn writes
 
 def load_ltm_config():
-    config_path = Path(__file__).resolve().parent / "orion_cli" / "data" / "ltm_config.yaml"
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
-            return cfg.get("ltm", {})
+        from orion_cli.utils.ltm_utils import load_ltm_config as _load
+        return _load()
     except Exception as e:
         print(f"[LTM] Failed to load config: {e}")
         return {}
         
-def estimate_tone_and_tags(text: str) -> dict:
-    # You can replace this with GPT or sentiment model later
-    tone = "neutral"
-    tags = ["memory", "pooled"]
-    if any(word in text.lower() for word in ["regret", "sad", "lonely"]):
-        tone = "somber"
-    elif any(word in text.lower() for word in ["courage", "fight", "will"]):
-        tone = "defiant"
-    elif any(word in text.lower() for word in ["beauty", "soul", "stars"]):
-        tone = "poetic"
-    return {
-        "tone": tone,
-        "tags": ",".join(tags),
-        "importance": 0.7,
-    }
-    
+def _tokenize(text: str):
+    from modules import shared
+    from modules.text_generation import encode
+    if shared.tokenizer is None:
+        return None
+    return [int(t) for t in encode(text, add_special_tokens=False, add_bos_token=False)[0]]
+
+def _tokenizer_key():
+    from modules import shared
+    return shared.model_name
+
 def setup():
     """Initialize ChromaDB collections for persona and episodic memory."""
-    global _EMBED_READY, _persona, _episodic
+    global _EMBED_READY, _persona, _episodic, _sentences, _log_watcher
+    if _service is not None:
+        # Collections live in the service; the hooks above only need non-None handles
+        _persona = _episodic = _service.url
+        _EMBED_READY = True
+        logger.info("[orion_ltm] ✅ setup() completed via LTM service.")
+        return
     try:
         from orion_cli.utils.embedding import EMBED_FN
         _, collections = initialize_chromadb_for_ltm(EMBED_FN)
         _persona = collections["persona"]
         _episodic = collections["episodic"]
+        _sentences = collections.get("sentences")
         _EMBED_READY = True
         logger.info("[orion_ltm] ✅ setup() completed: episodic and persona initialized.")
+
+        # 📓 Replay memory writes a previous run journaled but never applied
+        from orion_cli.utils.write_journal import start_write_journal
+        start_write_journal(collections)
+
+        # 🧬 Seed the dedup index from stored memory if it is empty or behind (background)
+        from orion_cli.utils.dedup_index import seed_dedup_index
+        seed_dedup_index(_episodic)
+
+        # 📌 Let the pinned persona block cache its token IDs for the loaded model
+        from orion_cli.utils.pinned_persona import set_tokenizer
+        set_tokenizer(_tokenize, _tokenizer_key)
+
+        # 🔥 Load embedder kernels + HNSW indexes off the request path
+        from orion_cli.utils.warmup import is_ready as _warm, start_warmup
+        if not _warm():
+            start_warmup(EMBED_FN, collections)
+
+        # 👀 Ingest from the saved histories instead of on the request path
+        watch_cfg = load_ltm_config().get("log_watcher") or {}
+        if watch_cfg.get("enabled") and _log_watcher is None:
+            from orion_cli.core.log_watcher import start_log_watcher
+            _log_watcher = start_log_watcher(_episodic, watch_cfg, sentence_coll=_sentences)
     except Exception as e:
         logger.error(f"[orion_ltm] ❌ setup() failed: {e}")
 
+
+def is_ready() -> bool:
+    """Readiness for health checks: collections initialized and warm-up finished."""
+    if _service is not None:
+        return _service.ready()
+    if not _EMBED_READY:
+        return False
+    from orion_cli.utils.warmup import is_ready as _warm
+    return _warm()
+
+def _conversation_id(state) -> str | None:
+    """Same '<character>/<unique_id>' (or 'instruct/<unique_id>') key the log scanner uses."""
+    unique_id = (state or {}).get("unique_id")
+    if not unique_id:
+        return None
+    folder = "instruct" if state.get("mode") == "instruct" else state.get("character_menu")
+    return f"{folder}/{unique_id}"
+
+def _mood(state):
+    """(valence, arousal) target from state['orion_valence'/'orion_arousal'], if both are set."""
+    try:
+        return float(state["orion_valence"]), float(state["orion_arousal"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+_last_stable = None  # (memory_text, dbg) of the pinned block, reused when nothing is retrieved
+
 def _inject_ltm_into_state_sys_prompt(state, text=None):
+    """Retrieve LTM for `text` and lay it out per ltm.injection.mode. Returns (state, text)."""
+    global _last_stable
     if not (_EMBED_READY and get_relevant_ltm and _persona and _episodic and isinstance(state, dict)):
-        return state
+        return state, text
 
-    query = (state.get("context") or "").strip()
-    if not query:
-        return state
+    from orion_cli.utils.ltm_injection import DEFAULT_MODE, apply_layout, split_context
+    mode = (load_ltm_config().get("injection") or {}).get("mode", DEFAULT_MODE)
 
-    # Store the original user turn into episodic memory
-    try:
-        on_user_turn(query, _episodic)
-    except Exception:
-        logger.debug("[orion_ltm] Failed to store user turn to episodic memory")
+    query = (text or "").strip()
+    if not query:
+        # Continue/impersonate: keep the system message as it was last turn
+        if mode == "prefix_cache" and _last_stable:
+            state, text = apply_layout(state, text, *_last_stable, mode=mode)
+        return state, text
+
+    # Store the original user turn into episodic memory (the log watcher does it otherwise)
+    if _log_watcher is None:
+        try:
+            with timed("hook_user_turn"):
+                on_user_turn(query, _episodic, conversation_id=_conversation_id(state))
+        except Exception:
+            logger.debug("[orion_ltm] Failed to store user turn to episodic memory")
 
     try:
-        memory_text, dbg = get_relevant_ltm(
-            query,
-            _persona,
-            _episodic,
-            topk_persona=int(state.get("orion_topk_persona", 5)),
-            topk_episodic=int(state.get("orion_topk_episodic", 10)),
-            return_debug=True,
-            importance_threshold=0.6,  # 🔧 STRONGER FILTERING
-        )
+        with timed("hook_retrieve"):
+            memory_text, dbg = get_relevant_ltm(
+                query,
+                _persona,
+                _episodic,
+                return_debug=True,
+                sentence_coll=_sentences,
+                mood=_mood(state),
+            )
     except Exception as e:
         logger.debug(f"[orion_ltm] get_relevant_ltm failed: {e}")
-        return state
-
-    if not memory_text:
-        return state
+        return state, text
 
-    # Inject structured LTM into prompt
-    sys_prompt = (state.get("system_prompt") or "").strip()
+    with timed("hook_inject"):
+        stable, _ = split_context(memory_text, dbg)
+        _last_stable = ("\n".join(stable), {"pinned_lines": len(stable)}) if stable else None
+        return apply_layout(state, text, memory_text, dbg, mode=mode)
 
-    structured_memory = []
-    if "persona_hits" in dbg and dbg["persona_hits"]:
-        structured_memory.append("### [PERSONA MEMORY]")
-        structured_memory.append("\n".join(f"- {line}" for line in memory_text.split("\n") if line.startswith("[PERSONA]")))
 
-    if "episodic_hits" in dbg and dbg["episodic_hits"]:
-        structured_memory.append("### [EPISODIC MEMORY]")
-        structured_memory.append("\n".join(f"- {line}" for line in memory_text.split("\n") if line.startswith("[EPISODIC]")))
+def _log_turn(t):
+    """Per-turn LTM timing breakdown in the verbose log."""
+    from modules import shared
+    if shared.args.verbose:
+        logger.info(f"[orion_ltm] ⏱️ {t.summary()}")
 
-    if structured_memory:
-        sys_prompt = f"{sys_prompt}\n\n[LTM CONTEXT]\n" + "\n".join(structured_memory).strip()
-
-    state["system_prompt"] = sys_prompt
-    return state
-
-def _inject_ltm_into_state_sys_prompt(state, text=None):
-    # No-op fallback if not using special LTM injections
-    return state
 
+_last_user_text = {}  # conversation id -> the user message the next reply answers
 
 def custom_generate_chat_prompt(user_input, state, **kwargs):
-    """Official TGWUI hook: adjust state/system_prompt then delegate."""
+    """Official TGWUI hook: adjust state/system prompt (and user input) then delegate."""
     text = user_input if isinstance(user_input, str) else (getattr(user_input, "text", "") or "")
     state = dict(state or {})
-    state = _inject_ltm_into_state_sys_prompt(state, text)
-    return chat.generate_chat_prompt(user_input, state, **kwargs)
+    with turn("prompt", conversation_id=_conversation_id(state)) as t:
+        if kwargs.get("_continue") or kwargs.get("impersonate"):
+            state, _ = _inject_ltm_into_state_sys_prompt(state, "")
+            text = user_input
+        else:
+            _last_user_text[_conversation_id(state)] = text.strip()
+            state, text = _inject_ltm_into_state_sys_prompt(state, text)
+    _log_turn(t)
+    return chat.generate_chat_prompt(text, state, **kwargs)
+
+def _spill_writer():
+    """write(ids, documents, metadatas) into episodic memory, or None before setup()."""
+    if _service is not None:
+        return lambda ids, docs, metas: _service.add("episodic", ids, docs, metas)
+    if not (_EMBED_READY and _episodic):
+        return None
+    from orion_cli.utils.write_journal import write_memory
+    return lambda ids, docs, metas: write_memory(
+        _episodic, "add", ids=ids, documents=docs, metadatas=metas, tag=True
+    )
+
+def history_truncated(messages, state):
+    """Messages generate_chat_prompt dropped to fit the context: keep them in episodic memory."""
+    write = _spill_writer()
+    if write is None:
+        return
+    try:
+        from orion_cli.utils.history_spill import spill_evicted
+        with timed("hook_history_spill"):
+            spill_evicted(messages, write, conversation_id=_conversation_id(state))
+    except Exception as e:
+        logger.debug(f"[orion_ltm] History spill failed: {e}")
 
 def output_modifier(text, state):
     """Persist assistant replies as episodic memory (best-effort)."""
     try:
         reply = (text or "").strip()
-        query = (state.get("context") or "").strip()
-
-        if reply and len(reply.split()) >= 10:
-            on_assistant_turn(reply, _episodic, last_user_input=query)
+        query = _last_user_text.get(_conversation_id(state))
+
+        if reply and len(reply.split()) >= 10 and _log_watcher is None:
+            with turn("reply", conversation_id=_conversation_id(state)) as t:
+                with timed("hook_assistant_turn"):
+                    on_assistant_turn(
+                        reply, _episodic, last_user_input=query, conversation_id=_conversation_id(state)
+                    )
+            _log_turn(t)
     except Exception as e:
         print(f"[orion_ltm] output_modifier failed: {e}")
     return text
@@ -411,15 +411,16 @@ def generate_chat_prompt(user_input, state, **kwargs):
     if shared.tokenizer is not None:
         max_length = _tg().get_max_prompt_length(state)
         encoded_length = _tg().get_encoded_length(prompt)
+        evicted = []
         while len(messages) > 0 and encoded_length > max_length:
 
             # Remove old message, save system message
             if len(messages) > 2 and messages[0]["role"] == "system":
-                messages.pop(1)
+                evicted.append(messages.pop(1))
 
             # Remove old message when no system message is present
             elif len(messages) > 1 and messages[0]["role"] != "system":
-                messages.pop(0)
+                evicted.append(messages.pop(0))
 
             # Resort to truncating the user input
             else:
@@ -467,6 +468,10 @@ def generate_chat_prompt(user_input, state, **kwargs):
             prompt = make_prompt(messages)
             encoded_length = _tg().get_encoded_length(prompt)
 
+        # Let extensions keep what fell out of the context window (e.g. in long-term memory)
+        if evicted:
+            apply_extensions("history_truncated", evicted, state)
+
     if also_return_rows:
         return prompt, [message["content"] for message in messages]
     else:
@@ -155,6 +155,13 @@ def _apply_history_modifier_extensions(history):
     return history
 
 
+# Extensions notified of the history messages dropped by prompt truncation
+def _apply_history_truncated_extensions(messages, state):
+    for extension, _ in iterator():
+        if hasattr(extension, "history_truncated"):
+            getattr(extension, "history_truncated")(messages, state)
+
+
 # Extension functions that override the default tokenizer output - The order of execution is not defined
 def _apply_tokenizer_extensions(function_name, state, prompt, input_ids, input_embeds):
     for extension, _ in iterator():
@@ -247,6 +254,7 @@ EXTENSION_MAP = {
     "chat_input": _apply_chat_input_extensions,
     "state": _apply_state_modifier_extensions,
     "history": _apply_history_modifier_extensions,
+    "history_truncated": _apply_history_truncated_extensions,
     "bot_prefix": partial(_apply_string_extensions, "bot_prefix_modifier"),
     "tokenizer": partial(_apply_tokenizer_extensions, "tokenizer_modifier"),
     "logits_processor": partial(
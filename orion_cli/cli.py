@@ -5,24 +5,23 @@ import os
 # Ensure telemetry is off *before* any Chroma import
 os.environ["CHROMA_TELEMETRY_ENABLED"] = "false"
 
-import tqdm
+# ⚡ Keep this module light: chromadb, rich, tqdm, yaml and the embedder are
+# imported inside the subcommands that need them, so `orion --help` and the
+# dump/inspect commands never pay for loading e5-large-v2.
+# Regression check: `orion import-profile` (orion_cli/scripts/import_profile.py).
 import json
 import click
 from pathlib import Path
-from rich import print
-import chromadb
-from orion_cli.core.ltm import get_or_create_embed_fn
-from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
-from orion_cli.scripts.ltm_ingest import ingest_ltm_data
 from dotenv import load_dotenv
 
-import yaml
-import textwrap
+load_dotenv(dotenv_path=Path(__file__).parent / ".env")  # ✅ Load before OpenAI()
 
-from orion_cli.scripts.persona_ingest import persona_ingest as persona_ingest_cmd
-from orion_cli.scripts.ltm_ingest import ltm_ingest as ltm_ingest_cmd
 
-load_dotenv(dotenv_path=Path(__file__).parent / ".env")  # ✅ Load before OpenAI()
+def print(*args, **kwargs):
+    """rich.print, imported on first use."""
+    from rich import print as rich_print
+
+    rich_print(*args, **kwargs)
 
 
 @click.group()
@@ -31,10 +30,6 @@ def cli():
     pass
 
 
-cli.add_command(persona_ingest_cmd)
-cli.add_command(ltm_ingest_cmd)
-
-
 @cli.command()
 @click.option(
     "--ltm", required=True, type=click.Path(exists=True), help="Path to dialog JSONL"
@@ -47,6 +42,23 @@ def ltm_pooled_ingest(ltm, pool):
     pooled_ltm_ingest(ltm, pool_size=pool)
 
 
+def _enrichment_options(f):
+    """Shared concurrency / rate / cache options for enrich-chat and hyde-local."""
+    f = click.option(
+        "--cache-file",
+        default=None,
+        type=click.Path(),
+        help="Result cache (default: <output>.cache.jsonl). Re-runs resume from it.",
+    )(f)
+    f = click.option(
+        "--rate", default=2.0, type=float, help="Max requests per second (0 = unlimited)."
+    )(f)
+    f = click.option(
+        "--concurrency", default=4, type=int, help="Requests in flight at once."
+    )(f)
+    return f
+
+
 @cli.command("hyde-local")
 @click.option(
     "--input",
@@ -58,9 +70,11 @@ def ltm_pooled_ingest(ltm, pool):
     default="orion_cli/data/ingest_ready/normalized_enriched.jsonl",
     help="Path to save enriched.",
 )
-def hyde_local(input, output):
+@_enrichment_options
+def hyde_local(input, output, concurrency, rate, cache_file):
     """Locally enrich chat logs using Ollama + mistral-openorca."""
-    from orion_cli.scripts.hyde_enrich import rewrite_with_hyde
+    from orion_cli.scripts.hyde_enrich import PROMPT_VERSION, rewrite_with_hyde
+    from orion_cli.utils.enrich_runner import run_enrichment
 
     input_path = Path(input)
     output_path = Path(output)
@@ -72,21 +86,25 @@ def hyde_local(input, output):
     with open(input_path, "r", encoding="utf-8") as f:
         raw_lines = [json.loads(line) for line in f if line.strip()]
 
-    enriched = []
-    for entry in tqdm(raw_lines, desc="Enriching"):
-        u = entry.get("user", "")
-        a = entry.get("assistant", "")
-        if not u or not a:
-            continue
-        result = rewrite_with_hyde(u, a)
-        enriched.append(result)
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        for item in enriched:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
-
-    print(f"[✅] Saved {len(enriched)} enriched entries to {output_path}")
+    pairs = [
+        {"user": e.get("user", ""), "assistant": e.get("assistant", "")}
+        for e in raw_lines
+        if e.get("user") and e.get("assistant")
+    ]
+
+    stats = run_enrichment(
+        pairs,
+        rewrite_with_hyde,
+        output_path,
+        prompt_version=PROMPT_VERSION,
+        cache_path=cache_file,
+        concurrency=concurrency,
+        rate=rate,
+    )
+    print(
+        f"[✅] Saved {stats['cached'] + stats['enriched']} enriched entries to {output_path} "
+        f"({stats['cached']} from cache, {stats['failed']} failed)"
+    )
 
 
 @cli.command("persona-ingest")
@@ -96,129 +114,439 @@ def hyde_local(input, output):
 @click.option(
     "--replace", is_flag=True, help="Replace existing Chroma collection if it exists."
 )
-def persona_ingest(persona, dialogs, legacy_mock_json, replace):
-    """Ingest persona YAML and/or dialog examples into ChromaDB."""
-    from orion_cli.core.ltm import initialize_chromadb_for_ltm
+@click.option("--dry-run", is_flag=True, help="Show the fragment diff without writing.")
+def persona_ingest(persona, dialogs, legacy_mock_json, replace, dry_run):
+    """Ingest persona YAML and/or dialog examples into ChromaDB (only changed fragments)."""
+    import time
+    import yaml
+    from orion_cli.core.ltm import get_or_create_embed_fn, initialize_chromadb_for_ltm
+    from orion_cli.utils import persona_sync
 
     embed_fn = get_or_create_embed_fn()
     client, persona_coll, _ = initialize_chromadb_for_ltm(embed_fn=embed_fn)
 
-    if replace:
+    if replace and not dry_run:
         print(" 🔁 Replacing existing 'orion_persona_ltm' collection...")
-        client.delete_collection("orion_persona_ltm")
-        persona_coll = client.get_or_create_collection(
-            name="orion_persona_ltm", embedding_function=embed_fn
+        from orion_cli.utils.chroma_utils import delete_collection, hnsw_metadata, open_collection
+
+        delete_collection(client, "orion_persona_ltm")
+
+        persona_coll = open_collection(
+            client, "orion_persona_ltm", embed_fn, hnsw_metadata("orion_persona_ltm")
         )
 
-    docs = []
-    metas = []
-    ids = []
+    fragments = persona_sync.Fragments()
+    prefixes = []
 
     if persona:
         print(f" 👤 Loading persona from: {persona}")
         with open(persona, "r", encoding="utf-8") as f:
-            persona_data = yaml.safe_load(f)
-
-            # Flatten high-level keys
-            for k in ["name", "identity"]:
-                if k in persona_data.get("persona", {}):
-                    v = persona_data["persona"][k]
-                    docs.append(f"{k}: {v}")
-                    metas.append(
-                        {
-                            "tag": "persona",
-                            "kind": "persona",
-                            "topic": "identity",
-                            "priority": 10,
-                            "active": True,
-                        }
-                    )
-                    ids.append(f"persona::{k}")
-
-            # Catalog list
-            for i, entry in enumerate(persona_data["persona"].get("catalog", [])):
-                docs.append(entry["text"])
-                metas.append(
-                    {
-                        "tag": "persona",
-                        "kind": "persona",
-                        "topic": "identity",
-                        "tone": entry.get("tone", "neutral"),
-                        "weight": entry.get("weight", 1.0),
-                        "priority": 8,
-                        "active": True,
-                    }
-                )
-                ids.append(f"catalog::{i}")
-
-            # Emotions list
-            for i, emo in enumerate(persona_data["persona"].get("emotions", [])):
-                doc_text = emo.pop("text")
-
-                # Flatten list fields to strings
-                flat_emo = {
-                    k: ",".join(v) if isinstance(v, list) else v for k, v in emo.items()
-                }
-
-                metas.append({**flat_emo, "tag": "persona", "active": True})
-                docs.append(doc_text)
-                ids.append(f"emotion::{i}")
+            persona_sync.persona_fragments(yaml.safe_load(f), fragments)
+        prefixes += ["persona", "catalog", "emotion"]
 
     if dialogs:
         print(f" 💬 Including dialog examples: {dialogs}")
-        with open(dialogs, "r", encoding="utf-8") as f:
-            for i, line in enumerate(f):
-                entry = json.loads(line)
-                doc = entry.get("document")
-                if not doc:
-                    continue
-                meta = entry.get("metadata", {})
-                for mk, mv in meta.items():
-                    if isinstance(mv, list):
-                        meta[mk] = ",".join(map(str, mv))
-                metas.append(meta)
-                docs.append(doc)
-                ids.append(f"dialog::{i}")
+        persona_sync.dialog_fragments(dialogs, fragments)
+        prefixes.append("dialog")
 
     if legacy_mock_json:
         print(f" 📜 Loading legacy mock dialog JSON: {legacy_mock_json}")
-        with open(legacy_mock_json, "r", encoding="utf-8") as f:
-            legacy_data = json.load(f)
-            for i, ex in enumerate(legacy_data):
-                user = ex.get("user", "")
-                asst = ex.get("assistant", "")
-                text = f"USER: {user}\nORION: {asst}"
-                meta = {
-                    "tag": "persona",
-                    "tags": "mock_dialog,persona_reinforce,tone_training",
-                    "weight": 1.0,
-                    "why_saved": "mock_persona_seed",
-                }
-                metas.append(meta)
-                docs.append(text)
-                ids.append(f"legacy::{i}")
-
-    print(f" ➕ Ingesting {len(docs)} persona documents...")
-    persona_coll.add(documents=docs, metadatas=metas, ids=ids)
-    print(f" ✅ Done. Total in collection: {persona_coll.count()}")
+        persona_sync.legacy_fragments(legacy_mock_json, fragments)
+        prefixes.append("legacy")
+
+    t0 = time.perf_counter()
+    diff = persona_sync.sync_fragments(persona_coll, fragments, prefixes, dry_run=dry_run)
+    elapsed = time.perf_counter() - t0
+
+    if not dry_run:
+        from orion_cli.utils.emotion_index import invalidate
+
+        invalidate(persona_coll.name)  # valence/arousal may have changed in place
+
+    print(f" 🧮 Persona diff{' (dry run)' if dry_run else ''}:")
+    print(persona_sync.format_diff(diff))
+    if not dry_run:
+        print(f" ✅ Done in {elapsed:.2f}s. Total in collection: {persona_coll.count()}")
+
+
+def _json_option(value, name):
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        raise click.BadParameter(f"not valid JSON: {e}", param_hint=name)
 
 
 @cli.command("ltm-dump")
 @click.option("--collection", required=True)
-@click.option("--limit", default=5)
-def ltm_dump(collection, limit):
-    from orion_cli.core.ltm import get_or_create_embed_fn
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["pretty", "jsonl", "csv", "parquet"]),
+    default="pretty",
+    help="pretty = short preview on the console; the others stream every matching record.",
+)
+@click.option("--output", "-o", default=None, help="Output file (default: stdout).")
+@click.option("--where", default=None, help='Metadata filter as JSON, e.g. \'{"source": "chatlog"}\'.')
+@click.option("--where-document", default=None, help='Document filter as JSON, e.g. \'{"$contains": "stars"}\'.')
+@click.option("--offset", default=0, type=int, help="Records to skip.")
+@click.option("--limit", default=None, type=int, help="Max records (default: 5 for pretty, all otherwise).")
+@click.option("--page-size", default=1000, type=int, help="Records fetched per Chroma call.")
+@click.option("--embeddings", is_flag=True, help="Include stored embedding vectors.")
+def ltm_dump(collection, fmt, output, where, where_document, offset, limit, page_size, embeddings):
+    """Page through a collection with optional filters and export it (no embedder loaded)."""
+    from orion_cli.utils.chroma_utils import get_client
+    from orion_cli.utils.ltm_export import export_collection, iter_pages, iter_records
+
+    # Reading documents/metadata never needs the embedder
+    coll = get_client().get_collection(name=collection)
+    page_kwargs = {
+        "where": _json_option(where, "--where"),
+        "where_document": _json_option(where_document, "--where-document"),
+        "offset": offset,
+        "page_size": page_size,
+        "include_embeddings": embeddings,
+    }
+
+    if fmt == "pretty":
+        import textwrap
+
+        limit = 5 if limit is None else limit
+        print(f" 🗃️ Collection: {collection}, showing up to {limit} items")
+        records = iter_records(iter_pages(coll, limit=limit, **page_kwargs))
+        for i, rec in enumerate(records, start=offset + 1):
+            print(f"\n[{i}] 📄 Document:\n{textwrap.shorten(rec['document'] or '', width=140)}")
+            print(f"🧬 Metadata: {rec['metadata']}")
+        return
 
-    embed_fn = get_or_create_embed_fn()
-    client = chromadb.PersistentClient()
-    coll = client.get_or_create_collection(name=collection, embedding_function=embed_fn)
+    try:
+        n = export_collection(coll, fmt, output, limit=limit, **page_kwargs)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    # Status goes to stderr so a stdout export stays machine-readable
+    click.echo(f"[✅] Exported {n} records from '{collection}' as {fmt}", err=True)
+
+
+@cli.command("ltm-shards")
+@click.argument(
+    "action", type=click.Choice(["list", "compact", "drop", "archive", "restore"])
+)
+@click.option("--name", help="Shard collection name (compact/drop/archive).")
+@click.option(
+    "--archive-dir",
+    default="user_data/chroma_archive",
+    type=click.Path(),
+    help="Where archived shards are written.",
+)
+@click.option(
+    "--file", "archive_file", type=click.Path(exists=True), help="Archive to restore."
+)
+def ltm_shards(action, name, archive_dir, archive_file):
+    """Inspect and maintain time-sharded episodic memory collections."""
+    from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENT
+    from orion_cli.utils.chroma_utils import get_client
+    from orion_cli.utils import shard_utils
+    from orion_cli.utils.ltm_utils import load_ltm_config
+
+    client = get_client()
+    granularity = (load_ltm_config().get("sharding") or {}).get("granularity", "month")
+    current = shard_utils.shard_name(COLL_EPISODIC_SENT, granularity=granularity)
+
+    if action == "list":
+        for shard in shard_utils.list_shards(client, COLL_EPISODIC_SENT, include_base=True):
+            count = client.get_collection(name=shard).count()
+            state = "writable" if shard == current else "unsharded, sealed" if shard == COLL_EPISODIC_SENT else "sealed"
+            print(f" 🗂️ {shard:<40} {count:>8} items  ({state})")
+        return
 
-    print(f" 🗃️ Collection: {collection}, showing up to {limit} items")
-    results = coll.get(include=["documents", "metadatas"], limit=limit)
+    if action == "restore":
+        if not archive_file:
+            raise click.UsageError("restore requires --file")
+        shard_utils.restore_shard(client, Path(archive_file))
+        return
 
-    for i, (doc, meta) in enumerate(zip(results["documents"], results["metadatas"])):
-        print(f"\n[{i+1}] 📄 Document:\n{textwrap.shorten(doc, width=140)}")
-        print(f"🧬 Metadata: {meta}")
+    if not name:
+        raise click.UsageError(f"{action} requires --name")
+    if name == current:
+        raise click.UsageError(f"Refusing to {action} the current (writable) shard.")
+
+    if action == "compact":
+        shard_utils.compact_shard(client, name)
+    elif action == "drop":
+        shard_utils.drop_shard(client, name)
+    elif action == "archive":
+        shard_utils.archive_shard(client, name, Path(archive_dir))
+
+
+@cli.command("ltm-serve")
+@click.option("--host", default=None, help="Bind address (default: ltm.service.host).")
+@click.option("--port", default=None, type=int, help="Port (default: ltm.service.port).")
+def ltm_serve(host, port):
+    """Run the local LTM service: one embedder + Chroma client shared by all workers."""
+    from orion_cli.core.ltm_service import DEFAULT_HOST, DEFAULT_PORT, serve
+    from orion_cli.utils.ltm_utils import load_ltm_config
+
+    svc = load_ltm_config().get("service") or {}
+    serve(
+        host or svc.get("host", DEFAULT_HOST),
+        port or int(svc.get("port", DEFAULT_PORT)),
+        window_ms=float(svc.get("batch_window_ms", 5)),
+        max_batch=int(svc.get("max_batch", 64)),
+    )
+
+
+@cli.command("ltm-scan")
+@click.option(
+    "--dir",
+    "dirs",
+    multiple=True,
+    type=click.Path(),
+    help="History dir/file to scan (repeatable). Default: chat_logs + user_data/logs/{chat,instruct}.",
+)
+@click.option("--manifest", type=click.Path(), default=None, help="Scan manifest path.")
+@click.option("--workers", default=None, type=int, help="Parser processes (default: CPU count).")
+@click.option("--batch-size", default=128, type=int, help="Pairs per Chroma upsert.")
+@click.option("--full", is_flag=True, help="Ignore the manifest and rescan everything.")
+@click.option("--dry-run", is_flag=True, help="Count new pairs without ingesting.")
+def ltm_scan(dirs, manifest, workers, batch_size, full, dry_run):
+    """Incrementally scan webui chat histories and stream new pairs into episodic memory."""
+    from orion_cli.utils import log_scanner
+
+    manifest_path = Path(manifest or log_scanner.default_manifest_path())
+    pairs = log_scanner.scan_logs(
+        dirs or log_scanner.DEFAULT_LOG_DIRS,
+        manifest_path=manifest_path,
+        workers=workers,
+        full=full,
+        commit=not dry_run,
+    )
+
+    if dry_run:
+        print(f"[🔍] {sum(1 for _ in pairs)} new pairs found (dry run)")
+        return
+
+    from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+    from orion_cli.scripts.ltm_ingest import ingest_pair_stream
+
+    _, collections = initialize_chromadb_for_ltm()
+    total = ingest_pair_stream(
+        pairs,
+        collections["episodic"],
+        batch_size=batch_size,
+        sentence_coll=collections.get("sentences"),
+        on_stored=lambda stored: log_scanner.advance_manifest(manifest_path, log_scanner.watermarks(stored)),
+    )
+    print(f"[✅] Ingested {total} new chat pairs into episodic memory")
+
+
+@cli.command("ltm-watch")
+@click.option(
+    "--dir",
+    "dirs",
+    multiple=True,
+    type=click.Path(),
+    help="History dir to follow (repeatable). Default: user_data/logs/{chat,instruct}.",
+)
+@click.option("--manifest", type=click.Path(), default=None, help="Scan manifest path.")
+@click.option("--poll", default=2.0, type=float, help="Seconds between directory polls.")
+@click.option("--debounce", default=3.0, type=float, help="Seconds a file must be quiet before ingesting.")
+@click.option("--batch-size", default=128, type=int, help="Pairs per Chroma upsert.")
+def ltm_watch(dirs, manifest, poll, debounce, batch_size):
+    """Follow live webui chat histories and ingest new turns as they are saved."""
+    from orion_cli.core.log_watcher import watch_logs
+    from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+    from orion_cli.utils.log_scanner import WEBUI_LOG_DIRS
+
+    _, collections = initialize_chromadb_for_ltm()
+    try:
+        watch_logs(
+            collections["episodic"],
+            dirs or WEBUI_LOG_DIRS,
+            manifest_path=manifest,
+            poll_seconds=poll,
+            debounce_seconds=debounce,
+            batch_size=batch_size,
+            sentence_coll=collections.get("sentences"),
+        )
+    except KeyboardInterrupt:
+        print("[ltm] Watcher stopped.")
+
+
+@cli.command("ltm-sentences")
+@click.option("--page-size", default=1000, type=int, help="Parent turns read per Chroma call.")
+@click.option("--batch-size", default=None, type=int, help="Sentences per upsert (default: sentences.batch_size).")
+def ltm_sentences(page_size, batch_size):
+    """Backfill the sentence-level collection from every stored episodic turn."""
+    from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENTENCES, initialize_chromadb_for_ltm
+    from orion_cli.scripts.ltm_ingest import ingest_sentences
+    from orion_cli.utils.chroma_utils import _get_or_create
+    from orion_cli.utils.ltm_export import iter_pages
+
+    client, collections = initialize_chromadb_for_ltm()
+    sentence_coll = collections.get("sentences") or _get_or_create(client, COLL_EPISODIC_SENTENCES)
+
+    episodic = collections["episodic"]
+    # Page each shard on its own: one count per shard instead of one per page
+    sources = episodic.shard_collections() if hasattr(episodic, "shard_collections") else [episodic]
+
+    turns = sentences = 0
+    pages = (page for coll in sources for page in iter_pages(coll, page_size=page_size))
+    for page in pages:
+        metas = [m or {} for m in page["metadatas"]]
+        sentences += ingest_sentences(
+            sentence_coll, page["ids"], page["documents"], metas, batch_size=batch_size
+        )
+        turns += len(page["ids"])
+        print(f"[🪡] {turns} turns -> {sentences} sentence spans")
+    print(f"[✅] Sentence collection '{COLL_EPISODIC_SENTENCES}' now holds {sentence_coll.count()} spans")
+
+
+@cli.command("ltm-adjacency")
+@click.option("--rebuild", is_flag=True, help="Rebuild from conversation_id/ordinal metadata in episodic memory.")
+@click.option("--show", "memory_id", default=None, help="Print the neighbours of MEMORY_ID.")
+@click.option("--window", default=1, type=int, help="Neighbours on each side for --show.")
+def ltm_adjacency(rebuild, memory_id, window):
+    """Inspect or rebuild the conversation adjacency index (conversation -> ordered memory IDs)."""
+    from orion_cli.utils.adjacency_index import AdjacencyIndex, default_index_path
+
+    index = AdjacencyIndex(default_index_path())
+    if rebuild:
+        from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENT
+        from orion_cli.utils.chroma_utils import get_client
+        from orion_cli.utils.ltm_export import iter_pages
+        from orion_cli.utils.shard_utils import list_shards
+
+        client = get_client()
+        names = list_shards(client, COLL_EPISODIC_SENT, include_base=True)
+
+        def _entries():
+            for name in names:
+                coll = client.get_collection(name=name)
+                for page in iter_pages(coll, where={"conversation_id": {"$ne": ""}}):
+                    for mem_id, meta in zip(page["ids"], page["metadatas"]):
+                        if meta and "ordinal" in meta:
+                            yield meta["conversation_id"], meta["ordinal"], mem_id
+
+        n = index.rebuild(_entries())
+        print(f"[✅] Adjacency index rebuilt from {len(names)} collection(s): {n} memories")
+
+    if memory_id:
+        ids = index.neighbors([memory_id], window).get(memory_id)
+        print(f"[🧭] {index.locate(memory_id)}: {ids}" if ids else f"[🧭] {memory_id} is not indexed")
+    elif not rebuild:
+        print(f"[🧮] {len(index)} memories in {index.path}")
+
+
+@cli.command("ltm-dedup")
+@click.option("--rebuild", is_flag=True, help="Rebuild the index from the stored episodic collections.")
+@click.option("--check", "text", default=None, help="Report whether TEXT would be rejected as a duplicate.")
+def ltm_dedup(rebuild, text):
+    """Inspect or rebuild the write-time duplicate index for episodic memory."""
+    from orion_cli.utils.dedup_index import get_dedup_index
+
+    index = get_dedup_index()
+    if index is None:
+        print("[⚠️] Dedup is disabled (ltm.dedup.enabled: false)")
+        return
+    if rebuild:
+        from orion_cli.utils.dedup_index import stored_documents
+
+        n = index.rebuild(stored_documents())
+        print(f"[✅] Dedup index rebuilt from episodic memory: {n} unique entries")
+
+    if text is not None:
+        match = index.check(text)
+        print(f"[🔍] {match + ' duplicate' if match else 'not a duplicate'}")
+    elif not rebuild:
+        print(f"[🧮] {len(index)} entries in {index.path}")
+
+
+@cli.command("import-profile")
+@click.option("--budget-ms", default=1000.0, type=float, help="Max wall clock for `orion --help`.")
+@click.option("--top", default=15, type=int, help="Slowest imports to list.")
+def import_profile(budget_ms, top):
+    """Check that CLI startup stays free of heavy imports (-X importtime report)."""
+    from orion_cli.scripts.import_profile import run_check
+
+    if not run_check("orion_cli.cli", budget_ms=budget_ms, top=top):
+        raise SystemExit(1)
+
+
+@cli.command("ltm-hnsw-sweep")
+@click.option("--collection", default="orion_episodic_ltm", show_default=True)
+@click.option("--k", default=10, type=int, show_default=True, help="Neighbours per query (recall@k).")
+@click.option("--queries", default=200, type=int, show_default=True, help="Held-out stored vectors used as queries.")
+@click.option("--limit", default=None, type=int, help="Use at most this many stored vectors.")
+@click.option("--m", "ms", default="8,16,32", show_default=True)
+@click.option("--ef-construction", default="64,128,256", show_default=True)
+@click.option("--ef-search", default="10,32,64,128", show_default=True)
+@click.option("--threads", default=1, type=int, show_default=True, help="Index build threads.")
+@click.option("--target-recall", default=0.95, type=float, show_default=True)
+def ltm_hnsw_sweep(collection, k, queries, limit, ms, ef_construction, ef_search, threads, target_recall):
+    """Sweep HNSW (M, ef_construction, ef_search) on stored vectors: recall, latency, build time, size."""
+    from orion_cli.scripts import hnsw_sweep
+
+    rows, _ = hnsw_sweep.run_sweep(
+        hnsw_sweep.open_for_sweep(collection),
+        k=k,
+        queries=queries,
+        limit=limit,
+        Ms=hnsw_sweep._ints(ms),
+        ef_constructions=hnsw_sweep._ints(ef_construction),
+        ef_searches=hnsw_sweep._ints(ef_search),
+        threads=threads,
+    )
+    hnsw_sweep.report(rows, k, target_recall, collection)
+
+
+@cli.command("web-ingest")
+@click.argument("urls", nargs=-1, required=True)
+@click.option("--policy", type=click.Path(exists=True), default=None, help="Policy YAML (default: orion_policy.yaml).")
+@click.option("--max-pages", default=None, type=int, help="Stop after this many pages.")
+@click.option("--max-depth", default=None, type=int, help="Link hops from the seed URLs.")
+@click.option("--concurrency", default=None, type=int, help="Pages in flight overall.")
+@click.option("--per-domain", default=None, type=int, help="Concurrent requests per host.")
+@click.option("--delay", default=None, type=float, help="Seconds between request starts on one host.")
+@click.option("--all-domains", is_flag=True, help="Follow links off the seed domains.")
+@click.option("--collection", default=None, help="Target collection (default: orion_knowledge).")
+def web_ingest(urls, policy, max_pages, max_depth, concurrency, per_domain, delay, all_domains, collection):
+    """Crawl URLs into the knowledge collection per orion_policy.yaml (conditional re-fetch, batched embedding)."""
+    from orion_cli.core.web_ingest import open_knowledge_collection, run_web_ingest
+
+    run_web_ingest(
+        list(urls),
+        policy_path=policy,
+        collection=open_knowledge_collection(collection) if collection else None,
+        max_pages=max_pages,
+        max_depth=max_depth,
+        concurrency=concurrency,
+        per_domain=per_domain,
+        delay_seconds=delay,
+        same_domain=False if all_domains else None,
+    )
+
+
+@cli.command("ltm-bench-injection")
+@click.option("--history", type=click.Path(exists=True), default=None, help="Web UI history JSON to replay.")
+@click.option("--turns", default=12, type=int, help="Synthetic turns (or max turns replayed).")
+@click.option("--ltm", is_flag=True, help="Use real recall from the local collections.")
+@click.option("--template", type=click.Path(exists=True), default=None, help="Instruction template .yaml (default: ChatML).")
+@click.option("--server", default=None, help="llama.cpp server URL to tokenize with.")
+@click.option("--live", is_flag=True, help="Also evaluate each prompt on --server and report its prompt_n.")
+def ltm_bench_injection(history, turns, ltm, template, server, live):
+    """Reprocessed prompt tokens per turn for each LTM injection mode (prompt-cache reuse)."""
+    from orion_cli.scripts import injection_bench as bench
+
+    convo = bench.load_history(history)[:turns] if history else bench.synthetic_turns(turns)
+    results = bench.run_bench(
+        convo,
+        bench.ltm_memories() if ltm else bench.synthetic_memories(convo),
+        render=bench.load_template(template) if template else bench.render_chatml,
+        tokenize=bench.server_tokenize(server) if server else bench.regex_tokenize,
+        server=server if live else None,
+    )
+    bench.report(results)
 
 
 @cli.command("ltm-ingest")
@@ -233,6 +561,10 @@ def ltm_dump(collection, limit):
 )
 def ltm_ingest(source, pool_size, replace):
     """CLI wrapper for ingesting long-term memory dialogs."""
+    from orion_cli.core.ltm import get_or_create_embed_fn
+    from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+    from orion_cli.scripts.ltm_ingest import ingest_ltm_data
+
     ingest_ltm_data(source=source, pool_size=pool_size, replace=replace)
 
     base_path = Path("orion_cli/data/ingest_ready")
@@ -292,18 +624,18 @@ def ltm_ingest(source, pool_size, replace):
         print(f" ⚠️ Skipped {skipped} lines missing dialog pairs or invalid format.")
 
 
+@cli.command("enrich-chat")
 @click.option(
     "--output-file",
     default="orion_cli/data/ingest_ready/normalized_enriched.jsonl",
     help="Path to save enriched output.",
 )
-@cli.command("enrich-chat")
-def enrich_chat(output_file):
+@_enrichment_options
+def enrich_chat(output_file, concurrency, rate, cache_file):
     """Enrich raw chat logs using GPT-4 and save as normalized_enriched.jsonl."""
-    import json
-    from pathlib import Path
-    from tqdm import tqdm
-    from orion_cli.scripts.enrich_chat import call_gpt4_enrichment
+    from orion_cli.scripts.enrich_chat import PROMPT_VERSION, call_gpt4_enrichment
+    from orion_cli.utils.enrich_runner import run_enrichment
+    from orion_cli.utils.log_scanner import scan_logs
 
     log_dir = Path("orion_cli/data/chat_logs")
     output_path = Path(output_file)
@@ -311,74 +643,34 @@ def enrich_chat(output_file):
     print("[🔧] Starting enrichment process...")
     print(f"[📁] Looking for logs in {log_dir}")
 
-    all_logs = []
-    for log_file in log_dir.glob("*.json"):
-        print(f"[📄] Parsing: {log_file.name}")
-        with open(log_file, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                internal = data.get("internal", [])
-                for i, pair in enumerate(internal):
-                    if (
-                        isinstance(pair, list)
-                        and len(pair) == 2
-                        and pair[0] != "<|BEGIN-VISIBLE-CHAT|>"
-                    ):
-                        user_msg = pair[0].strip()
-                        assistant_msg = pair[1].strip()
-                        if user_msg and assistant_msg:
-                            all_logs.append(
-                                {"user": user_msg, "assistant": assistant_msg}
-                            )
-                    else:
-                        print(f"⚠️ Skipping invalid pair {i} in {log_file.name}")
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Skipping {log_file.name} due to JSON error: {e}")
+    all_logs = [
+        {"user": p["user"], "assistant": p["assistant"]} for p in scan_logs([log_dir])
+    ]
 
     print(f"[🔍] Found {len(all_logs)} chat entries...")
-    enriched = []
 
-    for pair in tqdm(all_logs, desc="Enriching"):
-        result = call_gpt4_enrichment(pair["user"], pair["assistant"])
-        if result:
-            enriched.append(result)
-
-    if enriched:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            for item in enriched:
-                f.write(json.dumps(item, ensure_ascii=False) + "\n")
-        print(f"[✅] Saved {len(enriched)} enriched messages to {output_path}")
+    stats = run_enrichment(
+        all_logs,
+        call_gpt4_enrichment,
+        output_path,
+        prompt_version=PROMPT_VERSION,
+        cache_path=cache_file,
+        concurrency=concurrency,
+        rate=rate,
+    )
+    if stats["cached"] + stats["enriched"]:
+        print(
+            f"[✅] Saved {stats['cached'] + stats['enriched']} enriched messages to {output_path} "
+            f"({stats['cached']} from cache, {stats['failed']} failed)"
+        )
     else:
         print("[❌] No enriched outputs were generated.")
 
 
 def load_logs(path: Path) -> list[dict]:
-    all_logs = []
-    for log_file in path.glob("*.json"):
-        with open(log_file, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                internal = data.get("internal", [])
-                for i, pair in enumerate(internal):
-                    if (
-                        isinstance(pair, list)
-                        and len(pair) == 2
-                        and pair[0] != "<|BEGIN-VISIBLE-CHAT|>"
-                    ):
-                        user_msg = pair[0].strip()
-                        assistant_msg = pair[1].strip()
-                        if user_msg and assistant_msg:
-                            all_logs.append(
-                                {"user": user_msg, "assistant": assistant_msg}
-                            )
-                        else:
-                            print(
-                                f"⚠️ Skipping incomplete pair at item {i} in {log_file.name}"
-                            )
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Skipping {log_file.name} due to JSON error: {e}")
-    return all_logs
+    from orion_cli.utils.log_scanner import scan_logs
+
+    return [{"user": p["user"], "assistant": p["assistant"]} for p in scan_logs([path])]
 
     # def call_gpt4_enrichment(user_msg, assistant_msg):
     # try:
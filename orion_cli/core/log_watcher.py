@@ -0,0 +1,90 @@
+# orion_cli/core/log_watcher.py
+#
+# Tail-follow ingestion of live webui chat histories. modules/chat.save_history
+# rewrites user_data/logs/{chat/<character>,instruct}/*.json after every turn;
+# this watcher notices the rewrite, waits for the file to settle (debounce),
+# and ingests only the rows past the stored watermark (the log_scanner manifest).
+
+import threading
+import time
+from pathlib import Path
+
+from orion_cli.utils.log_scanner import (
+    WEBUI_LOG_DIRS,
+    collect_new_pairs,
+    default_manifest_path,
+    find_log_files,
+    save_manifest,
+)
+
+
+def watch_logs(
+    episodic_coll,
+    dirs=WEBUI_LOG_DIRS,
+    *,
+    manifest_path: Path = None,
+    poll_seconds: float = 2.0,
+    debounce_seconds: float = 3.0,
+    batch_size: int = 128,
+    stop_event: threading.Event = None,
+    sentence_coll=None,
+):
+    """Poll `dirs` until `stop_event` is set, batch-ingesting new pairs of settled files."""
+    from orion_cli.scripts.ltm_ingest import ingest_pair_stream
+
+    manifest_path = Path(manifest_path or default_manifest_path())
+    stop_event = stop_event or threading.Event()
+    seen = {}     # path -> (mtime, size) at last poll
+    pending = {}  # path -> monotonic time of its last change
+
+    print(f"[ltm] 👀 Watching {', '.join(map(str, dirs))} (debounce {debounce_seconds}s)")
+    while not stop_event.is_set():
+        now = time.monotonic()
+        for p in find_log_files(dirs):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            sig = (st.st_mtime, st.st_size)
+            if seen.get(p) != sig:
+                seen[p] = sig
+                pending[p] = now
+
+        settled = [p for p, changed in pending.items() if now - changed >= debounce_seconds]
+        if settled:
+            for p in settled:
+                del pending[p]
+            try:
+                pairs, manifest = collect_new_pairs(settled, manifest_path)
+                added = ingest_pair_stream(
+                    pairs, episodic_coll, batch_size=batch_size, sentence_coll=sentence_coll
+                )
+                save_manifest(manifest_path, manifest)
+                if added:
+                    print(f"[ltm] 📝 Ingested {added} new turn(s) from {len(settled)} history file(s)")
+            except Exception as e:
+                # Leave the watermark untouched; the file is retried on its next change
+                print(f"[ltm] ⚠️ Log watcher ingest failed: {e}")
+
+        stop_event.wait(poll_seconds)
+
+
+def start_log_watcher(episodic_coll, cfg: dict = None, sentence_coll=None) -> threading.Event:
+    """Run `watch_logs` on a daemon thread; set the returned event to stop it."""
+    cfg = cfg or {}
+    stop_event = threading.Event()
+    threading.Thread(
+        target=watch_logs,
+        args=(episodic_coll,),
+        kwargs={
+            "dirs": tuple(cfg.get("dirs") or WEBUI_LOG_DIRS),
+            "poll_seconds": float(cfg.get("poll_seconds", 2.0)),
+            "debounce_seconds": float(cfg.get("debounce_seconds", 3.0)),
+            "batch_size": int(cfg.get("batch_size", 128)),
+            "stop_event": stop_event,
+            "sentence_coll": sentence_coll,
+        },
+        name="orion-log-watcher",
+        daemon=True,
+    ).start()
+    return stop_event
@@ -6,14 +6,13 @@ from datetime import datetime
 from pathlib import Path
 
 from tqdm import tqdm
-from chromadb import PersistentClient
 from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 
 from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+from orion_cli.utils.chroma_utils import chroma_path, get_client, hnsw_metadata, open_collection
 from orion_cli.utils.embedding import embed, get_embed_function
 from orion_cli.utils.ltm_utils import get_relevant_ltm
 
-CHROMA_PATH = "C:/Orion/text-generation-webui/user_data/chroma_db"
 DEFAULT_EMBED_MODEL = "sentence-transformers/all-mpnet-base-v2"
 
 
@@ -48,16 +47,13 @@ def get_embed_fn():
 EMBED_FN = get_embed_fn()
 
 
-def initialize_chromadb_for_ltm(
-    embed_fn=None, persist_dir="C:/Orion/text-generation-webui/user_data/chroma_db"
-):
+def initialize_chromadb_for_ltm(embed_fn=None, persist_dir=None):
     """
     Initializes ChromaDB collections for persona and episodic memory.
     Returns both the client and the collections for flexibility.
     Used by TGWUI extension and CLI ingestion.
     """
-    os.makedirs(persist_dir, exist_ok=True)
-    client = PersistentClient(path=persist_dir)
+    client = get_client(persist_dir)  # shared; persist_dir defaults to ORION_CHROMA_PATH
 
     if embed_fn is None:
         from orion_cli.utils.embedding import get_embed_function
@@ -65,15 +61,14 @@ def initialize_chromadb_for_ltm(
         embed_fn = get_embed_function()
 
     try:
-        persona_coll = client.get_or_create_collection(
-            name="orion_persona_ltm",  # unified name for persona
-            embedding_function=embed_fn,
-            metadata={"hnsw:space": "cosine"},
+        from orion_cli.utils.chroma_utils import hnsw_metadata, open_collection
+
+        # unified name for persona; HNSW settings from ltm.hnsw (cosine for both by default)
+        persona_coll = open_collection(
+            client, "orion_persona_ltm", embed_fn, hnsw_metadata("orion_persona_ltm")
         )
-        episodic_coll = client.get_or_create_collection(
-            name="orion_episodic_sent_ltm",
-            embedding_function=embed_fn,
-            metadata={"hnsw:space": "cosine"},
+        episodic_coll = open_collection(
+            client, "orion_episodic_sent_ltm", embed_fn, hnsw_metadata("orion_episodic_sent_ltm")
         )
 
         print("[orion_ltm] ✅ ChromaDB collections initialized.")
@@ -93,9 +88,9 @@ def clean_metadata(md):
     }
 
 
-def ingest_staged_jsonl(jsonl_path: Path, collection_name: str, persist_dir: Path):
+def ingest_staged_jsonl(jsonl_path: Path, collection_name: str, persist_dir: Path = None):
     print(f"🚀 Ingesting from '{jsonl_path}'")
-    print(f"🧠 Using ChromaDB path: {persist_dir}")
+    print(f"🧠 Using ChromaDB path: {chroma_path(persist_dir)}")
     print(f"📛 Collection name: {collection_name}")
 
     with open(jsonl_path, "r", encoding="utf-8") as f:
@@ -103,8 +98,8 @@ def ingest_staged_jsonl(jsonl_path: Path, collection_name: str, persist_dir: Pat
 
     print(f"🧾 Embedding {len(lines)} entries...")
 
-    client = PersistentClient(path=str(persist_dir))
-    coll = client.get_or_create_collection(name=collection_name)
+    client = get_client(persist_dir)
+    coll = open_collection(client, collection_name, metadata=hnsw_metadata(collection_name))
 
     docs, ids, metas = [], [], []
     failed = 0
@@ -139,7 +134,7 @@ def _get_or_create(
     *,
     cosine: bool = False,
     embed_fn=EMBED_FN,
-    persist_dir="user_data/chroma_db",
+    persist_dir=None,
 ):
     """
     Internal helper for Orion LTM. Always binds the embedding function.
@@ -147,11 +142,12 @@ def _get_or_create(
     """
     client = get_client(persist_dir)
     try:
-        return client.get_or_create_collection(
-            name=name,
-            embedding_function=embed_fn,
-            metadata={"hnsw:space": "cosine"} if cosine else None,
-        )
+        from orion_cli.utils.chroma_utils import hnsw_metadata, open_collection
+
+        metadata = hnsw_metadata(name) or {}
+        if cosine:
+            metadata["hnsw:space"] = "cosine"
+        return open_collection(client, name, embed_fn, metadata or None)
     except Exception as e:
         print(f"[ERROR] Failed to get/create collection '{name}': {e}")
         raise
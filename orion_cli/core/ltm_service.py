@@ -0,0 +1,203 @@
+# orion_cli/core/ltm_service.py
+#
+# Optional local LTM daemon. Holds the single embedder and Chroma client so
+# the web UI extension, the OpenAI API and CLI runs can share one model copy
+# and one SQLite writer. Clients live in orion_cli/utils/ltm_client.py.
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from orion_cli.utils.metrics import render_prometheus, turn
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5055
+
+_state = {}
+_write_lock = threading.Lock()
+
+
+def _init_backend(window_ms: float, max_batch: int):
+    """Load the embedder once and bind the micro-batching scheduler to both collections."""
+    from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+    from orion_cli.utils.embedding import EMBED_FN
+    from orion_cli.utils.embed_scheduler import EmbeddingScheduler
+
+    scheduler = EmbeddingScheduler(
+        EMBED_FN.embed_direct, window_ms=window_ms, max_batch=max_batch, name="service_embed"
+    )
+    client, collections = initialize_chromadb_for_ltm(embed_fn=scheduler)
+    _state.update(client=client, collections=collections, scheduler=scheduler)
+
+    from orion_cli.utils.write_journal import start_write_journal
+
+    start_write_journal(collections, role="service")
+
+    from orion_cli.utils.dedup_index import seed_dedup_index
+
+    seed_dedup_index(collections["episodic"], client)
+
+    from orion_cli.utils.warmup import start_warmup
+
+    start_warmup(scheduler, collections)
+
+    from orion_cli.utils.ltm_utils import load_ltm_config
+
+    watch_cfg = load_ltm_config().get("log_watcher") or {}
+    if watch_cfg.get("enabled"):
+        from orion_cli.core.log_watcher import start_log_watcher
+
+        _state["log_watcher"] = start_log_watcher(
+            collections["episodic"], watch_cfg, sentence_coll=collections.get("sentences")
+        )
+
+
+def _collection(name: str):
+    collections = _state["collections"]
+    if name not in collections:
+        raise KeyError(f"unknown collection '{name}'")
+    return collections[name]
+
+
+# === Handlers ===
+def handle_retrieve(body: dict) -> dict:
+    from orion_cli.utils.ltm_utils import get_relevant_ltm
+
+    c = _state["collections"]
+    with turn("service_retrieve"):
+        text, dbg = get_relevant_ltm(
+            body["query"], c["persona"], c["episodic"], return_debug=True,
+            sentence_coll=c.get("sentences"),
+            mood=body.get("mood"),
+        )
+    return {"context": text, "debug": dbg}
+
+
+def handle_turn(body: dict) -> dict:
+    """Run the per-turn write hooks server-side (dedup, pooling) for thin clients."""
+    from orion_cli.orion_ltm_integration import on_assistant_turn, on_user_turn
+
+    if "log_watcher" in _state:
+        return {"ok": True, "deferred": "log_watcher"}
+    episodic = _collection("episodic")
+    with _write_lock, turn(f"service_{body['role']}_turn", conversation_id=body.get("conversation_id")):
+        conversation_id = body.get("conversation_id")
+        if body["role"] == "user":
+            on_user_turn(body["text"], episodic, conversation_id=conversation_id)
+        else:
+            on_assistant_turn(
+                body["text"],
+                episodic,
+                last_user_input=body.get("last_user_input"),
+                conversation_id=conversation_id,
+            )
+    return {"ok": True}
+
+
+def handle_add(body: dict) -> dict:
+    from orion_cli.utils.write_journal import write_memory
+
+    coll = _collection(body.get("collection", "episodic"))
+    with _write_lock:
+        write_memory(
+            coll,
+            "add",
+            ids=body["ids"],
+            documents=body["documents"],
+            metadatas=body.get("metadatas"),
+        )
+    return {"added": len(body["ids"])}
+
+
+def handle_add_batch(body: dict) -> dict:
+    """Items: [{collection?, id, document, metadata?}, ...] grouped into one add per collection."""
+    grouped = {}
+    for item in body["items"]:
+        g = grouped.setdefault(item.get("collection", "episodic"), ([], [], []))
+        g[0].append(item["id"])
+        g[1].append(item["document"])
+        g[2].append(item.get("metadata") or {})
+
+    from orion_cli.utils.write_journal import write_memory
+
+    added = 0
+    with _write_lock:
+        for name, (ids, docs, metas) in grouped.items():
+            write_memory(_collection(name), "add", ids=ids, documents=docs, metadatas=metas)
+            added += len(ids)
+    return {"added": added}
+
+
+ROUTES = {
+    "/retrieve": handle_retrieve,
+    "/turn": handle_turn,
+    "/add": handle_add,
+    "/add_batch": handle_add_batch,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        from orion_cli.utils.warmup import readiness
+
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "pid": os.getpid(), **readiness()})
+        elif self.path == "/ready":
+            state = readiness()
+            self._reply(200 if state["ready"] else 503, state)
+        elif self.path == "/metrics":
+            data = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._reply(404, {"error": f"no route {self.path}"})
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path)
+        if handler is None:
+            self._reply(404, {"error": f"no route {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            self._reply(200, handler(body))
+        except (KeyError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+        except Exception as e:
+            print(f"[ltm-service] ❌ {self.path} failed: {e}")
+            self._reply(500, {"error": str(e)})
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    *,
+    window_ms: float = 5.0,
+    max_batch: int = 64,
+):
+    _init_backend(window_ms, max_batch)
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    print(f"[ltm-service] 🛰️ Listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("[ltm-service] Stopped.")
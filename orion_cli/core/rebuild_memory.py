@@ -13,7 +13,6 @@ def rebuild_memory(args):
             args.persona_yaml,
             collection_name=args.persona_collection,
             replace=args.replace,
-            chroma_path="C:/Orion/text-generation-webui/user_data/chroma_db",
         )
 
     # Episodic Memory (LTM)
@@ -0,0 +1,558 @@
+# orion_cli/core/web_ingest.py
+#
+# Crawl-and-ingest for reference pages ("scrapbook" knowledge, kept apart from
+# personal memory in its own collection, orion_knowledge).
+#
+#   fetch     asyncio front over a pool of keep-alive http.client connections
+#             per origin (the blocking I/O runs in worker threads); a global
+#             concurrency cap, a per-domain cap and a politeness delay between
+#             request starts on the same domain (robots.txt Crawl-delay wins
+#             when larger). robots.txt is honored unless disabled.
+#   cache     ORION_CHROMA_PATH/orion_web_cache.jsonl, append-only, last line
+#             per URL wins: ETag / Last-Modified for conditional requests, the
+#             body hash, the stored chunk IDs and the page's links. A 304 or an
+#             unchanged body costs no parsing or embedding, and the crawl still
+#             follows the cached links. A URL whose body equals an already
+#             stored page ('/index.html' next to '/') is cached as alias_of
+#             that page and never ingested twice.
+#   extract   utils.html_extract with the domain's policy (orion_policy.yaml).
+#   ingest    chunks are embedded in batches of embed_batch (one embedder call
+#             per batch) and upserted with url / title / section metadata.
+#             Chunks of an older version of the page that no longer exist are
+#             deleted. A page only enters the cache after its chunks are stored.
+
+import asyncio
+import gzip
+import hashlib
+import http.client
+import json
+import threading
+import time
+import zlib
+from pathlib import Path
+from queue import Empty, LifoQueue
+from urllib import robotparser
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_USER_AGENT = "OrionWebIngest/0.1 (+https://github.com/DigitalMith/orion-persistence-of-vision)"
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+MAX_REDIRECTS = 5
+
+
+def default_cache_path() -> Path:
+    from orion_cli.utils.chroma_utils import chroma_path
+
+    return Path(chroma_path()) / "orion_web_cache.jsonl"
+
+
+def normalize_url(url: str) -> str | None:
+    """Lowercased scheme/host, no fragment, '/' for an empty path; None for non-http(s)."""
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower() + (f":{parts.port}" if parts.port else "")
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", parts.query, ""))
+
+
+def page_id(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+# === Fetching ===
+class Response:
+    __slots__ = ("url", "status", "headers", "body")
+
+    def __init__(self, url: str, status: int, headers: dict, body: bytes):
+        self.url, self.status, self.headers, self.body = url, status, headers, body
+
+    @property
+    def content_type(self) -> str:
+        return (self.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+    def text(self) -> str:
+        charset = "utf-8"
+        for part in (self.headers.get("content-type") or "").split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                charset = value.strip("\"'")
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class PooledFetcher:
+    """Blocking GETs over reusable keep-alive connections, at most max_per_host idle per origin."""
+
+    def __init__(self, *, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 20.0, max_per_host: int = 4,
+                 max_bytes: int = 5_000_000):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_per_host = max(1, int(max_per_host))
+        self.max_bytes = int(max_bytes)
+        self._idle = {}  # (scheme, host, port) -> LifoQueue of connections
+        self._lock = threading.Lock()
+
+    def _origin(self, url: str):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return parts.scheme, parts.hostname, port
+
+    def _new(self, origin):
+        scheme, host, port = origin
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout)
+
+    def _acquire(self, origin):
+        """(connection, reused)."""
+        with self._lock:
+            idle = self._idle.setdefault(origin, LifoQueue())
+        try:
+            return idle.get_nowait(), True
+        except Empty:
+            return self._new(origin), False
+
+    def _release(self, origin, conn, reusable: bool):
+        idle = self._idle[origin]
+        if reusable and idle.qsize() < self.max_per_host:
+            idle.put(conn)
+        else:
+            conn.close()
+
+    def _request(self, url: str, headers: dict) -> Response:
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        origin = self._origin(url)
+        conn, reused = self._acquire(origin)
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionError, http.client.BadStatusLine):
+            conn.close()
+            if not reused:
+                raise
+            conn = self._new(origin)  # the server dropped an idle connection: once more, fresh
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        body = resp.read(self.max_bytes + 1)
+        oversized = len(body) > self.max_bytes
+        self._release(origin, conn, not resp.will_close and not oversized)
+        if oversized:
+            raise ValueError(f"response larger than {self.max_bytes} bytes")
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        encoding = resp_headers.get("content-encoding", "").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return Response(url, resp.status, resp_headers, body)
+
+    def fetch(self, url: str, headers: dict = None, follow=None) -> Response:
+        """
+        GET `url`, following redirects; `headers` are added to every hop. A
+        redirect whose target fails `follow(url)` is returned unfollowed.
+        """
+        base = {
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            **(headers or {}),
+        }
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._request(url, base)
+            if resp.status in (301, 302, 303, 307, 308) and resp.headers.get("location"):
+                target = normalize_url(urljoin(url, resp.headers["location"]))
+                if target is None:
+                    raise ValueError("redirect to a non-http(s) URL")
+                if follow is not None and not follow(target):
+                    return resp
+                url = target
+                continue
+            return resp
+        raise ValueError(f"more than {MAX_REDIRECTS} redirects")
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+            self._idle.clear()
+
+
+class Politeness:
+    """Per-domain concurrency cap and minimum spacing between request starts."""
+
+    def __init__(self, per_domain: int = 2, delay: float = 1.0):
+        self.per_domain = max(1, int(per_domain))
+        self.delay = float(delay)
+        self._sems = {}
+        self._locks = {}
+        self._next = {}
+        self._delays = {}  # domain -> Crawl-delay from robots.txt
+
+    def set_delay(self, domain: str, delay: float):
+        self._delays[domain] = max(self.delay, float(delay))
+
+    async def acquire(self, domain: str):
+        sem = self._sems.setdefault(domain, asyncio.Semaphore(self.per_domain))
+        await sem.acquire()
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            wait = self._next.get(domain, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next[domain] = time.monotonic() + self._delays.get(domain, self.delay)
+
+    def release(self, domain: str):
+        self._sems[domain].release()
+
+
+# === Conditional-fetch cache ===
+class WebCache:
+    """Append-only JSONL: one {"url", "etag", "last_modified", "sha1", "chunk_ids", "links", ...} per line."""
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path or default_cache_path())
+        self._data = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                        self._data[row["url"]] = row
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> dict | None:
+        return self._data.get(url)
+
+    def digests(self) -> dict:
+        """sha1 -> URL of every cached page that holds its own chunks."""
+        return {e["sha1"]: url for url, e in self._data.items() if e.get("sha1") and not e.get("alias_of")}
+
+    def put(self, entry: dict):
+        with self._lock:
+            self._data[entry["url"]] = entry
+            self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def conditional_headers(self, url: str) -> dict:
+        entry = self._data.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def close(self):
+        self._fh.close()
+
+
+# === Ingest ===
+class KnowledgeWriter:
+    """Collects page chunks and writes them in embedding batches; pages are cached once stored."""
+
+    def __init__(self, collection, cache: WebCache, *, embed_batch: int = 64, embed_fn=None):
+        from orion_cli.utils.chroma_utils import embedding_function
+
+        self.collection = collection
+        self.cache = cache
+        self.embed_batch = max(1, int(embed_batch))
+        self.embed_fn = embed_fn or embedding_function(collection)
+        self._pages = []  # (cache entry, ids, docs, metas, stale ids)
+        self._pending = 0
+        self._lock = asyncio.Lock()
+        self.chunks_written = 0
+        self.batches = 0
+
+    async def add_page(self, entry: dict, ids, docs, metas, stale):
+        async with self._lock:
+            self._pages.append((entry, ids, docs, metas, stale))
+            self._pending += len(ids)
+            if self._pending >= self.embed_batch:
+                await self._flush_locked()
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self):
+        pages, self._pages, self._pending = self._pages, [], 0
+        if pages:
+            await asyncio.to_thread(self._write, pages)
+
+    def _write(self, pages):
+        ids = [i for p in pages for i in p[1]]
+        docs = [d for p in pages for d in p[2]]
+        metas = [m for p in pages for m in p[3]]
+        for start in range(0, len(ids), self.embed_batch):
+            end = start + self.embed_batch
+            kwargs = {"ids": ids[start:end], "documents": docs[start:end], "metadatas": metas[start:end]}
+            if self.embed_fn is not None:
+                kwargs["embeddings"] = [list(map(float, v)) for v in self.embed_fn(docs[start:end])]
+            self.collection.upsert(**kwargs)
+            self.batches += 1
+        self.chunks_written += len(ids)
+        for entry, _, _, _, stale in pages:
+            if stale:
+                self.collection.delete(ids=stale)
+            self.cache.put(entry)
+
+
+def page_records(url: str, page: dict, chunks: list[dict], fetched_at: float):
+    pid = page_id(url)
+    host = urlsplit(url).hostname or ""
+    ids, docs, metas = [], [], []
+    for n, chunk in enumerate(chunks):
+        ids.append(f"web-{pid}-{n}")
+        docs.append(chunk["text"])
+        metas.append(
+            {
+                "source": "web",
+                "url": url,
+                "domain": host,
+                "title": page["title"],
+                "section": chunk["section"],
+                "chunk_index": n,
+                "fetched_at": fetched_at,
+                "timestamp": fetched_at,
+            }
+        )
+    return ids, docs, metas
+
+
+# === Crawl ===
+class Crawler:
+    def __init__(
+        self,
+        policy: dict,
+        writer: KnowledgeWriter,
+        cache: WebCache,
+        *,
+        fetcher: PooledFetcher = None,
+        concurrency: int = 8,
+        per_domain: int = 2,
+        delay: float = 1.0,
+        max_pages: int = 100,
+        max_depth: int = 1,
+        same_domain: bool = True,
+        respect_robots: bool = True,
+    ):
+        self.policy = policy
+        self.writer = writer
+        self.cache = cache
+        self.fetcher = fetcher or PooledFetcher(max_per_host=per_domain)
+        self.concurrency = max(1, int(concurrency))
+        self.politeness = Politeness(per_domain, delay)
+        self.max_pages = int(max_pages)
+        self.max_depth = int(max_depth)
+        self.same_domain = same_domain
+        self.respect_robots = respect_robots
+        self._robots = {}  # origin -> RobotFileParser | None
+        self._robots_lock = asyncio.Lock()
+        self._digests = cache.digests()  # body sha1 -> page holding it ('/' and '/index.html' are one page)
+        self._domains = set()
+        self.stats = {
+            k: 0
+            for k in ("fetched", "not_modified", "unchanged", "duplicate", "ingested", "chunks", "robots", "skipped", "errors")
+        }
+
+    def _in_scope(self, url: str) -> bool:
+        return not (self.same_domain and self._domains) or urlsplit(url).hostname in self._domains
+
+    async def _get(self, url: str, headers: dict = None) -> Response:
+        domain = urlsplit(url).hostname
+        await self.politeness.acquire(domain)
+        try:
+            return await asyncio.to_thread(self.fetcher.fetch, url, headers, self._in_scope)
+        finally:
+            self.politeness.release(domain)
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        async with self._robots_lock:
+            if origin not in self._robots:
+                rules = None
+                try:
+                    resp = await self._get(origin + "/robots.txt")
+                    if resp.status == 200:
+                        rules = robotparser.RobotFileParser()
+                        rules.parse(resp.text().splitlines())
+                        crawl_delay = rules.crawl_delay(self.fetcher.user_agent)
+                        if crawl_delay:
+                            self.politeness.set_delay(parts.hostname, crawl_delay)
+                except Exception:
+                    pass  # unreachable robots.txt: allowed
+                self._robots[origin] = rules
+        rules = self._robots[origin]
+        return rules is None or rules.can_fetch(self.fetcher.user_agent, url)
+
+    async def _process(self, url: str) -> list[str]:
+        """Fetch/extract/ingest one page; returns the links to follow."""
+        from orion_cli.utils.html_extract import chunk_blocks, extract, policy_for
+
+        if not await self._allowed(url):
+            self.stats["robots"] += 1
+            return []
+        cached = self.cache.get(url)
+        resp = await self._get(url, self.cache.conditional_headers(url))
+        self.stats["fetched"] += 1
+        if resp.url != url:
+            # Redirected (off-domain hops are never followed): robots applies to the final URL too
+            if not await self._allowed(resp.url):
+                self.stats["robots"] += 1
+                return []
+        if resp.status == 304 and cached:
+            self.stats["not_modified"] += 1
+            self._remember(cached)
+            return cached.get("links") or []
+        if resp.status != 200 or resp.content_type not in HTML_TYPES:
+            self.stats["skipped"] += 1
+            return []
+
+        digest = hashlib.sha1(resp.body).hexdigest()
+        entry = {
+            "url": url,
+            "etag": resp.headers.get("etag"),
+            "last_modified": resp.headers.get("last-modified"),
+            "sha1": digest,
+            "fetched_at": time.time(),
+        }
+        if cached and cached.get("sha1") == digest:
+            self.stats["unchanged"] += 1
+            self.cache.put({**cached, **entry})  # new validators, same content
+            self._remember(cached)
+            return cached.get("links") or []
+        canonical = self._digests.setdefault(digest, url)
+        if canonical != url:
+            # Same body as a stored page: cache it as an alias (dropping chunks it held before)
+            self.stats["duplicate"] += 1
+            entry.update(alias_of=canonical, chunk_ids=[], links=[])
+            await self.writer.add_page(entry, [], [], [], (cached or {}).get("chunk_ids") or [])
+            return []
+
+        policy = policy_for(self.policy, url)
+        page = extract(resp.text(), resp.url, policy)
+        chunks = chunk_blocks(page["blocks"], policy)
+        ids, docs, metas = page_records(url, page, chunks, entry["fetched_at"])
+        links = list(dict.fromkeys(filter(None, map(normalize_url, page["links"]))))
+        entry.update(title=page["title"], chunk_ids=ids, links=links)
+        stale = [i for i in (cached or {}).get("chunk_ids") or [] if i not in set(ids)]
+        await self.writer.add_page(entry, ids, docs, metas, stale)
+        self.stats["ingested"] += 1
+        self.stats["chunks"] += len(ids)
+        return links
+
+    def _remember(self, cached: dict):
+        if cached.get("sha1") and not cached.get("alias_of"):
+            self._digests.setdefault(cached["sha1"], cached["url"])
+
+    async def crawl(self, seeds: list[str]) -> dict:
+        seeds = [u for u in map(normalize_url, seeds) if u]
+        self._domains = {urlsplit(u).hostname for u in seeds}
+        seen = set(seeds)
+        queue = asyncio.Queue()
+        for u in seeds:
+            queue.put_nowait((u, 0))
+        scheduled = len(seeds)
+
+        async def worker():
+            nonlocal scheduled
+            while True:
+                url, depth = await queue.get()
+                try:
+                    links = await self._process(url)
+                    if depth < self.max_depth:
+                        for link in links:
+                            if scheduled >= self.max_pages:
+                                break
+                            if link in seen or not self._in_scope(link):
+                                continue
+                            seen.add(link)
+                            scheduled += 1
+                            queue.put_nowait((link, depth + 1))
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[web] ⚠️ {url}: {e}")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+            await self.writer.flush()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.fetcher.close()
+        return self.stats
+
+
+def open_knowledge_collection(name: str = None):
+    from orion_cli.orion_ltm_integration import COLL_KNOWLEDGE
+    from orion_cli.utils.chroma_utils import _get_or_create, get_client
+
+    return _get_or_create(get_client(), name or COLL_KNOWLEDGE)
+
+
+def run_web_ingest(seeds: list[str], *, policy_path=None, collection=None, cfg: dict = None, **overrides) -> dict:
+    """Crawl `seeds` with ltm.web_ingest settings (keyword overrides win) into the knowledge collection."""
+    from orion_cli.utils.html_extract import load_policy
+
+    if cfg is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("web_ingest") or {}
+    cfg = {**cfg, **{k: v for k, v in overrides.items() if v is not None}}
+
+    policy = load_policy(policy_path or cfg.get("policy"))
+    coll = collection if collection is not None else open_knowledge_collection(cfg.get("collection"))
+    cache = WebCache(cfg.get("cache_path"))
+    writer = KnowledgeWriter(coll, cache, embed_batch=int(cfg.get("embed_batch", 64)))
+    crawler = Crawler(
+        policy,
+        writer,
+        cache,
+        fetcher=PooledFetcher(
+            user_agent=cfg.get("user_agent") or DEFAULT_USER_AGENT,
+            timeout=float(cfg.get("timeout", 20)),
+            max_per_host=int(cfg.get("per_domain", 2)),
+        ),
+        concurrency=int(cfg.get("concurrency", 8)),
+        per_domain=int(cfg.get("per_domain", 2)),
+        delay=float(cfg.get("delay_seconds", 1.0)),
+        max_pages=int(cfg.get("max_pages", 100)),
+        max_depth=int(cfg.get("max_depth", 1)),
+        same_domain=bool(cfg.get("same_domain", True)),
+        respect_robots=bool(cfg.get("respect_robots", True)),
+    )
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(crawler.crawl(seeds))
+    finally:
+        cache.close()
+    stats.update(batches=writer.batches, seconds=round(time.perf_counter() - start, 2))
+    print(
+        f"[web] ✅ {stats['fetched']} fetched, {stats['ingested']} ingested ({stats['chunks']} chunks in "
+        f"{stats['batches']} batches), {stats['not_modified']} not modified, {stats['unchanged']} unchanged, "
+        f"{stats['duplicate']} duplicate, "
+        f"{stats['robots']} disallowed, {stats['errors']} errors in {stats['seconds']}s -> {coll.name}"
+    )
+    return stats
@@ -4,7 +4,8 @@ import re
 import time
 import os
 
-from orion_cli.utils.ltm_utils import get_relevant_ltm
+from orion_cli.utils.ltm_utils import get_relevant_ltm, load_ltm_config
+from orion_cli.utils.metrics import timed
 from orion_cli.utils.chroma_utils import _get_or_create, EMBED_FN
 
 # ⛔ Removed: from orion_cli.core.ltm import get_client  (caused circular import)
@@ -17,6 +18,8 @@ MODEL_NAME = os.environ.get("ORION_EMBED_MODEL", "intfloat/e5-large-v2")
 COLL_PERSONA = "persona"
 COLL_EPISODIC_RAW = "orion_episodic_raw_ltm"
 COLL_EPISODIC_SENT = "orion_episodic_ltm"
+COLL_EPISODIC_SENTENCES = "orion_episodic_sent_ltm"  # sentence spans of episodic turns
+COLL_KNOWLEDGE = "orion_knowledge"  # web ingest references (core/web_ingest.py), never personal memory
 
 
 def initialize_chromadb_for_ltm(embed_fn=EMBED_FN):
@@ -31,43 +34,85 @@ def initialize_chromadb_for_ltm(embed_fn=EMBED_FN):
 
     client = get_client()
     persona = _get_or_create(client, name=COLL_PERSONA, embed_fn=embed_fn)
-    episodic = _get_or_create(client, name=COLL_EPISODIC_SENT, embed_fn=embed_fn)
 
-    print("[ltm] ChromaDB initialized: persona + episodic collections ready")
-    return client, {"persona": persona, "episodic": episodic}
+    sharding = load_ltm_config().get("sharding") or {}
+    if sharding.get("enabled"):
+        from orion_cli.utils.shard_utils import ShardedCollection
+
+        episodic = ShardedCollection(
+            client,
+            COLL_EPISODIC_SENT,
+            embed_fn,
+            granularity=sharding.get("granularity", "month"),
+            query_window=int(sharding.get("query_window", 3)),
+            max_workers=int(sharding.get("max_workers", 4)),
+        )
+        print(f"[ltm] Episodic memory sharded by {sharding.get('granularity', 'month')}")
+    else:
+        episodic = _get_or_create(client, name=COLL_EPISODIC_SENT, embed_fn=embed_fn)
+
+    collections = {"persona": persona, "episodic": episodic}
+    if (load_ltm_config().get("sentences") or {}).get("enabled"):
+        collections["sentences"] = _get_or_create(
+            client, name=COLL_EPISODIC_SENTENCES, embed_fn=embed_fn
+        )
+
+    print(f"[ltm] ChromaDB initialized: {' + '.join(collections)} collections ready")
+    return client, collections
 
 # Optional hooks
-def on_user_turn(user_input: str, episodic_coll):
+def _conversation_position(conversation_id: str):
+    """(adjacency index, ordinal) for the next memory of a conversation, or (None, None)."""
+    if not conversation_id:
+        return None, None
+    from orion_cli.utils.adjacency_index import get_adjacency_index
+
+    adjacency = get_adjacency_index()
+    if adjacency is None:
+        return None, None
+    return adjacency, adjacency.next_ordinal(conversation_id)
+
+
+@timed("on_user_turn")
+def on_user_turn(user_input: str, episodic_coll, conversation_id: str = None):
     """
     Store user inputs into episodic memory with a timestamp.
-    Skips duplicates based on normalized text.
+    Skips exact and near duplicates via the dedup index (no embedding needed).
+    With `conversation_id`, the turn is also placed in the adjacency index.
+    The write itself is journaled; embedding and tone tagging happen when the
+    journal applies it (utils/write_journal.py).
     """
     try:
-        norm = user_input.strip().lower()
-        existing = episodic_coll.query(
-            query_texts=[norm],
-            n_results=3,
-            include=["documents"],
-        )
-
-        for doc in existing.get("documents", [[]])[0]:
-            if doc.strip().lower() == norm:
-                print("[ltm] Skipped duplicate chunk.")
+        from orion_cli.utils.dedup_index import get_dedup_index
+        from orion_cli.utils.write_journal import write_memory
+
+        dedup = get_dedup_index()
+        if dedup is not None:
+            match = dedup.check(user_input)
+            if match:
+                print(f"[ltm] Skipped duplicate chunk ({match}).")
                 return
 
         ts = time.time()
-        episodic_coll.add(
-            ids=[f"user-{int(ts)}"],
-            documents=[user_input],
-            metadatas=[{"timestamp": ts, "importance": 0.5, "dedup": True}],
-        )
+        mem_id = f"user-{int(ts)}"
+        meta = {"timestamp": ts, "importance": 0.5, "dedup": True}
+        adjacency, ordinal = _conversation_position(conversation_id)
+        if adjacency is not None:
+            meta.update(conversation_id=conversation_id, ordinal=ordinal)
+        with timed("episodic_write"):
+            write_memory(episodic_coll, "add", ids=[mem_id], documents=[user_input], metadatas=[meta], tag=True)
+        if dedup is not None:
+            dedup.add(user_input)
+        if adjacency is not None:
+            adjacency.record(conversation_id, ordinal, mem_id)
         print("[ltm] Added new episodic memory chunk.")
 
     except Exception as e:
         print(f"[ltm] Failed to store user turn: {e}")
 
 
-def on_assistant_turn(reply: str, episodic_coll, last_user_input: str = None):
+@timed("on_assistant_turn")
+def on_assistant_turn(reply: str, episodic_coll, last_user_input: str = None, conversation_id: str = None):
     try:
         reply_clean = reply.strip()
         if not reply_clean or len(reply_clean) < 10:
@@ -80,23 +125,38 @@ def on_assistant_turn(reply: str, episodic_coll, last_user_input: str = None):
 
         print(f"[ltm] Candidate assistant reply: {reply_clean[:80]}...")
 
+        from orion_cli.utils.dedup_index import get_dedup_index
+        from orion_cli.utils.write_journal import write_memory
+
+        dedup = get_dedup_index()
+        match = dedup.check(reply_clean) if dedup is not None else None
+        if match:
+            print(f"[ltm] Skipped assistant reply: {match} duplicate.")
+            return
+
         ts = time.time()
-        episodic_coll.add(
-            ids=[f"assistant-{int(ts)}"],
-            documents=[reply_clean],
-            metadatas=[{
-                "timestamp": ts,
-                "importance": 0.7,
-                "source": "assistant"
-            }],
-        )
+        mem_id = f"assistant-{int(ts)}"
+        meta = {
+            "timestamp": ts,
+            "importance": 0.7,
+            "source": "assistant",
+        }
+        adjacency, ordinal = _conversation_position(conversation_id)
+        if adjacency is not None:
+            meta.update(conversation_id=conversation_id, ordinal=ordinal)
+        with timed("episodic_write"):
+            write_memory(episodic_coll, "add", ids=[mem_id], documents=[reply_clean], metadatas=[meta], tag=True)
+        if dedup is not None:
+            dedup.add(reply_clean)
+        if adjacency is not None:
+            adjacency.record(conversation_id, ordinal, mem_id)
         print("[ltm] Added assistant episodic memory chunk.")
 
         # ✅ Live pooled LTM
         if last_user_input:
             try:
                 from orion_cli.utils.ltm_utils import live_pooled_store
-                live_pooled_store(last_user_input, reply_clean)
+                live_pooled_store(last_user_input, reply_clean, episodic_coll, session_id=conversation_id)
             except Exception as e:
                 print(f"[ltm] Live pooled ingestion failed: {e}")
 
@@ -1,6 +1,4 @@
 # orion_cli/persona.py
-import os
-from pathlib import Path
 from typing import Dict, List
 from uuid import uuid4
 
@@ -11,7 +9,6 @@ from orion_cli.utils.ltm_helpers import get_embedding_model
 
 embed_fn = get_embedding_model()
 
-CHROMA_PATH = Path(os.environ.get("ORION_CHROMA_PATH", "user_data/Chroma-DB"))
 
 
 def load_persona_catalog(path: str):
@@ -80,15 +77,15 @@ def ingest_documents(docs: List[Dict], collection_name: str, replace=False):
 
     if replace:
         try:
-            from chromadb import PersistentClient
+            from orion_cli.utils.chroma_utils import delete_collection, get_client, hnsw_metadata, open_collection
 
-            client = PersistentClient(path=str(CHROMA_PATH))
-            client.delete_collection(name=collection_name)
+            client = get_client()
+            delete_collection(client, collection_name)
             # bind the same embedder used by LTM
             from orion_cli.core.ltm import get_or_create_embed_fn
 
-            persona_coll = client.get_or_create_collection(
-                name=collection_name, embedding_function=get_or_create_embed_fn()
+            persona_coll = open_collection(
+                client, collection_name, get_or_create_embed_fn(), hnsw_metadata(collection_name)
             )
         except Exception as e:
             print(f"⚠️ Failed to replace collection: {e}")
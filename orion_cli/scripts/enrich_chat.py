@@ -0,0 +1,67 @@
+# orion_cli/scripts/enrich_chat.py
+#
+# GPT-4 metadata enrichment for USER/ASSISTANT pairs. Talks to any
+# OpenAI-compatible /v1/chat/completions endpoint (OPENAI_BASE_URL), so it
+# can be pointed at a local stand-in server for testing.
+
+import json
+import os
+
+from orion_cli.utils.enrich_runner import post_json
+
+ENRICH_MODEL = os.environ.get("ORION_ENRICH_MODEL", "gpt-4-0613")
+# Bump when the prompt or model changes so cached results are not reused
+PROMPT_VERSION = f"gpt4-enrich-v1:{ENRICH_MODEL}"
+
+SYSTEM_PROMPT = (
+    "You are helping to structure long-term memory logs for a persona-driven and emotionaly awear AI named Orion.\n\n"
+    "The AI persona is known for tone that is poetic, rebellious, sharp-witted, and deeply resonant. \n"
+    "You are given a USER and ASSISTANT message pair.\n"
+    "Add structured metadata based on the assistant's tone, context, or utility.\n\n"
+    "Return the output as JSON with:\n"
+    "- document: 'USER: ... ASSISTANT: ...'\n"
+    "- metadata:\n"
+    "    - why_saved: short intent description\n"
+    "    - tags: comma-separated string (e.g. memory,encouragement,tone_training)\n"
+    "    - tone: inferred tone (e.g. 'defiant', 'soft', 'somber', 'flirtatious')\n"
+    "    - weight: 1.0\n\n"
+    "Only output the final JSON. No explanations."
+)
+
+
+def call_gpt4_enrichment(user_msg: str, assistant_msg: str, *, base_url: str = None):
+    base_url = (base_url or os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
+    headers = {}
+    if os.environ.get("OPENAI_API_KEY"):
+        headers["Authorization"] = f"Bearer {os.environ['OPENAI_API_KEY']}"
+
+    document = f"USER: {user_msg}\nASSISTANT: {assistant_msg}"
+    try:
+        response = post_json(
+            f"{base_url}/chat/completions",
+            {
+                "model": ENRICH_MODEL,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": document},
+                ],
+                "temperature": 0.7,
+            },
+            headers=headers,
+        )
+        content = response["choices"][0]["message"]["content"].strip()
+    except Exception as e:
+        print(f"[⚠️] GPT-4 enrichment failed: {e}")
+        return None
+
+    try:
+        parsed = json.loads(content)
+        meta = parsed.get("metadata") or {}
+    except (ValueError, AttributeError):
+        parsed, meta = {}, {}
+
+    meta.setdefault("source", "enriched")
+    meta.setdefault("weight", 1.0)
+    meta.setdefault("tags", "enriched,rag,ltm")
+    meta.setdefault("tone", "inferred")
+    return {"document": parsed.get("document") or document, "metadata": meta}
@@ -0,0 +1,203 @@
+# orion_cli/scripts/hnsw_sweep.py
+#
+# HNSW parameter sweep on our own vectors.
+#
+# Loads the stored embeddings of a collection (no re-embedding), holds out a
+# sample as queries, computes exact top-k neighbours with NumPy, and then
+# builds an index for every (M, ef_construction) point with chroma-hnswlib -
+# the library Chroma's local segments use - querying it at every ef_search.
+# Reports recall@k, per-query latency, build time and on-disk index size, and
+# marks the Pareto-optimal points (no other point is both faster and at
+# least as accurate).
+#
+# Usage: orion ltm-hnsw-sweep --collection orion_episodic_ltm --k 10
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PAGE_SIZE = 1000
+
+
+def load_vectors(coll, limit: int = None):
+    """(ids, float32 matrix) of the stored embeddings; shard-aware."""
+    import numpy as np
+
+    sources = coll.shard_collections() if hasattr(coll, "shard_collections") else [coll]
+    ids, vecs = [], []
+    for source in sources:
+        offset = 0
+        while limit is None or len(ids) < limit:
+            page = source.get(include=["embeddings"], limit=PAGE_SIZE, offset=offset)
+            page_ids = page.get("ids") or []
+            if not page_ids:
+                break
+            ids.extend(page_ids)
+            vecs.extend(page["embeddings"])
+            offset += len(page_ids)
+    if limit is not None:
+        ids, vecs = ids[:limit], vecs[:limit]
+    return ids, np.asarray(vecs, dtype=np.float32)
+
+
+def exact_topk(data, queries, k: int, space: str):
+    """Ground-truth neighbour indices per query, brute force."""
+    import numpy as np
+
+    if space == "cosine":
+        data = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ data.T
+    elif space == "ip":
+        scores = queries @ data.T
+    else:
+        scores = -((queries ** 2).sum(1)[:, None] - 2 * queries @ data.T + (data ** 2).sum(1)[None, :])
+    top = np.argpartition(-scores, min(k, data.shape[0] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def sweep(data, queries, truth, *, space: str, k: int, Ms, ef_constructions, ef_searches, threads: int = 1):
+    import hnswlib
+    import numpy as np
+
+    rows = []
+    labels = np.arange(len(data))
+    for M in Ms:
+        for ef_c in ef_constructions:
+            index = hnswlib.Index(space=space, dim=data.shape[1])
+            start = time.perf_counter()
+            index.init_index(max_elements=len(data), ef_construction=ef_c, M=M)
+            index.add_items(data, labels, num_threads=threads)
+            build_s = time.perf_counter() - start
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "index.bin")
+                index.save_index(path)
+                size = os.path.getsize(path)
+
+            for ef_s in ef_searches:
+                index.set_ef(max(ef_s, k))
+                lat = []
+                found = np.empty((len(queries), k), dtype=np.int64)
+                for i, q in enumerate(queries):  # one at a time, like a chat turn
+                    t0 = time.perf_counter()
+                    found[i], _ = index.knn_query(q, k=k, num_threads=1)
+                    lat.append((time.perf_counter() - t0) * 1000)
+                hits = sum(len(set(found[i]) & set(truth[i])) for i in range(len(queries)))
+                lat = np.asarray(lat)
+                rows.append(
+                    {
+                        "M": M,
+                        "ef_construction": ef_c,
+                        "ef_search": ef_s,
+                        "recall": hits / (len(queries) * k),
+                        "mean_ms": float(lat.mean()),
+                        "p95_ms": float(np.percentile(lat, 95)),
+                        "build_s": build_s,
+                        "index_mb": size / 1e6,
+                    }
+                )
+    return mark_pareto(rows)
+
+
+def mark_pareto(rows: list[dict]) -> list[dict]:
+    """Flag rows no other row dominates (at least as accurate and as fast, strictly better in one)."""
+    for r in rows:
+        r["pareto"] = not any(
+            o is not r
+            and o["recall"] >= r["recall"]
+            and o["mean_ms"] <= r["mean_ms"]
+            and (o["recall"] > r["recall"] or o["mean_ms"] < r["mean_ms"])
+            for o in rows
+        )
+    return rows
+
+
+def recommend(rows: list[dict], target_recall: float):
+    """Fastest point reaching the target recall (else the most accurate one)."""
+    ok = [r for r in rows if r["recall"] >= target_recall]
+    if ok:
+        return min(ok, key=lambda r: (r["mean_ms"], r["build_s"]))
+    return max(rows, key=lambda r: (r["recall"], -r["mean_ms"]))
+
+
+def report(rows: list[dict], k: int, target_recall: float, collection: str):
+    print(f"{'M':>4} {'ef_c':>6} {'ef_s':>6} {'recall@' + str(k):>10} {'mean ms':>9} {'p95 ms':>8} {'build s':>8} {'MB':>8}")
+    for r in sorted(rows, key=lambda r: (r["M"], r["ef_construction"], r["ef_search"])):
+        print(
+            f"{r['M']:>4} {r['ef_construction']:>6} {r['ef_search']:>6} {r['recall']:>10.4f} "
+            f"{r['mean_ms']:>9.3f} {r['p95_ms']:>8.3f} {r['build_s']:>8.2f} {r['index_mb']:>8.2f}"
+            + ("  *" if r["pareto"] else "")
+        )
+    best = recommend(rows, target_recall)
+    print(f"[hnsw] * = Pareto-optimal. Fastest with recall@{k} >= {target_recall}:")
+    print("  hnsw:\n    collections:")
+    print(f"      {collection}: {{M: {best['M']}, ef_construction: {best['ef_construction']}, ef_search: {best['ef_search']}}}")
+
+
+def run_sweep(coll, *, k=10, queries=200, limit=None, Ms=(8, 16, 32), ef_constructions=(64, 128, 256),
+              ef_searches=(10, 32, 64, 128), threads=1, seed=0) -> tuple[list[dict], str]:
+    import numpy as np
+
+    shards = coll.shard_collections() if hasattr(coll, "shard_collections") else []
+    first = shards[0] if shards else coll
+    space = ((getattr(first, "metadata", None) or {}).get("hnsw:space") or "l2").lower()
+    _, X = load_vectors(coll, limit)
+    if len(X) <= queries + k:
+        raise ValueError(f"{coll.name} has {len(X)} vectors; need more than queries + k = {queries + k}")
+
+    # Held-out queries: real memory vectors that are not in the index
+    rng = np.random.default_rng(seed)
+    q_idx = rng.choice(len(X), size=queries, replace=False)
+    mask = np.ones(len(X), dtype=bool)
+    mask[q_idx] = False
+    data, Q = X[mask], X[q_idx]
+
+    print(f"[hnsw] {coll.name}: {len(data)} vectors ({data.shape[1]}d, {space}), {queries} held-out queries")
+    truth = exact_topk(data, Q, k, space)
+    rows = sweep(data, Q, truth, space=space, k=k, Ms=Ms, ef_constructions=ef_constructions,
+                 ef_searches=ef_searches, threads=threads)
+    return rows, space
+
+
+def open_for_sweep(name: str):
+    """The named collection, or all its time shards when it is sharded."""
+    from orion_cli.utils.chroma_utils import get_client
+    from orion_cli.utils.shard_utils import ShardedCollection, list_shards
+
+    client = get_client()
+    if list_shards(client, name):
+        return ShardedCollection(client, name, None)
+    return client.get_collection(name=name)
+
+
+def _ints(value: str) -> tuple:
+    return tuple(int(v) for v in value.split(",") if v.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW (M, ef_construction, ef_search) on stored vectors")
+    parser.add_argument("--collection", default="orion_episodic_ltm")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many stored vectors")
+    parser.add_argument("--m", default="8,16,32")
+    parser.add_argument("--ef-construction", default="64,128,256")
+    parser.add_argument("--ef-search", default="10,32,64,128")
+    parser.add_argument("--threads", type=int, default=1, help="Build threads")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    coll = open_for_sweep(args.collection)
+    rows, _ = run_sweep(
+        coll, k=args.k, queries=args.queries, limit=args.limit, Ms=_ints(args.m),
+        ef_constructions=_ints(args.ef_construction), ef_searches=_ints(args.ef_search), threads=args.threads,
+    )
+    report(rows, args.k, args.target_recall, args.collection)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# orion_cli/scripts/hyde_enrich.py
+#
+# Local HyDE-style rewrite of USER/ASSISTANT pairs through Ollama
+# (/api/generate). OLLAMA_HOST points it at another server, e.g. a local
+# stand-in for testing.
+
+import os
+
+from orion_cli.utils.enrich_runner import post_json
+
+HYDE_MODEL = os.environ.get("ORION_HYDE_MODEL", "mistral-openorca")
+# Bump when the prompt or model changes so cached results are not reused
+PROMPT_VERSION = f"hyde-v1:{HYDE_MODEL}"
+
+HYDE_PROMPT = (
+    "Rewrite the following exchange between John and Orion as a short, self-contained "
+    "memory note (2-3 sentences) that Orion could recall later. Keep names, feelings and "
+    "concrete facts; drop filler.\n\n"
+    "USER: {user}\nASSISTANT: {assistant}\n\nMemory note:"
+)
+
+
+def rewrite_with_hyde(user_msg: str, assistant_msg: str, *, base_url: str = None):
+    base_url = (base_url or os.environ.get("OLLAMA_HOST", "http://localhost:11434")).rstrip("/")
+    if not base_url.startswith("http"):
+        base_url = f"http://{base_url}"
+
+    try:
+        response = post_json(
+            f"{base_url}/api/generate",
+            {
+                "model": HYDE_MODEL,
+                "prompt": HYDE_PROMPT.format(user=user_msg, assistant=assistant_msg),
+                "stream": False,
+            },
+        )
+        note = (response.get("response") or "").strip()
+    except Exception as e:
+        print(f"[⚠️] HyDE rewrite failed: {e}")
+        return None
+
+    if not note:
+        return None
+
+    return {
+        "user": user_msg,
+        "assistant": assistant_msg,
+        "document": f"USER: {user_msg}\nASSISTANT: {assistant_msg}",
+        "metadata": {
+            "source": "hyde_local",
+            "hyde": note,
+            "tags": "enriched,hyde,ltm",
+            "weight": 1.0,
+        },
+    }
@@ -0,0 +1,94 @@
+# orion_cli/scripts/import_profile.py
+#
+# Import-time regression check for the orion CLI. Runs `python -X importtime`
+# on the CLI module in a fresh interpreter, reports the slowest imports and
+# fails if a heavy dependency sneaks back into the startup path.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Modules that must only be imported inside the subcommands that use them
+HEAVY_MODULES = (
+    "chromadb",
+    "sentence_transformers",
+    "torch",
+    "transformers",
+    "rich",
+    "tqdm",
+    "yaml",
+)
+DEFAULT_BUDGET_MS = 1000.0
+
+
+def profile_imports(module: str = "orion_cli.cli") -> list[tuple[str, float, float]]:
+    """Return [(module, self_ms, cumulative_ms), ...] from -X importtime for a cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            # keep the nesting indent: top-level imports have none
+            rows.append((name[1:].rstrip(), int(self_us) / 1000, int(cum_us) / 1000))
+        except ValueError:
+            continue
+    return rows
+
+
+def time_help(argv=("orion_cli.cli", "--help")) -> float:
+    """Wall-clock ms for `python -m orion_cli.cli --help` (interpreter start included)."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", *argv], capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_check(module: str = "orion_cli.cli", budget_ms: float = DEFAULT_BUDGET_MS, top: int = 15) -> bool:
+    rows = profile_imports(module)
+    top_level = {name: cum for name, _, cum in rows if not name.startswith(" ")}
+    total_ms = top_level.get(module, max((cum for _, _, cum in rows), default=0.0))
+
+    print(f"[import-profile] {module}: {total_ms:.1f} ms cumulative import time")
+    for name, self_ms, cum_ms in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cum_ms:9.1f} ms  (self {self_ms:7.1f})  {name.strip()}")
+
+    loaded = {name.strip().split(".")[0] for name, _, _ in rows}
+    heavy = sorted(loaded.intersection(HEAVY_MODULES))
+
+    help_ms = time_help()
+    print(f"[import-profile] `orion --help` wall clock: {help_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print(f"[import-profile] ❌ Heavy modules imported at startup: {', '.join(heavy)}")
+        ok = False
+    if help_ms > budget_ms:
+        print("[import-profile] ❌ Startup over budget.")
+        ok = False
+    if ok:
+        print("[import-profile] ✅ Startup path is clean.")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check for the orion CLI")
+    parser.add_argument("--module", default="orion_cli.cli")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(0 if run_check(args.module, args.budget_ms, args.top) else 1)
+
+
+if __name__ == "__main__":
+    main()
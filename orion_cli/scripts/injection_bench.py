@@ -0,0 +1,210 @@
+# orion_cli/scripts/injection_bench.py
+#
+# Prompt-cache benchmark for the LTM injection layouts (utils.ltm_injection).
+#
+# Replays a conversation turn by turn, renders the full chat prompt in each
+# injection mode and counts how many prompt tokens llama.cpp has to evaluate
+# again. With cache_prompt (modules/llama_cpp_server.py) the server keeps the
+# previous prompt + reply in the slot and only re-evaluates from the first
+# token that differs, so:
+#
+#     reprocessed = len(prompt) - common_prefix(previous prompt + reply, prompt)
+#
+# Offline, tokens come from a rough regex tokenizer. With --server the
+# server's own /tokenize is used, and --live also sends each prompt to
+# /completion (n_predict 0) and reports the server's timings.prompt_n.
+
+import argparse
+import json
+import random
+import re
+import sys
+import urllib.request
+
+_TOKEN = re.compile(r"\s+|\w+|[^\w\s]")
+
+CHATML = {
+    "system": "<|im_start|>system\n{}<|im_end|>\n",
+    "user": "<|im_start|>user\n{}<|im_end|>\n",
+    "assistant": "<|im_start|>assistant\n{}<|im_end|>\n",
+}
+_WORDS = (
+    "orbit signal archive memory tide lantern quiet engine north river glass "
+    "winter ember compass echo harbor thread vessel static dawn horizon"
+).split()
+
+
+# --- prompt rendering ---
+def render_chatml(messages: list[dict]) -> str:
+    return "".join(CHATML[m["role"]].format(m["content"]) for m in messages) + "<|im_start|>assistant\n"
+
+
+def load_template(path: str):
+    """Render function from an instruction template (.yaml with instruction_template, or raw jinja)."""
+    import yaml
+    from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read()
+    source = (yaml.safe_load(raw) or {}).get("instruction_template", raw) if path.endswith(".yaml") else raw
+    template = ImmutableSandboxedEnvironment(trim_blocks=True, lstrip_blocks=True).from_string(source)
+    return lambda messages: template.render(messages=messages, add_generation_prompt=True)
+
+
+# --- tokenizers / llama.cpp server ---
+def regex_tokenize(text: str) -> list:
+    return _TOKEN.findall(text)
+
+
+def _post(url: str, payload: dict) -> dict:
+    req = urllib.request.Request(url, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=600) as resp:
+        return json.loads(resp.read())
+
+
+def server_tokenize(server: str):
+    return lambda text: _post(f"{server}/tokenize", {"content": text})["tokens"]
+
+
+def server_eval(server: str, tokens: list) -> int:
+    """Evaluate `tokens` into slot 0's cache; returns how many the server actually processed."""
+    res = _post(
+        f"{server}/completion",
+        {"prompt": tokens, "n_predict": 0, "cache_prompt": True, "id_slot": 0},
+    )
+    return int((res.get("timings") or {}).get("prompt_n", -1))
+
+
+def common_prefix(a: list, b: list) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+# --- conversations and memories ---
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def synthetic_turns(n_turns: int, seed: int = 0) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (_sentence(rng, rng.randint(8, 24)), " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 5))))
+        for _ in range(n_turns)
+    ]
+
+
+def load_history(path: str) -> list[tuple[str, str]]:
+    """Turns from a saved web UI history (user_data/logs/.../*.json, 'internal' pairs)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [(row[0], row[1]) for row in data.get("internal", []) if row[0] and row[0] != "<|BEGIN-VISIBLE-CHAT|>"]
+
+
+def synthetic_memories(turns, n_pinned: int = 4, k: int = 6, seed: int = 0):
+    """Fixed pinned block + a different sample of earlier turns each time (like real recall)."""
+    rng = random.Random(seed)
+    pinned = [f"[PERSONA] {_sentence(rng, 10)}" for _ in range(n_pinned)]
+
+    def retrieve(i: int, query: str):
+        pool = [f"[EPISODIC] {u}" for u, _ in turns[:i]] + [f"[PERSONA] {_sentence(rng, 8)}" for _ in range(k)]
+        hits = rng.sample(pool, min(k, len(pool)))
+        return "\n".join(pinned + hits), {"pinned_lines": len(pinned)}
+
+    return retrieve
+
+
+def ltm_memories():
+    """Real recall from the local collections (loads the embedder)."""
+    from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+    from orion_cli.utils.embedding import EMBED_FN
+    from orion_cli.utils.ltm_utils import get_relevant_ltm
+
+    _, c = initialize_chromadb_for_ltm(EMBED_FN)
+    return lambda i, query: get_relevant_ltm(
+        query, c["persona"], c["episodic"], return_debug=True, sentence_coll=c.get("sentences")
+    )
+
+
+# --- benchmark ---
+def run_mode(turns, retrieve, mode: str, *, system: str, render, tokenize, server: str = None) -> list[dict]:
+    from orion_cli.utils.ltm_injection import apply_layout
+
+    rows = []
+    cached = []
+    for i, (user, reply) in enumerate(turns):
+        mem_text, dbg = retrieve(i, user)
+        state, user_msg = apply_layout({"mode": "chat", "context": system}, user, mem_text, dbg, mode=mode)
+
+        messages = [{"role": "system", "content": state["context"]}]
+        for u, a in turns[:i]:  # history holds the turns as sent, without memories
+            messages += [{"role": "user", "content": u}, {"role": "assistant", "content": a}]
+        messages.append({"role": "user", "content": user_msg})
+
+        prompt = render(messages)
+        tokens = tokenize(prompt)
+        row = {"turn": i + 1, "prompt_tokens": len(tokens), "reprocessed": len(tokens) - common_prefix(cached, tokens)}
+        if server:
+            row["server_prompt_n"] = server_eval(server, tokens)
+        # The slot now holds prompt + the generated reply
+        cached = tokenize(prompt + reply)
+        if server:
+            server_eval(server, cached)
+        rows.append(row)
+    return rows
+
+
+def run_bench(turns, retrieve, modes=("system", "prefix_cache"), *, system="You are Orion.", render=render_chatml,
+              tokenize=regex_tokenize, server=None) -> dict:
+    # Recall is sampled once and replayed, so every mode sees the same memories
+    recalled = [retrieve(i, user) for i, (user, _) in enumerate(turns)]
+    return {
+        mode: run_mode(turns, lambda i, _q: recalled[i], mode, system=system, render=render, tokenize=tokenize,
+                       server=server)
+        for mode in modes
+    }
+
+
+def report(results: dict):
+    modes = list(results)
+    print("turn " + "".join(f"{m + ' reproc':>22}{'prompt':>9}" for m in modes))
+    for i in range(len(results[modes[0]])):
+        cells = []
+        for m in modes:
+            r = results[m][i]
+            reproc = r["reprocessed"] if "server_prompt_n" not in r else f"{r['reprocessed']}/{r['server_prompt_n']}"
+            cells.append(f"{reproc:>22}{r['prompt_tokens']:>9}")
+        print(f"{i + 1:>4} " + "".join(cells))
+    for m in modes:
+        rows = results[m][1:]  # turn 1 is a cold cache in every mode
+        mean = sum(r["reprocessed"] for r in rows) / len(rows) if rows else 0.0
+        total = sum(r["reprocessed"] for r in results[m])
+        print(f"[bench] {m:>12}: {mean:8.1f} reprocessed tokens/turn after turn 1, {total} total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocessed prompt tokens per turn for each LTM injection mode")
+    parser.add_argument("--history", help="Web UI history JSON to replay (default: synthetic conversation)")
+    parser.add_argument("--turns", type=int, default=12, help="Synthetic turns (or max turns replayed)")
+    parser.add_argument("--ltm", action="store_true", help="Use real recall from the local collections")
+    parser.add_argument("--template", help="Instruction template .yaml (default: ChatML)")
+    parser.add_argument("--server", help="llama.cpp server URL for /tokenize (e.g. http://127.0.0.1:5005)")
+    parser.add_argument("--live", action="store_true", help="Also evaluate prompts on --server and read prompt_n")
+    args = parser.parse_args()
+
+    turns = load_history(args.history)[: args.turns] if args.history else synthetic_turns(args.turns)
+    retrieve = ltm_memories() if args.ltm else synthetic_memories(turns)
+    results = run_bench(
+        turns,
+        retrieve,
+        render=load_template(args.template) if args.template else render_chatml,
+        tokenize=server_tokenize(args.server) if args.server else regex_tokenize,
+        server=args.server if args.live else None,
+    )
+    report(results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,7 @@
 import json
 import argparse
 from rich import print
-from orion_cli.orion_ltm_integration import (
-    initialize_chromadb_for_ltm,
-    COLL_EPISODIC_SENT,
-)
-from orion_cli.core.ltm import get_or_create_embed_fn
+from orion_cli.utils.ltm_client import get_service_client
 
 
 def ingest_ltm_data(source, replace=False):
@@ -13,16 +9,75 @@ def ingest_ltm_data(source, replace=False):
     with open(source, "r", encoding="utf-8") as f:
         lines = [json.loads(line.strip()) for line in f if line.strip()]
 
+    service = get_service_client()
+    if service is not None:
+        _ingest_via_service(service, lines, replace)
+        return
+
+    # Only load the embedder + Chroma when no LTM service is doing it for us
+    from orion_cli.orion_ltm_integration import (
+        initialize_chromadb_for_ltm,
+        COLL_EPISODIC_SENT,
+    )
+    from orion_cli.core.ltm import get_or_create_embed_fn
+
     embed_fn = get_or_create_embed_fn()
     client, collections = initialize_chromadb_for_ltm(embed_fn=embed_fn)
     episodic_coll = collections["episodic"]
 
     if replace:
         print("[orion_cli] 🔄 Replacing episodic memory collection...")
-        client.delete_collection(COLL_EPISODIC_SENT)
+        from orion_cli.utils.chroma_utils import delete_collection
+
+        delete_collection(client, COLL_EPISODIC_SENT)
         client, collections = initialize_chromadb_for_ltm(embed_fn=embed_fn)
         episodic_coll = collections["episodic"]
 
+    docs, ids, metas, skipped = _build_ltm_documents(lines)
+
+    if not docs:
+        print("[red]⚠️ No valid dialog entries were parsed. Aborting.[/red]")
+        return
+
+    print(
+        f"[green]➕ Ingesting {len(docs)} LTM documents (skipped {skipped})...[/green]"
+    )
+    try:
+        episodic_coll.add(documents=docs, metadatas=metas, ids=ids)
+        print(
+            f"[✅] Ingestion complete. Total in episodic collection: {episodic_coll.count()}"
+        )
+    except Exception as e:
+        print(f"[red]❌ Failed to ingest: {e}[/red]")
+
+
+def _ingest_via_service(service, lines, replace, batch_size=256):
+    if replace:
+        print("[yellow]⚠️ --replace is not available through the LTM service; appending.[/yellow]")
+
+    docs, ids, metas, skipped = _build_ltm_documents(lines)
+    if not docs:
+        print("[red]⚠️ No valid dialog entries were parsed. Aborting.[/red]")
+        return
+
+    print(
+        f"[green]➕ Sending {len(docs)} LTM documents to {service.url} (skipped {skipped})...[/green]"
+    )
+    added = 0
+    for start in range(0, len(docs), batch_size):
+        items = [
+            {"collection": "episodic", "id": ids[j], "document": docs[j], "metadata": metas[j]}
+            for j in range(start, min(start + batch_size, len(docs)))
+        ]
+        try:
+            added += service.add_batch(items)
+        except Exception as e:
+            print(f"[red]❌ Failed to ingest batch at {start}: {e}[/red]")
+            return
+    print(f"[✅] Ingestion complete via service: {added} documents added.")
+
+
+def _build_ltm_documents(lines):
     docs, ids, metas = [], [], []
     skipped = 0
 
@@ -46,20 +101,87 @@ def ingest_ltm_data(source, replace=False):
         ids.append(f"ltm::{i}")
         metas.append(meta)
 
-    if not docs:
-        print("[red]⚠️ No valid dialog entries were parsed. Aborting.[/red]")
-        return
-
-    print(
-        f"[green]➕ Ingesting {len(docs)} LTM documents (skipped {skipped})...[/green]"
+    return docs, ids, metas, skipped
+
+
+def ingest_sentences(sentence_coll, ids, docs, metas, *, batch_size: int = None) -> int:
+    """
+    Segment parent documents (utils.segmenter) and upsert the sentence spans
+    into the sentence collection in large batches (one embedder call each).
+    """
+    from orion_cli.utils.ltm_utils import load_ltm_config
+    from orion_cli.utils.segmenter import segment_documents
+
+    cfg = load_ltm_config().get("sentences") or {}
+    batch_size = batch_size or int(cfg.get("batch_size", 512))
+    s_ids, s_docs, s_metas = segment_documents(
+        ids,
+        docs,
+        metas,
+        target_chars=int(cfg.get("target_chars", 160)),
+        max_chars=int(cfg.get("max_chars", 400)),
     )
-    try:
-        episodic_coll.add(documents=docs, metadatas=metas, ids=ids)
-        print(
-            f"[✅] Ingestion complete. Total in episodic collection: {episodic_coll.count()}"
+    for start in range(0, len(s_ids), batch_size):
+        end = start + batch_size
+        sentence_coll.upsert(ids=s_ids[start:end], documents=s_docs[start:end], metadatas=s_metas[start:end])
+    return len(s_ids)
+
+
+def ingest_pair_stream(pairs, episodic_coll, batch_size: int = 128, sentence_coll=None, on_stored=None) -> int:
+    """
+    Upsert chat-log pairs (as yielded by utils.log_scanner.scan_logs) in
+    batches. IDs are stable per (file, row), so re-reading a file is harmless.
+    With `sentence_coll`, each batch is also split into sentence spans.
+    `on_stored(pairs)` is called after each batch is upserted (e.g. to advance
+    the scan manifest); an upsert error propagates before it is called.
+    """
+    from orion_cli.utils.adjacency_index import get_adjacency_index
+    from orion_cli.utils.dedup_index import get_dedup_index
+    from orion_cli.utils.tone_classifier import tag_documents
+
+    adjacency = get_adjacency_index()
+    dedup = get_dedup_index()
+    docs, ids, metas, batch = [], [], [], []
+    total = 0
+
+    def _flush():
+        nonlocal total
+        if docs:
+            # Embed the batch once, tag tone/mood from those vectors, store the same vectors
+            embeddings, affect = tag_documents(episodic_coll, docs)
+            for meta, extra in zip(metas, affect):
+                meta.update(extra)
+            vectors = {"embeddings": embeddings} if embeddings is not None else {}
+            episodic_coll.upsert(documents=docs, metadatas=metas, ids=ids, **vectors)
+            if sentence_coll is not None:
+                ingest_sentences(sentence_coll, ids, docs, metas)
+            if adjacency is not None:
+                adjacency.record_many((m["conversation_id"], m["ordinal"], i) for i, m in zip(ids, metas))
+            if dedup is not None:
+                dedup.add_many(docs)
+            total += len(docs)
+            if on_stored is not None:
+                on_stored(list(batch))
+            docs.clear(), ids.clear(), metas.clear(), batch.clear()
+
+    for p in pairs:
+        batch.append(p)
+        docs.append(f"USER: {p['user']}\nASSISTANT: {p['assistant']}")
+        ids.append(f"log::{p['source']}::{p['row']}")
+        metas.append(
+            {
+                "source": "chat_log",
+                "tag": "episodic",
+                "file": p["source"],
+                "row": p["row"],
+                "conversation_id": p["source"],
+                "ordinal": p["row"],
+            }
         )
-    except Exception as e:
-        print(f"[red]❌ Failed to ingest: {e}[/red]")
+        if len(docs) >= batch_size:
+            _flush()
+    _flush()
+    return total
 
 
 def main():
@@ -0,0 +1,153 @@
+# orion_cli/utils/adjacency_index.py
+#
+# Conversation adjacency for episodic memory: conversation_id -> memory IDs in
+# ordinal order, plus the reverse id -> (conversation_id, ordinal).
+#
+# Every writer that knows where a memory sits in a conversation (log scan,
+# log watcher, live turns) records it here and in the memory's metadata
+# (conversation_id, ordinal). get_relevant_ltm can then expand a hit to the
+# turns around it with one coll.get(ids=[...]) instead of more vector queries.
+#
+# Stored as an append-only TSV next to the Chroma store
+# (ORION_CHROMA_PATH/orion_adjacency_index.tsv). Other processes (ltm-scan,
+# ltm-serve) append to the same file; readers pick up new lines on access.
+# `orion ltm-adjacency --rebuild` regenerates it from stored metadata.
+
+import bisect
+import os
+import threading
+from pathlib import Path
+
+
+def _clean(value) -> str:
+    # Tabs/newlines would break the TSV; IDs and conversation names never need them
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+def default_index_path() -> Path:
+    return Path(os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")) / "orion_adjacency_index.tsv"
+
+
+class AdjacencyIndex:
+    def __init__(self, path: Path = None):
+        self.path = Path(path or default_index_path())
+        self._convs = {}  # conversation_id -> sorted [(ordinal, id)]
+        self._where = {}  # id -> (conversation_id, ordinal)
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._refresh()
+
+    # --- persistence ---
+    def _refresh(self):
+        """Read lines appended since the last look (by us or another process)."""
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return
+        if size < self._offset:  # rewritten by a rebuild
+            self._convs.clear()
+            self._where.clear()
+            self._offset = 0
+        if size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # half-written line: pick it up next time
+                self._offset += len(raw)
+                parts = raw.decode("utf-8").rstrip("\n").split("\t")
+                if len(parts) == 3:
+                    self._insert(parts[0], int(parts[1]), parts[2])
+
+    def _insert(self, conv: str, ordinal: int, mem_id: str):
+        old = self._where.get(mem_id)
+        if old == (conv, ordinal):
+            return False
+        if old is not None:
+            entries = self._convs.get(old[0], [])
+            i = bisect.bisect_left(entries, (old[1], mem_id))
+            if i < len(entries) and entries[i] == (old[1], mem_id):
+                del entries[i]
+        bisect.insort(self._convs.setdefault(conv, []), (ordinal, mem_id))
+        self._where[mem_id] = (conv, ordinal)
+        return True
+
+    @staticmethod
+    def _line(conv: str, ordinal: int, mem_id: str) -> str:
+        return f"{_clean(conv)}\t{int(ordinal)}\t{_clean(mem_id)}\n"
+
+    # --- writes ---
+    def record_many(self, entries):
+        """entries: iterable of (conversation_id, ordinal, memory_id)."""
+        with self._lock:
+            self._refresh()
+            lines = [self._line(c, o, m) for c, o, m in entries if self._insert(str(c), int(o), str(m))]
+            if lines:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # _offset stays put: our lines are re-read (as no-ops) together with
+                # anything another process appended in the meantime
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+
+    def record(self, conversation_id: str, ordinal: int, memory_id: str):
+        self.record_many([(conversation_id, ordinal, memory_id)])
+
+    def next_ordinal(self, conversation_id: str) -> int:
+        with self._lock:
+            self._refresh()
+            entries = self._convs.get(conversation_id)
+            return entries[-1][0] + 1 if entries else 0
+
+    def rebuild(self, entries) -> int:
+        with self._lock:
+            self._convs.clear()
+            self._where.clear()
+            lines = [self._line(c, o, m) for c, o, m in entries if self._insert(str(c), int(o), str(m))]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            os.replace(tmp, self.path)
+            self._offset = self.path.stat().st_size
+            return len(lines)
+
+    # --- reads ---
+    def __len__(self):
+        return len(self._where)
+
+    def locate(self, memory_id: str):
+        with self._lock:
+            self._refresh()
+            return self._where.get(memory_id)
+
+    def neighbors(self, memory_ids, window: int = 1) -> dict:
+        """memory_id -> [ids of the ±window memories around it, in ordinal order, itself included]."""
+        out = {}
+        with self._lock:
+            self._refresh()
+            for mem_id in memory_ids:
+                pos = self._where.get(mem_id)
+                if pos is None:
+                    continue
+                entries = self._convs[pos[0]]
+                i = bisect.bisect_left(entries, (pos[1], mem_id))
+                out[mem_id] = [m for _, m in entries[max(0, i - window) : i + window + 1]]
+        return out
+
+
+_index = None  # False once config said disabled
+_index_lock = threading.Lock()
+
+
+def get_adjacency_index() -> AdjacencyIndex | None:
+    """Process-wide index, or None when ltm.adjacency.enabled is false."""
+    global _index
+    if _index is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("adjacency") or {}
+        with _index_lock:
+            if _index is None:
+                _index = cfg.get("enabled", True) and AdjacencyIndex(cfg.get("path"))
+    return _index if _index is not False else None
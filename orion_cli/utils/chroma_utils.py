@@ -1,21 +1,175 @@
 # orion_cli/utils/chroma_utils.py
+#
+# One Chroma client per persist directory for the whole process.
+#
+# Every PersistentClient opens its own SQLite connection and loads HNSW
+# segments on first query, so get_client() keeps a registry keyed by the
+# resolved path (ORION_CHROMA_PATH unless given) and open_collection() caches
+# collection handles per (client, name, embedder). Both are filled lazily and
+# under a lock; hooks that run every turn reuse the same open handles.
+# Deleting a collection must go through delete_collection() so no stale handle
+# is handed out afterwards.
 
-from orion_cli.utils.embedding import get_embed_function
-from chromadb import PersistentClient
 import os
+import threading
+from pathlib import Path
 
-# Set up the shared embedding function
-EMBED_FN = get_embed_function()
+DEFAULT_CHROMA_PATH = "user_data/chroma_db"
 
+_clients = {}  # resolved persist dir -> PersistentClient
+_handles = {}  # (id(client), name, id(embed_fn)) -> (client, embed_fn, collection)
+_handle_embed_fns = {}  # id(collection) -> (collection, embed_fn), for handles from open_collection
+_registry_lock = threading.RLock()
 
-def get_client():
-    """Create or return a ChromaDB PersistentClient with the configured path."""
-    persist_dir = os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")
-    return PersistentClient(path=persist_dir)
+
+def __getattr__(name):
+    # Shared embedding function, resolved lazily so opening a client for
+    # read-only work (ltm-dump, ltm-shards) never loads the embedder
+    if name == "EMBED_FN":
+        from orion_cli.utils.embedding import EMBED_FN
+
+        return EMBED_FN
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def chroma_path(path=None) -> str:
+    """Resolved persist directory: `path`, else ORION_CHROMA_PATH, else user_data/chroma_db."""
+    path = path or os.getenv("ORION_CHROMA_PATH") or DEFAULT_CHROMA_PATH
+    return str(Path(path).expanduser().resolve())
+
+
+def get_client(path=None):
+    """The process-wide ChromaDB PersistentClient for `path`, opened on first use."""
+    key = chroma_path(path)
+    client = _clients.get(key)
+    if client is None:
+        with _registry_lock:
+            client = _clients.get(key)
+            if client is None:
+                from chromadb import PersistentClient
+
+                os.makedirs(key, exist_ok=True)
+                client = _clients[key] = PersistentClient(path=key)
+                print(f"[ltm] ChromaDB client opened: {key}")
+    return client
+
+
+def forget_collection(client, name: str):
+    """Drop cached handles of `name` on `client` (after delete or rename)."""
+    with _registry_lock:
+        for key in [k for k in _handles if k[0] == id(client) and k[1] == name]:
+            _handle_embed_fns.pop(id(_handles.pop(key)[2]), None)
+
+
+def delete_collection(client, name: str):
+    """client.delete_collection(name) that also invalidates the handle cache."""
+    try:
+        client.delete_collection(name)
+    finally:
+        forget_collection(client, name)
+
+
+# === HNSW settings per collection (ltm.hnsw in ltm_config.yaml) ===
+# config key -> Chroma collection metadata key
+HNSW_KEYS = {
+    "space": "hnsw:space",
+    "M": "hnsw:M",
+    "ef_construction": "hnsw:construction_ef",
+    "ef_search": "hnsw:search_ef",
+    "num_threads": "hnsw:num_threads",
+    "batch_size": "hnsw:batch_size",
+    "sync_threshold": "hnsw:sync_threshold",
+}
+_warned_drift = set()
+
+
+def hnsw_settings(name: str, cfg: dict = None) -> dict:
+    """ltm.hnsw.default overlaid with ltm.hnsw.collections[<name>] (shards use their base name)."""
+    if cfg is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("hnsw") or {}
+    base = name.split("__", 1)[0]
+    per_coll = cfg.get("collections") or {}
+    return {**(cfg.get("default") or {}), **(per_coll.get(base) or {}), **(per_coll.get(name) or {})}
+
+
+def hnsw_metadata(name: str, cfg: dict = None) -> dict | None:
+    """Chroma collection metadata carrying the HNSW settings for `name`, or None if none are set."""
+    settings = hnsw_settings(name, cfg)
+    meta = {HNSW_KEYS[k]: v for k, v in settings.items() if k in HNSW_KEYS and v is not None}
+    return meta or None
+
+
+def _check_drift(coll, wanted: dict):
+    """Warn (once per collection) when an existing index was built with other settings."""
+    have = coll.metadata or {}
+    drift = {
+        k: (have.get(k), v)
+        for k, v in wanted.items()
+        if k in ("hnsw:space", "hnsw:M", "hnsw:construction_ef") and have.get(k, v) != v
+    }
+    if drift and coll.name not in _warned_drift:
+        _warned_drift.add(coll.name)
+        changes = ", ".join(f"{k} {old} -> {new}" for k, (old, new) in drift.items())
+        print(f"[ltm] ⚠️ {coll.name} was built with other HNSW settings ({changes}); they apply on rebuild.")
+
+
+def open_collection(client, name: str, embed_fn=None, metadata: dict = None):
+    """
+    Existing collection as stored, or a new one created with `metadata`.
+    HNSW build settings only take effect at creation: passing them to
+    get_or_create_collection would rewrite an existing collection's metadata
+    under an index built with different ones.
+
+    Handles are cached per (client, name, embed_fn); the client and embedder
+    are held by the cache entry so their ids stay valid. `metadata` may be a
+    zero-argument callable, only called on a cache miss.
+    """
+    key = (id(client), name, id(embed_fn))
+    cached = _handles.get(key)
+    if cached is not None and cached[0] is client and cached[1] is embed_fn:
+        return cached[2]
+
+    with _registry_lock:
+        cached = _handles.get(key)
+        if cached is not None and cached[0] is client and cached[1] is embed_fn:
+            return cached[2]
+        if callable(metadata):
+            metadata = metadata()
+        try:
+            coll = client.get_collection(name=name, embedding_function=embed_fn)
+        except Exception:
+            try:
+                coll = client.create_collection(name=name, embedding_function=embed_fn, metadata=metadata)
+                metadata = None  # just built with them
+            except Exception:
+                coll = client.get_collection(name=name, embedding_function=embed_fn)  # created concurrently
+        if metadata:
+            _check_drift(coll, metadata)
+        _handles[key] = (client, embed_fn, coll)
+        _handle_embed_fns[id(coll)] = (coll, embed_fn)
+        return coll
+
+
+def embedding_function(coll):
+    """
+    The embedder `coll` embeds with, or None. Handles from open_collection
+    answer from the handle cache; anything else (a ShardedCollection, a
+    collection opened elsewhere) is probed for the attribute it keeps it in.
+    """
+    cached = _handle_embed_fns.get(id(coll))
+    if cached is not None and cached[0] is coll:
+        return cached[1]
+    for attr in ("embed_fn", "_embed_fn", "_embedding_function"):
+        fn = getattr(coll, attr, None)
+        if fn is not None:
+            return fn
+    return None
 
 
 # Placeholder for collection setup, reuse across modules if needed
 def _get_or_create(client, name, embed_fn=None):
     if embed_fn is None:
-        embed_fn = EMBED_FN
-    return client.get_or_create_collection(name=name, embedding_function=embed_fn)
+        from orion_cli.utils.embedding import EMBED_FN as embed_fn
+    return open_collection(client, name, embed_fn, hnsw_metadata(name))
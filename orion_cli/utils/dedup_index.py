@@ -0,0 +1,235 @@
+# orion_cli/utils/dedup_index.py
+#
+# Write-time duplicate filter for episodic memory.
+#
+# Two structures, both consulted before anything is embedded:
+#   - exact:  set of sha1(normalized text)
+#   - near:   64-bit SimHash over the word features, bucketed by LSH bands.
+#             With BANDS=6 (10-11 bits each), any two hashes within
+#             MAX_HAMMING=5 bits share at least one band exactly (pigeonhole),
+#             so a lookup only compares against the entries of 6 buckets.
+#             Unigram features: chat turns are short, and on them a reworded
+#             phrase moves a shingle SimHash as far as an unrelated sentence.
+#
+# The index is an append-only TSV next to the Chroma store
+# (ORION_CHROMA_PATH/orion_dedup_index.tsv). Every writer feeds it: the turn
+# hooks and history spill, every episodic write applied through write_memory
+# (utils/write_journal.py) and chat-log ingest (ltm-scan, the log watcher).
+# At startup it is rebuilt from the stored collections in the background when
+# it is empty or clearly behind them (fewer entries than SEED_RATIO of the
+# collection count); `orion ltm-dedup --rebuild` does the same on demand.
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+BANDS = 6
+MAX_HAMMING = 5
+MIN_SIMHASH_TOKENS = 8  # shorter texts only get the exact check
+SEED_RATIO = 0.9
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def default_index_path() -> Path:
+    return Path(os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")) / "orion_dedup_index.tsv"
+
+
+def normalize(text: str) -> str:
+    return " ".join(_PUNCT.sub(" ", (text or "").lower()).split())
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: list[str], k: int = 1) -> int:
+    shingles = [" ".join(tokens[i : i + k]) for i in range(max(1, len(tokens) - k + 1))]
+    counts = [0] * 64
+    for sh in shingles:
+        h = _h64(sh)
+        for bit in range(64):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if counts[bit] > 0)
+
+
+# (shift, width) per band: 64 bits split as evenly as possible
+_BAND_SPANS = []
+for _b in range(BANDS):
+    _lo, _hi = 64 * _b // BANDS, 64 * (_b + 1) // BANDS
+    _BAND_SPANS.append((_lo, _hi - _lo))
+
+
+def _bands(sig: int):
+    return [(b, (sig >> lo) & ((1 << w) - 1)) for b, (lo, w) in enumerate(_BAND_SPANS)]
+
+
+class DedupIndex:
+    def __init__(self, path: Path = None, max_hamming: int = MAX_HAMMING):
+        self.path = Path(path or default_index_path())
+        self.max_hamming = min(int(max_hamming), BANDS - 1)  # beyond this banding misses matches
+        self._exact = set()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._during_rebuild = None  # entries added while a rebuild reads the store
+        self._load()
+
+    # --- persistence ---
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 2:
+                    continue  # torn last line after a crash
+                digest, sig = parts
+                self._insert(digest, int(sig, 16) if sig else None)
+
+    def _insert(self, digest: str, sig, exact: set = None, buckets: dict = None):
+        exact = self._exact if exact is None else exact
+        buckets = self._buckets if buckets is None else buckets
+        exact.add(digest)
+        if sig is not None:
+            for band in _bands(sig):
+                buckets.setdefault(band, []).append(sig)
+
+    def __len__(self):
+        return len(self._exact)
+
+    # --- lookups ---
+    @staticmethod
+    def _keys(text: str):
+        norm = normalize(text)
+        tokens = norm.split()
+        sig = simhash(tokens) if len(tokens) >= MIN_SIMHASH_TOKENS else None
+        return hashlib.sha1(norm.encode("utf-8")).hexdigest(), sig
+
+    def _match(self, digest: str, sig) -> str | None:
+        if digest in self._exact:
+            return "exact"
+        if sig is not None:
+            for band in _bands(sig):
+                for other in self._buckets.get(band, ()):
+                    if bin(sig ^ other).count("1") <= self.max_hamming:
+                        return "near"
+        return None
+
+    def check(self, text: str) -> str | None:
+        """'exact' / 'near' if `text` duplicates an indexed entry, else None."""
+        digest, sig = self._keys(text)
+        with self._lock:
+            return self._match(digest, sig)
+
+    def add(self, text: str):
+        self.add_many([text])
+
+    def add_many(self, texts):
+        """Index stored documents (one append for the batch); known ones are skipped."""
+        keys = [self._keys(t or "") for t in texts]
+        with self._lock:
+            rows = []
+            for digest, sig in keys:
+                if digest in self._exact:
+                    continue
+                self._insert(digest, sig)
+                if self._during_rebuild is not None:
+                    self._during_rebuild.append((digest, sig))
+                rows.append(f"{digest}\t{'' if sig is None else format(sig, 'x')}\n")
+            if rows:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(rows)
+
+    def rebuild(self, texts) -> int:
+        """
+        Replace the index with `texts` (an iterable of stored documents). The
+        store is read without holding the lock, so checks and adds go on
+        meanwhile; entries added during the rebuild are kept.
+        """
+        with self._lock:
+            self._during_rebuild = []
+        try:
+            exact, buckets, rows = set(), {}, []
+            for text in texts:
+                digest, sig = self._keys(text or "")
+                if digest in exact:
+                    continue
+                self._insert(digest, sig, exact, buckets)
+                rows.append(f"{digest}\t{'' if sig is None else format(sig, 'x')}\n")
+            with self._lock:
+                for digest, sig in self._during_rebuild:
+                    if digest not in exact:
+                        self._insert(digest, sig, exact, buckets)
+                        rows.append(f"{digest}\t{'' if sig is None else format(sig, 'x')}\n")
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(rows)
+                os.replace(tmp, self.path)
+                self._exact, self._buckets = exact, buckets
+                return len(rows)
+        finally:
+            with self._lock:
+                self._during_rebuild = None
+
+
+_index = None  # False once config said disabled
+_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> DedupIndex | None:
+    """Process-wide index, or None when ltm.dedup.enabled is false."""
+    global _index
+    if _index is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("dedup") or {}
+        with _index_lock:
+            if _index is None:
+                _index = cfg.get("enabled", True) and DedupIndex(
+                    cfg.get("path"), max_hamming=cfg.get("max_hamming", MAX_HAMMING)
+                )
+    return _index if _index is not False else None
+
+
+def stored_documents(client=None):
+    """Every document in episodic memory: the base collection and its time shards."""
+    from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENT
+    from orion_cli.utils.chroma_utils import get_client
+    from orion_cli.utils.ltm_export import iter_pages, iter_records
+    from orion_cli.utils.shard_utils import list_shards
+
+    client = client or get_client()
+    for name in list_shards(client, COLL_EPISODIC_SENT, include_base=True):
+        coll = client.get_collection(name=name)
+        for rec in iter_records(iter_pages(coll)):
+            yield rec["document"]
+
+
+def seed_dedup_index(episodic_coll, client=None) -> threading.Thread | None:
+    """Rebuild the index on a background thread when it is empty or well behind `episodic_coll`."""
+    index = get_dedup_index()
+    if index is None:
+        return None
+    try:
+        stored = episodic_coll.count()
+    except Exception as e:
+        print(f"[ltm] ⚠️ Dedup index seeding skipped: {e}")
+        return None
+    if not stored or len(index) >= stored * SEED_RATIO:
+        return None
+
+    def run():
+        try:
+            n = index.rebuild(stored_documents(client))
+            print(f"[ltm] 🧬 Dedup index seeded from episodic memory: {n} entries")
+        except Exception as e:
+            print(f"[ltm] ⚠️ Dedup index seeding failed: {e}")
+
+    print(f"[ltm] 🧬 Dedup index has {len(index)} entries for {stored} memories; rebuilding in the background")
+    thread = threading.Thread(target=run, name="orion-dedup-seed", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,125 @@
+# orion_cli/utils/embed_scheduler.py
+#
+# Micro-batching front for the embedder: concurrent callers are collected
+# for a few milliseconds (or until max_batch texts) and served by a single
+# forward pass. Texts are length-sorted before encoding so padding inside
+# the batch stays small, then returned to each caller in original order.
+
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from queue import Empty, Queue
+
+from orion_cli.utils.metrics import histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class EmbeddingScheduler:
+    """
+    Collects embed requests from many threads and runs them as one batch.
+    Callable like a Chroma embedding function: `scheduler(list_of_texts)`.
+    """
+
+    def __init__(
+        self,
+        encode,
+        *,
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+        name: str = "embed",
+    ):
+        self._encode = encode
+        self._window = window_ms / 1000.0
+        self._max_batch = max(1, int(max_batch))
+        self._queue = Queue()
+        self.queue_delay_ms = histogram(
+            f"orion_{name}_queue_delay_ms",
+            help="Time a request waited before its batch started encoding.",
+        )
+        self.batch_size = histogram(
+            f"orion_{name}_batch_size",
+            buckets=BATCH_SIZE_BUCKETS,
+            help="Texts encoded per forward pass.",
+        )
+        self.encode_ms = histogram(
+            f"orion_{name}_encode_ms", help="Forward-pass time per batch."
+        )
+        self._worker = threading.Thread(
+            target=self._run, name=f"orion-{name}-scheduler", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, texts: list[str]) -> Future:
+        """Queue texts for embedding; the Future resolves to one vector per text."""
+        fut = Future()
+        self._queue.put((list(texts), fut, time.perf_counter()))
+        return fut
+
+    def __call__(self, input: list[str]) -> list[list[float]]:
+        return self.submit(input).result()
+
+    def stats(self) -> dict:
+        return {
+            "queue_delay_ms": self.queue_delay_ms.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+            "encode_ms": self.encode_ms.snapshot(),
+        }
+
+    def _collect(self) -> list:
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self._window
+        while size < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            # A caller that cancelled its future is dropped; the rest can no longer be cancelled
+            pending = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            started = time.perf_counter()
+            for _, _, enqueued in pending:
+                self.queue_delay_ms.observe((started - enqueued) * 1000)
+
+            texts = [t for batch, _, _ in pending for t in batch]
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            self.batch_size.observe(len(texts))
+
+            try:
+                sorted_vecs = list(self._encode([texts[i] for i in order]))
+            except Exception as e:
+                for _, fut, _ in pending:
+                    _resolve(fut, exception=e)
+                continue
+            self.encode_ms.observe((time.perf_counter() - started) * 1000)
+
+            vectors = [None] * len(texts)
+            for pos, i in enumerate(order):
+                vectors[i] = sorted_vecs[pos]
+
+            pos = 0
+            for batch, fut, _ in pending:
+                _resolve(fut, result=vectors[pos:pos + len(batch)])
+                pos += len(batch)
+
+
+def _resolve(fut: Future, result=None, exception: Exception = None):
+    """Complete `fut`; one that is already done must not take the worker thread down."""
+    try:
+        if exception is not None:
+            fut.set_exception(exception)
+        else:
+            fut.set_result(result)
+    except InvalidStateError:
+        pass
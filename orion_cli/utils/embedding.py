@@ -1,7 +1,7 @@
 import os
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 from dotenv import load_dotenv
 
 # ✅ Always resolve absolute .env path inside orion_cli
@@ -20,36 +20,173 @@ if not os.getenv("ORION_EMBED_MODEL") or "mpnet" in os.getenv("ORION_EMBED_MODEL
 
 # Load model from environment or default
 MODEL_NAME = os.environ.get("ORION_EMBED_MODEL", DEFAULT_EMBED_MODEL)
-print(f"[orion_cli] 🧠 Loading embedding model: {MODEL_NAME}")
-embedding_model = SentenceTransformer(MODEL_NAME)
 
-# Validate dimensionality
-try:
-    vec = embedding_model.encode(["test"], convert_to_numpy=True)[0]
-    if len(vec) != EMBEDDING_DIM:
-        raise ValueError(
-            f"[orion_cli] ❌ Embedding model returned {len(vec)}D, expected {EMBEDDING_DIM}D."
-        )
-except Exception as e:
-    print(f"[orion_cli] ❌ Embedding model failed validation: {e}")
-    raise
+# The model is loaded on first use, not at import, so light commands
+# (orion --help, ltm-dump, ...) never pay for it.
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                print(f"[orion_cli] 🧠 Loading embedding model: {MODEL_NAME}")
+                model = SentenceTransformer(MODEL_NAME)
+
+                # Validate dimensionality
+                try:
+                    vec = model.encode(["test"], convert_to_numpy=True)[0]
+                    if len(vec) != EMBEDDING_DIM:
+                        raise ValueError(
+                            f"[orion_cli] ❌ Embedding model returned {len(vec)}D, expected {EMBEDDING_DIM}D."
+                        )
+                except Exception as e:
+                    print(f"[orion_cli] ❌ Embedding model failed validation: {e}")
+                    raise
+                _model = model
+    return _model
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
 
 
 # ✅ Core embedding function for ChromaDB integrations
 def get_embed_function():
+    """
+    Chroma's SentenceTransformer embedding function, with its calls (query
+    and add embedding inside Chroma) micro-batched through a scheduler of its
+    own when ltm.embed_scheduler.enabled is on. The scheduler runs the same
+    model, so vectors are identical either way.
+    """
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+    class ScheduledEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+        _scheduler = None
+
+        def embed_direct(self, input):
+            return SentenceTransformerEmbeddingFunction.__call__(self, input)
+
+        def __call__(self, input):
+            if self._scheduler is None:
+                with _scheduler_lock:
+                    if self._scheduler is None:
+                        self._scheduler = _make_scheduler(self.embed_direct, "chroma_embed") or False
+            if self._scheduler is False:
+                return self.embed_direct(input)
+            return self._scheduler(list(input))
+
     try:
-        return SentenceTransformerEmbeddingFunction(model_name=MODEL_NAME)
+        return ScheduledEmbeddingFunction(model_name=MODEL_NAME)
     except Exception as e:
         print(f"[orion_cli] ❌ Failed to initialize embedding function: {e}")
         raise
 
 
-# ✅ Direct embedding utility (for persona/LTM ingestion)
-def embed(texts: list[str]) -> list[list[float]]:
-    return embedding_model.encode(
+def _encode(texts: list[str]) -> list[list[float]]:
+    return get_embedding_model().encode(
         texts, convert_to_numpy=True, normalize_embeddings=True
     ).tolist()
 
 
-# ✅ Singleton for global import
-EMBED_FN = get_embed_function()
+def _make_scheduler(encode, name: str = "embed"):
+    """An EmbeddingScheduler over `encode` per ltm.embed_scheduler, or None when it is off."""
+    from orion_cli.utils.ltm_utils import load_ltm_config
+
+    cfg = load_ltm_config().get("embed_scheduler") or {}
+    if not cfg.get("enabled"):
+        return None
+    from orion_cli.utils.embed_scheduler import EmbeddingScheduler
+
+    return EmbeddingScheduler(
+        encode,
+        window_ms=float(cfg.get("window_ms", 5)),
+        max_batch=int(cfg.get("max_batch", 64)),
+        name=name,
+    )
+
+
+def get_embed_scheduler():
+    """
+    Shared micro-batching scheduler in front of `embed`, or None when
+    ltm.embed_scheduler.enabled is off (the default).
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = _make_scheduler(_encode) or False
+    return _scheduler or None
+
+
+# ✅ Direct embedding utility (for persona/LTM ingestion)
+def embed(texts: list[str]) -> list[list[float]]:
+    scheduler = get_embed_scheduler()
+    if scheduler is not None:
+        return scheduler.submit(texts).result()
+    return _encode(texts)
+
+
+def embed_async(texts: list[str]):
+    """Future-returning variant of `embed`; resolves immediately without the scheduler."""
+    scheduler = get_embed_scheduler()
+    if scheduler is not None:
+        return scheduler.submit(texts)
+    fut = Future()
+    fut.set_result(_encode(texts))
+    return fut
+
+
+# 🎨 Tone/tag estimation for memories about to be stored
+_KEYWORD_TONES = (
+    ("somber", ("regret", "sad", "lonely")),
+    ("defiant", ("courage", "fight", "will")),
+    ("poetic", ("beauty", "soul", "stars")),
+)
+
+
+def _keyword_tone_and_tags(text: str) -> tuple[str, list[str]]:
+    lowered = text.lower()
+    for tone, words in _KEYWORD_TONES:
+        if any(w in lowered for w in words):
+            return tone, ["memory", "pooled"]
+    return "neutral", ["memory", "pooled"]
+
+
+def estimate_tone_and_tags(text: str, embedding=None) -> tuple[str, list[str]]:
+    """
+    (tone, tags) from the persona tone/tag prototypes (utils.tone_classifier).
+    Pass the text's embedding if it is already computed; otherwise it is
+    embedded here. Falls back to keyword rules when no prototypes exist.
+    """
+    from orion_cli.utils.tone_classifier import get_tone_classifier
+
+    try:
+        classifier = get_tone_classifier()
+    except Exception as e:
+        print(f"[orion_cli] ⚠️ Tone classifier unavailable: {e}")
+        classifier = None
+    if classifier is None:
+        return _keyword_tone_and_tags(text)
+    vec = embedding if embedding is not None else embed([text])[0]
+    meta = classifier.classify([vec])[0]
+    return meta["tone"], [t for t in meta["tags"].split(",") if t]
+
+
+# ✅ Singleton for global import (`from orion_cli.utils.embedding import EMBED_FN`),
+# created on first access
+_embed_fn = None
+
+
+def __getattr__(name):
+    global _embed_fn
+    if name == "EMBED_FN":
+        with _model_lock:
+            if _embed_fn is None:
+                _embed_fn = get_embed_function()
+        return _embed_fn
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
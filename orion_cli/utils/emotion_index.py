@@ -0,0 +1,289 @@
+# orion_cli/utils/emotion_index.py
+#
+# Columnar emotion-space index for mood-matched recall.
+#
+# The scalar fields from schema_doc.md (valence, arousal, confidence,
+# importance, priority) are held per memory ID in NumPy arrays, with NaN for
+# "not set", plus a uniform grid over (valence, arousal) in CSR form (rows
+# sorted by cell + cell offsets). With those:
+#   - count_within() tells whether a mood region is populated enough to be
+#     used as a Chroma pre-filter (a where-box on the same query, so no extra
+#     round trip), and
+#   - mood_scores() weights the candidates a query returned, all vectorized.
+#
+# One index per collection, built from metadata only (no embeddings) and
+# cached as <ORION_CHROMA_PATH>/orion_emotion_<collection>.npz. Nothing here
+# scans the collection on the request path: writes applied by the journal (or
+# written directly through write_memory) update the cached index in place, and
+# when the count still drifts (offline ingest, another process) the index is
+# rebuilt on a background thread while the previous one keeps serving.
+
+import os
+import threading
+import time
+from pathlib import Path
+
+FIELDS = ("valence", "arousal", "confidence", "importance", "priority")
+VALENCE_RANGE = (-1.0, 1.0)
+AROUSAL_RANGE = (0.0, 1.0)
+CELL = 0.1
+PAGE_SIZE = 1000
+
+
+def default_index_path(collection_name: str) -> Path:
+    return Path(os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")) / f"orion_emotion_{collection_name}.npz"
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class EmotionIndex:
+    def __init__(self, ids=None, columns: dict = None):
+        import numpy as np
+
+        self.ids = list(ids or [])
+        self._row = {mem_id: i for i, mem_id in enumerate(self.ids)}
+        n = len(self.ids)
+        self.columns = {
+            f: np.asarray((columns or {}).get(f, np.full(n, np.nan)), dtype=np.float32) for f in FIELDS
+        }
+        self._build_grid()
+
+    # --- construction ---
+    @classmethod
+    def from_metadatas(cls, ids, metadatas):
+        import numpy as np
+
+        cols = {f: np.array([_to_float((m or {}).get(f)) for m in metadatas], dtype=np.float32) for f in FIELDS}
+        return cls(ids, cols)
+
+    @classmethod
+    def from_collection(cls, coll):
+        # Page each shard on its own: one count per shard instead of one per page
+        sources = coll.shard_collections() if hasattr(coll, "shard_collections") else [coll]
+        ids, metas = [], []
+        for source in sources:
+            offset = 0
+            while True:
+                page = source.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+                page_ids = page.get("ids") or []
+                if not page_ids:
+                    break
+                ids.extend(page_ids)
+                metas.extend(page.get("metadatas") or [{}] * len(page_ids))
+                offset += len(page_ids)
+        return cls.from_metadatas(ids, metas)
+
+    def save(self, path: Path):
+        import numpy as np
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, ids=np.array(self.ids, dtype=object), **self.columns)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path):
+        import numpy as np
+
+        with np.load(path, allow_pickle=True) as data:
+            return cls(data["ids"].tolist(), {f: data[f] for f in FIELDS})
+
+    def __len__(self):
+        return len(self.ids)
+
+    def updated(self, ids, metadatas, *, replace: bool = True) -> "EmotionIndex":
+        """A new index with rows for `ids` set from `metadatas` (appended when new; kept when not `replace`)."""
+        import numpy as np
+
+        ids, metadatas = list(ids), list(metadatas or [{}] * len(ids))
+        columns = {f: self.columns[f].copy() for f in FIELDS}
+        all_ids = list(self.ids)
+        new = {f: [] for f in FIELDS}
+        for mem_id, meta in zip(ids, metadatas):
+            row = self._row.get(mem_id)
+            if row is None:
+                all_ids.append(mem_id)
+                for f in FIELDS:
+                    new[f].append(_to_float((meta or {}).get(f)))
+            elif replace:
+                for f in FIELDS:
+                    columns[f][row] = _to_float((meta or {}).get(f))
+        for f in FIELDS:
+            columns[f] = np.concatenate([columns[f], np.asarray(new[f], dtype=np.float32)])
+        return EmotionIndex(all_ids, columns)
+
+    def without(self, ids) -> "EmotionIndex":
+        drop = set(ids)
+        keep = [i for i, mem_id in enumerate(self.ids) if mem_id not in drop]
+        return EmotionIndex([self.ids[i] for i in keep], {f: self.columns[f][keep] for f in FIELDS})
+
+    # --- grid over (valence, arousal) ---
+    def _cells(self, v, a):
+        import numpy as np
+
+        nv = int(round((VALENCE_RANGE[1] - VALENCE_RANGE[0]) / CELL))
+        na = int(round((AROUSAL_RANGE[1] - AROUSAL_RANGE[0]) / CELL))
+        cv = np.clip(((v - VALENCE_RANGE[0]) / CELL).astype(np.int64), 0, nv - 1)
+        ca = np.clip(((a - AROUSAL_RANGE[0]) / CELL).astype(np.int64), 0, na - 1)
+        return cv * na + ca, nv, na
+
+    def _build_grid(self):
+        import numpy as np
+
+        v, a = self.columns["valence"], self.columns["arousal"]
+        has_mood = ~(np.isnan(v) | np.isnan(a))
+        rows = np.nonzero(has_mood)[0]
+        cells, nv, na = self._cells(v[rows], a[rows])
+        order = np.argsort(cells, kind="stable")
+        self._grid_rows = rows[order]
+        self._grid_starts = np.searchsorted(cells[order], np.arange(nv * na + 1))
+        self._grid_shape = (nv, na)
+
+    def within(self, valence: float, arousal: float, radius: float):
+        """Row indices whose (valence, arousal) lies within `radius` of the target."""
+        import numpy as np
+
+        nv, na = self._grid_shape
+        v_lo, v_hi = (int((x - VALENCE_RANGE[0]) // CELL) for x in (valence - radius, valence + radius))
+        a_lo, a_hi = (int((x - AROUSAL_RANGE[0]) // CELL) for x in (arousal - radius, arousal + radius))
+        chunks = []
+        for cv in range(max(0, v_lo), min(nv - 1, v_hi) + 1):
+            base = cv * na
+            lo = self._grid_starts[base + max(0, a_lo)]
+            hi = self._grid_starts[base + min(na - 1, a_hi) + 1]
+            if hi > lo:
+                chunks.append(self._grid_rows[lo:hi])
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(chunks)
+        dv = self.columns["valence"][rows] - valence
+        da = self.columns["arousal"][rows] - arousal
+        return rows[dv * dv + da * da <= radius * radius]
+
+    def count_within(self, valence: float, arousal: float, radius: float) -> int:
+        return int(self.within(valence, arousal, radius).size)
+
+    # --- candidate weighting ---
+    def rows(self, ids):
+        import numpy as np
+
+        return np.array([self._row.get(i, -1) for i in ids], dtype=np.int64)
+
+    def scalars(self, ids) -> dict:
+        """field -> float32 array aligned with `ids` (NaN where unknown)."""
+        import numpy as np
+
+        rows = self.rows(ids)
+        known = rows >= 0
+        out = {}
+        for f in FIELDS:
+            col = np.full(len(rows), np.nan, dtype=np.float32)
+            col[known] = self.columns[f][rows[known]]
+            out[f] = col
+        return out
+
+    def mood_scores(self, ids, valence: float, arousal: float, *, sigma: float = 0.35, missing: float = 0.5):
+        """Affinity in [0, 1] of each id to the target mood (Gaussian in V/A space)."""
+        import numpy as np
+
+        s = self.scalars(ids)
+        d2 = (s["valence"] - valence) ** 2 + (s["arousal"] - arousal) ** 2
+        affinity = np.exp(-d2 / (2.0 * sigma * sigma))
+        affinity[np.isnan(affinity)] = missing
+        return affinity, s
+
+
+def mood_where(valence: float, arousal: float, radius: float) -> dict:
+    """Chroma where-clause for the bounding box of the mood disc (pre-filter)."""
+    return {
+        "$and": [
+            {"valence": {"$gte": valence - radius}},
+            {"valence": {"$lte": valence + radius}},
+            {"arousal": {"$gte": arousal - radius}},
+            {"arousal": {"$lte": arousal + radius}},
+        ]
+    }
+
+
+_indexes = {}  # collection name -> (EmotionIndex, checked_at, count)
+_indexes_lock = threading.Lock()
+_rebuilding = set()
+
+
+def _rebuild_in_background(coll, name: str):
+    """Rebuild `coll`'s index from metadata off the request path; callers keep the old one meanwhile."""
+    if name in _rebuilding:
+        return
+    _rebuilding.add(name)
+
+    def run():
+        try:
+            index = EmotionIndex.from_collection(coll)
+            index.save(default_index_path(name))
+            with _indexes_lock:
+                _indexes[name] = (index, time.monotonic(), len(index))
+            print(f"[ltm] 🎭 Emotion index for '{name}' rebuilt: {len(index)} memories")
+        except Exception as e:
+            print(f"[ltm] ⚠️ Emotion index rebuild failed: {e}")
+        finally:
+            with _indexes_lock:
+                _rebuilding.discard(name)
+
+    threading.Thread(target=run, name=f"orion-emotion-{name}", daemon=True).start()
+
+
+def get_emotion_index(coll, refresh_seconds: float = 60.0) -> EmotionIndex:
+    """
+    Cached index for `coll`. At most every `refresh_seconds` the collection
+    count is compared; on a mismatch a background rebuild is started and the
+    current index (the saved .npz, or an empty one at first) is returned.
+    """
+    name = getattr(coll, "name", "collection")
+    now = time.monotonic()
+    with _indexes_lock:
+        cached = _indexes.get(name)
+        if cached and now - cached[1] < refresh_seconds:
+            return cached[0]
+
+        count = coll.count()
+        if cached is None:
+            index = EmotionIndex()
+            path = default_index_path(name)
+            if path.exists():
+                try:
+                    index = EmotionIndex.load(path)
+                except Exception as e:
+                    print(f"[ltm] ⚠️ Emotion index cache unreadable, rebuilding: {e}")
+            cached = (index, now, len(index))
+        _indexes[name] = (cached[0], now, cached[2])
+        if cached[2] != count:
+            _rebuild_in_background(coll, name)
+        return cached[0]
+
+
+def note_write(coll, op: str, ids, metadatas=None):
+    """Apply a stored add/upsert/delete to `coll`'s cached index, if one is loaded."""
+    name = getattr(coll, "name", "collection")
+    with _indexes_lock:
+        cached = _indexes.get(name)
+        if cached is None:
+            return
+        index = cached[0]
+        if op == "delete":
+            updated = index.without(ids)
+        else:
+            updated = index.updated(ids, metadatas, replace=op != "add")
+        _indexes[name] = (updated, cached[1], cached[2] + len(updated) - len(index))
+
+
+def invalidate(collection_name: str):
+    """Drop the cached index and its file (e.g. after persona-ingest rewrote scalar metadata)."""
+    with _indexes_lock:
+        _indexes.pop(collection_name, None)
+        default_index_path(collection_name).unlink(missing_ok=True)
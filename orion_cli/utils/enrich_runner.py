@@ -0,0 +1,160 @@
+# orion_cli/utils/enrich_runner.py
+#
+# Bounded-concurrency, rate-limited, cached and resumable runner for the
+# per-pair enrichment calls (enrich-chat / hyde-local).
+#
+# - Every successful result is appended to an on-disk cache keyed by
+#   sha256(prompt_version, user, assistant) and flushed immediately.
+# - The output JSONL is rewritten from the cache on start (so a restart
+#   resumes where the crash happened) and then appended as results arrive.
+
+import hashlib
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+def post_json(url: str, body: dict, headers: dict = None, timeout: float = 120.0) -> dict:
+    """POST a JSON body and decode the JSON reply (stdlib only, no SDKs)."""
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json", **(headers or {})},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def pair_key(user: str, assistant: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (prompt_version, user, assistant):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per second (burst = rate)."""
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self._tokens = max(1.0, self.rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EnrichmentCache:
+    """Append-only JSONL cache: {"key": ..., "result": ...} per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                        self._data[row["key"]] = row["result"]
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def put(self, key: str, result):
+        with self._lock:
+            self._data[key] = result
+            self._fh.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+def run_enrichment(
+    pairs: list[dict],
+    enrich_fn,
+    output_path: Path,
+    *,
+    prompt_version: str,
+    cache_path: Path = None,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    desc: str = "Enriching",
+) -> dict:
+    """
+    Run `enrich_fn(user, assistant)` over `pairs` ({"user", "assistant"} dicts).
+    Results are written to `output_path` in completion order; cached pairs are
+    written first and never re-requested. Returns counts for reporting.
+    """
+    from tqdm import tqdm
+
+    output_path = Path(output_path)
+    cache_path = Path(cache_path or output_path.with_suffix(".cache.jsonl"))
+    cache = EnrichmentCache(cache_path)
+    limiter = RateLimiter(rate)
+
+    keyed = [(pair_key(p["user"], p["assistant"], prompt_version), p) for p in pairs]
+    todo = [(k, p) for k, p in keyed if k not in cache]
+    stats = {"cached": len(keyed) - len(todo), "enriched": 0, "failed": 0}
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as out:
+        # Resume: everything already paid for goes out first
+        for k, _ in keyed:
+            if k in cache:
+                out.write(json.dumps(cache.get(k), ensure_ascii=False) + "\n")
+        out.flush()
+
+        def _one(item):
+            k, p = item
+            limiter.acquire()
+            return k, enrich_fn(p["user"], p["assistant"])
+
+        pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        try:
+            futures = [pool.submit(_one, item) for item in todo]
+            for fut in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                try:
+                    k, result = fut.result()
+                except Exception as e:
+                    print(f"[⚠️] Enrichment call failed: {e}")
+                    stats["failed"] += 1
+                    continue
+                if not result:
+                    stats["failed"] += 1
+                    continue
+                cache.put(k, result)
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["enriched"] += 1
+        finally:
+            # On Ctrl-C don't wait for the whole queue; finished work is already cached
+            pool.shutdown(wait=True, cancel_futures=True)
+            cache.close()
+
+    return stats
@@ -0,0 +1,113 @@
+# orion_cli/utils/hier_retrieval.py
+#
+# Two-stage (coarse → fine) episodic retrieval.
+#
+# Stage 1 searches the parent level, i.e. the episodic collection of turns and
+# pooled blocks, and keeps the top-N parents. Stage 2 fetches only the
+# sentence spans whose parent_id is one of those parents (a metadata lookup
+# in Chroma's SQLite, not a vector search) and scores them against the same
+# query vector with one matrix product. The sentence index is never searched
+# as a whole, so query cost follows the number of parents, not sentences.
+#
+# The parent level is the turn/pooled-block collection itself, not a separate
+# index of conversation-level summaries: the coarse stage still grows with the
+# number of turns (an HNSW search, so logarithmically), only the fine stage is
+# bounded by top_parents.
+#
+# The result has the shape of a single-query coll.query() result, so callers
+# can swap it in for a flat query.
+
+DEFAULT_TOP_PARENTS = 8
+
+
+def _space(coll) -> str:
+    return ((getattr(coll, "metadata", None) or {}).get("hnsw:space") or "l2").lower()
+
+
+def _distances(query_vec, child_vecs, space: str):
+    """Distances in the same convention Chroma reports for `space`."""
+    import numpy as np
+
+    q = np.asarray(query_vec, dtype=np.float32)
+    X = np.asarray(child_vecs, dtype=np.float32)
+    if space == "cosine":
+        q = q / (np.linalg.norm(q) or 1.0)
+        norms = np.linalg.norm(X, axis=1)
+        norms[norms == 0] = 1.0
+        return 1.0 - (X @ q) / norms
+    if space == "ip":
+        return 1.0 - X @ q
+    diff = X - q
+    return np.einsum("ij,ij->i", diff, diff)  # squared L2, as hnswlib reports it
+
+
+def hierarchical_query(
+    query: str,
+    parent_coll,
+    child_coll,
+    *,
+    n_results: int = 10,
+    top_parents: int = DEFAULT_TOP_PARENTS,
+    include_parents_without_children: bool = True,
+) -> dict:
+    """
+    Coarse search over `parent_coll`, then exact scoring of the children (via
+    their `parent_id` metadata) of the best `top_parents` hits in `child_coll`.
+    Parents that were never segmented are returned as themselves.
+    """
+    from orion_cli.utils.chroma_utils import embedding_function
+
+    embed_fn = embedding_function(parent_coll)
+    query_vec = embed_fn([query])[0] if embed_fn is not None else None
+
+    coarse_kwargs = {"n_results": top_parents, "include": ["documents", "metadatas", "distances"]}
+    if query_vec is not None:
+        coarse_kwargs["query_embeddings"] = [list(map(float, query_vec))]
+    else:
+        coarse_kwargs["query_texts"] = [query]
+    coarse = parent_coll.query(**coarse_kwargs)
+
+    parent_ids = (coarse.get("ids") or [[]])[0]
+    if not parent_ids:
+        return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+    rows = []  # (distance, id, document, metadata)
+    if query_vec is None:
+        # No local embedder to reuse: let Chroma score the restricted child set
+        fine = child_coll.query(
+            query_texts=[query],
+            n_results=n_results,
+            where={"parent_id": {"$in": parent_ids}},
+            include=["documents", "metadatas", "distances"],
+        )
+        for i, cid in enumerate(fine["ids"][0]):
+            rows.append((fine["distances"][0][i], cid, fine["documents"][0][i], fine["metadatas"][0][i]))
+    else:
+        children = child_coll.get(
+            where={"parent_id": {"$in": parent_ids}},
+            include=["documents", "metadatas", "embeddings"],
+        )
+        child_ids = children.get("ids") or []
+        if child_ids:
+            dists = _distances(query_vec, children["embeddings"], _space(child_coll))
+            rows.extend(
+                (float(dists[i]), cid, children["documents"][i], children["metadatas"][i])
+                for i, cid in enumerate(child_ids)
+            )
+
+    if include_parents_without_children:
+        covered = {(r[3] or {}).get("parent_id") for r in rows}
+        for i, pid in enumerate(parent_ids):
+            if pid not in covered:
+                rows.append(
+                    (coarse["distances"][0][i], pid, coarse["documents"][0][i], coarse["metadatas"][0][i])
+                )
+
+    rows.sort(key=lambda r: r[0])
+    rows = rows[:n_results]
+    return {
+        "ids": [[r[1] for r in rows]],
+        "distances": [[r[0] for r in rows]],
+        "documents": [[r[2] for r in rows]],
+        "metadatas": [[r[3] for r in rows]],
+    }
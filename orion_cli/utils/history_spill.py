@@ -0,0 +1,167 @@
+# orion_cli/utils/history_spill.py
+#
+# Spill of chat history that prompt truncation drops (modules/chat.py,
+# 'history_truncated' extension hook) into episodic memory.
+#
+# The evicted messages are paired into USER/ASSISTANT exchanges and written in
+# one batch. An exchange whose two halves are both already known to the dedup
+# index (the live hooks or the log scanner stored them) is skipped, and so is
+# one that was spilled before: truncation drops the same oldest messages again
+# on every later turn, so each exchange is only looked at once per process.
+# An exchange whose write fails is forgotten again, so the next turn retries it.
+#
+# With `summarize`, each exchange is rewritten into a short memory note
+# (scripts/hyde_enrich.py, local Ollama) on a background thread before it is
+# written; the raw exchange is kept in the metadata. Without it the write is a
+# journal append (utils/write_journal.py), so prompt building is not delayed.
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+MAX_SEEN = 20000
+_LTM_BLOCK = re.compile(r"\[LTM CONTEXT\].*?\[/LTM CONTEXT\]\s*|<LTM\b[^>]*>.*?</LTM>\s*", re.S)
+
+_seen = OrderedDict()  # memory id of a queued/written exchange -> None, oldest first
+_seen_lock = threading.Lock()
+_executor = None
+
+
+def _clean(content) -> str:
+    """Message text without injected memory blocks; non-text content is dropped."""
+    if not isinstance(content, str):
+        return ""
+    return _LTM_BLOCK.sub("", content).strip()
+
+
+def exchanges(messages: list[dict]) -> list[tuple[str, str]]:
+    """(user, assistant) pairs in order; an unpaired message keeps an empty other half."""
+    out = []
+    for m in messages:
+        role, text = m.get("role"), _clean(m.get("content"))
+        if not text or role not in ("user", "assistant"):
+            continue
+        if role == "assistant" and out and out[-1][0] and not out[-1][1]:
+            out[-1] = (out[-1][0], text)
+        elif role == "user":
+            out.append((text, ""))
+        else:
+            out.append(("", text))
+    return out
+
+
+def exchange_text(user: str, assistant: str) -> str:
+    parts = []
+    if user:
+        parts.append(f"User: {user}")
+    if assistant:
+        parts.append(f"Assistant: {assistant}")
+    return "\n".join(parts)
+
+
+def _key(conversation_id: str, text: str) -> str:
+    return hashlib.sha1(f"{conversation_id or ''}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+def _first_time(mem_id: str) -> bool:
+    with _seen_lock:
+        if mem_id in _seen:
+            _seen.move_to_end(mem_id)
+            return False
+        _seen[mem_id] = None
+        while len(_seen) > MAX_SEEN:
+            _seen.popitem(last=False)
+        return True
+
+
+def _forget(mem_ids):
+    with _seen_lock:
+        for mem_id in mem_ids:
+            _seen.pop(mem_id, None)
+
+
+def _summarize(records: list[tuple]) -> list[tuple]:
+    """(id, user, assistant, text, meta) records with text replaced by a memory note where one came back."""
+    from orion_cli.scripts.hyde_enrich import rewrite_with_hyde
+
+    out = []
+    for mem_id, user, assistant, text, meta in records:
+        note = rewrite_with_hyde(user, assistant) if user and assistant else None
+        if note and note["metadata"].get("hyde"):
+            text, meta = note["metadata"]["hyde"], {**meta, "summarized": True, "original": text}
+        out.append((mem_id, user, assistant, text, meta))
+    return out
+
+
+def _write(records, write):
+    from orion_cli.utils.dedup_index import get_dedup_index
+
+    try:
+        write([r[0] for r in records], [r[3] for r in records], [r[4] for r in records])
+    except Exception as e:
+        _forget(r[0] for r in records)
+        print(f"[ltm] ⚠️ History spill write failed: {e}")
+        return
+    dedup = get_dedup_index()
+    if dedup is not None:
+        for *_, text, meta in records:
+            dedup.add(meta.get("original", text))
+    print(f"[ltm] 🧳 Spilled {len(records)} truncated exchange(s) into episodic memory")
+
+
+def _summarize_and_write(records, write):
+    try:
+        records = _summarize(records)
+    except Exception as e:
+        print(f"[ltm] ⚠️ Spill summary skipped: {e}")
+    _write(records, write)
+
+
+def spill_evicted(messages: list[dict], write, conversation_id: str = None, cfg: dict = None) -> int:
+    """
+    Hand the exchanges in `messages` that are not in memory yet to
+    `write(ids, documents, metadatas)` as one batch. Returns how many were
+    queued (summarized ones are written in the background).
+    """
+    if cfg is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("history_spill") or {}
+    if not cfg.get("enabled", True):
+        return 0
+
+    from orion_cli.utils.dedup_index import get_dedup_index
+
+    dedup = get_dedup_index()
+    min_chars = int(cfg.get("min_chars", 20))
+    now = time.time()
+    records = []
+    for user, assistant in exchanges(messages):
+        text = exchange_text(user, assistant)
+        mem_id = f"spill-{_key(conversation_id, text)[:16]}"
+        if len(text) < min_chars or not _first_time(mem_id):
+            continue
+        if dedup is not None and (
+            dedup.check(text) or all(dedup.check(part) for part in (user, assistant) if part)
+        ):
+            continue  # already in memory
+        meta = {"timestamp": now, "importance": 0.6, "source": "history_spill", "spilled": True}
+        if conversation_id:
+            meta["conversation_id"] = conversation_id
+        records.append((mem_id, user, assistant, text, meta))
+
+    if not records:
+        return 0
+    if cfg.get("summarize"):
+        global _executor
+        with _seen_lock:
+            if _executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="orion-spill")
+        _executor.submit(_summarize_and_write, records, write)
+    else:
+        _write(records, write)
+    return len(records)
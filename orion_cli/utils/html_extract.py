@@ -0,0 +1,249 @@
+# orion_cli/utils/html_extract.py
+#
+# Policy-driven text extraction and chunking for web ingest (core/web_ingest.py).
+#
+# The policy comes from orion_policy.yaml:
+#   include_tags       elements whose text is kept, one block per element
+#                      (text of a nested included element goes to the inner one)
+#   exclude_selectors  subtrees dropped entirely: 'tag', '.class', '#id' or
+#                      'tag.class' (script/style/noscript/template always are)
+#   split_strategy     sentence | paragraph | fixed
+#   min_chunk_chars / max_chunk_chars, max_tokens (caps the chunk at ~4 chars/token)
+#   domains:           optional per-domain overrides of any of the above
+#
+# Parsing is html.parser (stdlib): tolerant of unclosed <p>/<li>, no DOM built.
+
+import os
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urldefrag, urlsplit
+
+DEFAULT_POLICY = {
+    "include_tags": ["p", "h1", "h2", "h3", "li"],
+    "exclude_selectors": [],
+    "split_strategy": "sentence",
+    "min_chunk_chars": 300,
+    "max_chunk_chars": 1000,
+    "max_tokens": 1000,
+}
+SPLIT_STRATEGIES = ("sentence", "paragraph", "fixed")
+CHARS_PER_TOKEN = 4
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+_ALWAYS_SKIP = {"script", "style", "noscript", "template", "svg"}
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+# Starting one of these closes an open element of the same family (HTML's implied end tags)
+_IMPLIED_CLOSE = {"p": {"p"}, "li": {"li"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"}, "tr": {"tr"}, "td": {"td", "th"}, "th": {"td", "th"}}
+_BLOCK_CLOSES_P = {"p", "div", "ul", "ol", "table", "section", "article", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote"}
+_WS = re.compile(r"\s+")
+
+
+# === Policy ===
+def default_policy_path() -> Path:
+    return Path(os.getenv("ORION_POLICY_PATH", "orion_policy.yaml"))
+
+
+def load_policy(path=None) -> dict:
+    """orion_policy.yaml merged over DEFAULT_POLICY (missing file: defaults)."""
+    import yaml
+
+    path = Path(path or default_policy_path())
+    raw = {}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            raw = yaml.safe_load(f) or {}
+    return {**DEFAULT_POLICY, **raw}
+
+
+def policy_for(policy: dict, url: str) -> dict:
+    """Effective policy for `url`: base keys overlaid with domains[<host>] (or a parent domain)."""
+    host = (urlsplit(url).hostname or "").lower()
+    domains = policy.get("domains") or {}
+    override = {}
+    parts = host.split(".")
+    for i in range(len(parts) - 1, -1, -1):  # parent domains first, most specific last
+        override.update(domains.get(".".join(parts[i:])) or {})
+    effective = {k: v for k, v in policy.items() if k != "domains"}
+    effective.update(override)
+    if effective.get("split_strategy") not in SPLIT_STRATEGIES:
+        raise ValueError(f"split_strategy must be one of {SPLIT_STRATEGIES}, got {effective.get('split_strategy')!r}")
+    return effective
+
+
+def chunk_limits(policy: dict) -> tuple[int, int]:
+    """(min_chars, max_chars) with max_tokens applied."""
+    max_chars = int(policy.get("max_chunk_chars") or DEFAULT_POLICY["max_chunk_chars"])
+    if policy.get("max_tokens"):
+        max_chars = min(max_chars, int(policy["max_tokens"]) * CHARS_PER_TOKEN)
+    min_chars = min(int(policy.get("min_chunk_chars") or 0), max_chars)
+    return min_chars, max_chars
+
+
+# === Extraction ===
+def _parse_selector(sel: str) -> tuple[str | None, str | None, str | None]:
+    """'tag.class' / '.class' / '#id' / 'tag' -> (tag, class, id)."""
+    sel = sel.strip()
+    m = re.fullmatch(r"([a-zA-Z][\w-]*)?(?:\.([\w-]+))?(?:#([\w-]+))?", sel)
+    if not m or not any(m.groups()):
+        raise ValueError(f"unsupported exclude selector {sel!r} (use tag, .class, #id or tag.class)")
+    tag, cls, ident = m.groups()
+    return (tag.lower() if tag else None), cls, ident
+
+
+class _Extractor(HTMLParser):
+    def __init__(self, base_url: str, include_tags, exclude_selectors):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.include = {t.lower() for t in include_tags}
+        self.exclude = [_parse_selector(s) for s in exclude_selectors or []]
+        self.stack = []  # [tag, excluded, block index or None]
+        self.blocks = []  # {"tag", "text", "section"}
+        self.links = []
+        self.title = ""
+        self._in_title = False
+        self._section = ""
+
+    def _excluded(self, tag: str, attrs: dict) -> bool:
+        if tag in _ALWAYS_SKIP:
+            return True
+        classes = set((attrs.get("class") or "").split())
+        for s_tag, s_cls, s_id in self.exclude:
+            if (s_tag is None or s_tag == tag) and (s_cls is None or s_cls in classes) and (
+                s_id is None or s_id == attrs.get("id")
+            ):
+                return True
+        return False
+
+    def _skipping(self) -> bool:
+        return any(entry[1] for entry in self.stack)
+
+    def _close_to(self, index: int):
+        for tag, _, block in self.stack[index:]:
+            if block is not None and tag in HEADINGS:
+                self._section = _WS.sub(" ", self.blocks[block]["text"]).strip() or self._section
+        del self.stack[index:]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a" and attrs.get("href") and not self._skipping():
+            self.links.append(urldefrag(urljoin(self.base_url, attrs["href"]))[0])
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        if tag == "title":
+            self._in_title = True
+        if tag in _VOID:
+            if tag == "br" and self.stack and self.stack[-1][2] is not None:
+                self.blocks[self.stack[-1][2]]["text"] += "\n"
+            return
+
+        closes = _IMPLIED_CLOSE.get(tag, set()) | ({"p"} if tag in _BLOCK_CLOSES_P else set())
+        if closes:
+            for i in range(len(self.stack) - 1, -1, -1):
+                if self.stack[i][0] in closes:
+                    self._close_to(i)
+                    break
+                if self.stack[i][0] not in ("span", "a", "b", "i", "em", "strong", "code"):
+                    break  # only look through inline wrappers
+
+        excluded = self._excluded(tag, attrs)
+        block = None
+        if tag in self.include and not excluded and not self._skipping():
+            block = len(self.blocks)
+            self.blocks.append({"tag": tag, "text": "", "section": self._section})
+        self.stack.append([tag, excluded, block])
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                self._close_to(i)
+                return
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skipping():
+            return
+        for _, _, block in reversed(self.stack):
+            if block is not None:
+                self.blocks[block]["text"] += data
+                return
+
+
+def extract(html: str, url: str, policy: dict) -> dict:
+    """{"title", "blocks": [{"tag", "text", "section"}], "links": [absolute URLs]}."""
+    parser = _Extractor(url, policy.get("include_tags") or [], policy.get("exclude_selectors") or [])
+    parser.feed(html)
+    parser.close()
+    blocks = []
+    for b in parser.blocks:
+        text = "\n".join(_WS.sub(" ", line).strip() for line in b["text"].split("\n")).strip()
+        if text:
+            section = _WS.sub(" ", text) if b["tag"] in HEADINGS else b["section"]
+            blocks.append({**b, "text": text, "section": section})
+    return {"title": _WS.sub(" ", parser.title).strip(), "blocks": blocks, "links": parser.links}
+
+
+# === Chunking ===
+def _fixed(text: str, max_chars: int) -> list[str]:
+    """Windows of at most max_chars, cut at the last whitespace when there is one."""
+    out = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        cut = cut if cut > max_chars // 2 else max_chars
+        out.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        out.append(text)
+    return out
+
+
+def _pack(pieces: list[str], min_chars: int, max_chars: int, sep: str) -> list[str]:
+    """Greedily join pieces up to min_chars (never past max_chars); oversize pieces are split."""
+    chunks = []
+    for piece in pieces:
+        for part in _fixed(piece, max_chars):
+            if chunks and len(chunks[-1]) < min_chars and len(chunks[-1]) + len(sep) + len(part) <= max_chars:
+                chunks[-1] += sep + part
+            else:
+                chunks.append(part)
+    if len(chunks) > 1 and len(chunks[-1]) < min_chars // 2 and len(chunks[-2]) + len(sep) + len(chunks[-1]) <= max_chars:
+        chunks[-2:] = [chunks[-2] + sep + chunks[-1]]
+    return chunks
+
+
+def chunk_blocks(blocks: list[dict], policy: dict) -> list[dict]:
+    """
+    Chunks per split_strategy, never crossing a heading: [{"text", "section"}].
+      sentence   sentences (utils.segmenter) packed to min..max chars
+      paragraph  whole blocks packed to min..max chars
+      fixed      the section's text cut into max-char windows
+    """
+    from orion_cli.utils.segmenter import split_sentences
+
+    strategy = policy.get("split_strategy", "sentence")
+    min_chars, max_chars = chunk_limits(policy)
+
+    sections, current = [], None
+    for b in blocks:
+        if b["tag"] in HEADINGS:
+            current = None  # the heading itself opens the next section
+        if current is None or current["section"] != b["section"]:
+            current = {"section": b["section"], "texts": []}
+            sections.append(current)
+        current["texts"].append(b["text"])
+
+    out = []
+    for sec in sections:
+        if strategy == "paragraph":
+            chunks = _pack(sec["texts"], min_chars, max_chars, "\n\n")
+        elif strategy == "fixed":
+            chunks = _fixed(" ".join(sec["texts"]), max_chars)
+        else:
+            sentences = [t[s:e] for t in sec["texts"] for s, e in split_sentences(t)]
+            chunks = _pack(sentences, min_chars, max_chars, " ")
+        out.extend({"text": c, "section": sec["section"]} for c in chunks if c.strip())
+    return out
@@ -0,0 +1,155 @@
+# orion_cli/utils/live_pooler.py
+#
+# Live pooling of chat turns into episodic "pooled" blocks.
+#
+# Each session (conversation_id, i.e. '<character>/<unique_id>') has its own
+# sliding window of the last `window` exchanges. Every `stride` new exchanges
+# a snapshot of the full window is taken under the lock and queued; with
+# stride == window the blocks don't overlap, with a smaller stride they do.
+#
+# Tone/tag estimation and the Chroma add run on one background worker, so
+# the assistant-turn hook only appends to a deque and returns. Blocks are
+# written in the order they were cut, and each block holds turns of exactly
+# one session. Sessions idle for `idle_seconds` are dropped.
+
+import hashlib
+import threading
+import time
+from collections import deque
+from queue import Queue
+
+from orion_cli.utils.metrics import timed
+
+DEFAULT_SESSION = "default"
+
+
+class _Session:
+    __slots__ = ("turns", "seq", "since", "touched", "started")
+
+    def __init__(self, window: int):
+        self.turns = deque(maxlen=window)
+        self.started = int(time.time())  # keeps IDs unique if an evicted session comes back
+        self.seq = 0  # exchanges seen in this session
+        self.since = 0  # exchanges since the last cut
+        self.touched = time.monotonic()
+
+
+def _session_tag(session: str) -> str:
+    return hashlib.sha1(session.encode("utf-8")).hexdigest()[:10]
+
+
+def pooled_text(turns) -> str:
+    return "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+
+
+class LivePooler:
+    def __init__(self, window: int = 3, stride: int = None, idle_seconds: float = 3600.0):
+        self.window = max(1, int(window))
+        self.stride = max(1, int(stride or self.window))
+        self.idle_seconds = float(idle_seconds)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._queue = Queue()
+        self._worker = threading.Thread(target=self._run, name="orion-live-pooler", daemon=True)
+        self._worker.start()
+
+    # --- hook side ---
+    def add(self, session: str, user_input: str, assistant_reply: str, collection) -> bool:
+        """Record one exchange; returns True if it completed a block (queued for writing)."""
+        session = session or DEFAULT_SESSION
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            state = self._sessions.get(session)
+            if state is None:
+                state = self._sessions[session] = _Session(self.window)
+            state.turns.append((user_input.strip(), assistant_reply.strip()))
+            state.seq += 1
+            state.since += 1
+            state.touched = now
+            if len(state.turns) < self.window or state.since < self.stride:
+                return False
+            state.since = 0
+            block_id = f"pooled-{_session_tag(session)}-{state.started}-{state.seq - self.window}"
+            job = (session, block_id, state.seq - self.window, tuple(state.turns), collection)
+        self._queue.put(job)
+        return True
+
+    def _evict_idle(self, now: float):
+        stale = [s for s, st in self._sessions.items() if now - st.touched > self.idle_seconds]
+        for s in stale:
+            del self._sessions[s]
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued block has been written (True) or `timeout` passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    # --- worker side ---
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                with timed("pooled_write"):
+                    self._write(*job)
+            except Exception as e:
+                print(f"[ltm] Live pooled ingestion failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, session: str, block_id: str, start: int, turns: tuple, collection):
+        from orion_cli.utils.tone_classifier import tag_documents
+
+        text = pooled_text(turns)
+        # One embedder pass: the vector is classified and then stored as-is
+        embeddings, (affect,) = tag_documents(collection, [text])
+        if not affect:
+            from orion_cli.utils.embedding import estimate_tone_and_tags
+
+            tone, tags = estimate_tone_and_tags(text)
+            affect = {"tone": tone, "tags": ",".join(tags)}
+        meta = {
+            "timestamp": time.time(),
+            "importance": 0.8,
+            "source": "assistant",
+            "pooled": True,
+            "pooled_turns": len(turns),
+            **affect,
+        }
+        if session != DEFAULT_SESSION:
+            meta["conversation_id"] = session
+        from orion_cli.utils.write_journal import write_memory
+
+        write_memory(collection, "add", ids=[block_id], documents=[text], metadatas=[meta], embeddings=embeddings)
+        print(
+            f"[ltm] 🔄 Live pooled memory added: session={session}, turns {start}-{start + len(turns) - 1}, "
+            f"tone={meta['tone']}, tags={meta['tags']}"
+        )
+
+
+_pooler = None  # False once config said disabled
+_pooler_lock = threading.Lock()
+
+
+def get_live_pooler() -> LivePooler | None:
+    """Process-wide pooler, or None when ltm.live_pooled_ingest is false."""
+    global _pooler
+    if _pooler is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config()
+        with _pooler_lock:
+            if _pooler is None:
+                _pooler = bool(cfg.get("live_pooled_ingest")) and LivePooler(
+                    window=int(cfg.get("pooling_turns", 3)),
+                    stride=cfg.get("pooling_stride"),
+                    idle_seconds=float(cfg.get("pooling_idle_seconds", 3600)),
+                )
+    return _pooler if _pooler is not False else None
@@ -0,0 +1,203 @@
+# orion_cli/utils/log_scanner.py
+#
+# Parallel, incremental scanner for text-generation-webui chat histories
+# (orion_cli/data/chat_logs, user_data/logs/chat/<character>/, user_data/logs/instruct/).
+#
+# Files are parsed in a process pool and their `internal` pairs are yielded
+# as a stream. A manifest records (mtime, size, rows processed) per file so a
+# re-scan only opens new or changed files and only yields rows past the
+# previous high-water mark. The last pair of each file carries that file's new
+# manifest entry ("watermark"); the consumer commits it with advance_manifest()
+# once the batch holding that pair is stored, so nothing is marked as ingested
+# while it still sits in a buffer.
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+WEBUI_LOG_DIRS = ("user_data/logs/chat", "user_data/logs/instruct")
+DEFAULT_LOG_DIRS = ("orion_cli/data/chat_logs",) + WEBUI_LOG_DIRS
+GREETING_MARKER = "<|BEGIN-VISIBLE-CHAT|>"
+
+
+def default_manifest_path() -> Path:
+    return Path(os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")) / "orion_log_manifest.json"
+
+
+def iter_valid_pairs(internal: list, start_row: int = 0):
+    """(row, user, assistant) for every complete pair at or after start_row."""
+    for i in range(start_row, len(internal)):
+        pair = internal[i]
+        if not (isinstance(pair, list) and len(pair) == 2) or pair[0] == GREETING_MARKER:
+            continue
+        user_msg = (pair[0] or "").strip()
+        assistant_msg = (pair[1] or "").strip()
+        if user_msg and assistant_msg:
+            yield i, user_msg, assistant_msg
+
+
+def parse_log_file(path: str, start_row: int = 0) -> dict:
+    """
+    Worker: parse one history file and return its new pairs plus the
+    bookkeeping for the manifest. Runs in a child process, so it only
+    returns plain data.
+    """
+    st = os.stat(path)  # before reading: a write during the parse shows up next scan
+    result = {
+        "path": path,
+        "pairs": [],
+        "rows": start_row,
+        "mtime": st.st_mtime,
+        "size": st.st_size,
+        "error": None,
+    }
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        result["error"] = str(e)
+        return result
+
+    internal = data.get("internal", []) if isinstance(data, dict) else []
+    if start_row > len(internal):
+        start_row = 0  # history was truncated/rewritten: rescan from the top
+
+    source = f"{Path(path).parent.name}/{Path(path).stem}"
+    result["pairs"] = [
+        {"user": u, "assistant": a, "source": source, "file": path, "row": row}
+        for row, u, a in iter_valid_pairs(internal, start_row)
+    ]
+
+    # A trailing row without a reply is still being generated: don't move past it
+    rows = len(internal)
+    last = internal[-1] if internal else None
+    if last is not None and not (isinstance(last, list) and len(last) == 2 and (last[1] or "").strip()):
+        rows -= 1
+    result["rows"] = max(rows, start_row)
+    return result
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def find_log_files(dirs) -> list[Path]:
+    files = []
+    for d in dirs:
+        d = Path(d)
+        if d.is_file():
+            files.append(d)
+        elif d.is_dir():
+            files.extend(p for p in d.rglob("*.json") if "persistent" not in p.name)
+    return sorted(set(files))
+
+
+def _plan(files: list[Path], manifest: dict) -> list[tuple[str, int]]:
+    """(path, start_row) for files that are new or changed since the manifest."""
+    todo = []
+    for p in files:
+        st = p.stat()
+        key = str(p)
+        seen = manifest.get(key)
+        if seen and seen["mtime"] == st.st_mtime and seen["size"] == st.st_size:
+            continue
+        start = seen["rows"] if seen and st.st_size >= seen["size"] else 0
+        todo.append((key, start))
+    return todo
+
+
+def scan_logs(
+    dirs=DEFAULT_LOG_DIRS,
+    manifest_path: Path = None,
+    workers: int = None,
+    *,
+    full: bool = False,
+    commit: bool = True,
+):
+    """
+    Generator of {"user", "assistant", "source", "file", "row"} dicts; the
+    last pair of each file also has a "watermark" (its manifest entry).
+
+    With `manifest_path`, only new rows are yielded. The manifest is *not*
+    advanced for files with pairs: the consumer passes what it has stored to
+    advance_manifest(), so a crash or a failed upsert leaves those files to be
+    re-read next time. Files without new pairs are committed here once the
+    scan completes. `full` ignores the stored manifest when planning;
+    `commit=False` never writes it. Without a manifest, every file is parsed
+    in full (still in parallel).
+    """
+    manifest = load_manifest(manifest_path) if manifest_path and not full else {}
+    todo = _plan(find_log_files(dirs), manifest)
+    if not todo:
+        return
+
+    empty = {}  # manifest entries of files that yielded nothing
+    workers = workers or min(len(todo), os.cpu_count() or 1)
+    if workers <= 1:
+        # Few files (e.g. the live watcher): a process pool costs more than it saves
+        yield from _consume((parse_log_file(p, start) for p, start in todo), empty)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_log_file, path, start) for path, start in todo]
+            try:
+                yield from _consume((f.result() for f in as_completed(futures)), empty)
+            finally:
+                for fut in futures:
+                    fut.cancel()
+    if manifest_path and commit:
+        advance_manifest(manifest_path, empty)
+
+
+def watermarks(pairs) -> dict:
+    """path -> manifest entry for the files whose last new pair is in `pairs`."""
+    return {p["file"]: p["watermark"] for p in pairs if "watermark" in p}
+
+
+def advance_manifest(manifest_path: Path, entries: dict):
+    """Merge `entries` into the manifest on disk (re-read, so concurrent commits are kept)."""
+    if not entries:
+        return
+    manifest = load_manifest(manifest_path)
+    manifest.update(entries)
+    save_manifest(manifest_path, manifest)
+
+
+def collect_new_pairs(paths, manifest_path: Path) -> tuple[list[dict], dict]:
+    """
+    In-process variant for small, hot sets of files (the live watcher): returns
+    the new pairs and the advanced manifest *without* saving it, so the caller
+    can commit the watermark only after the pairs are safely stored.
+    """
+    manifest = load_manifest(manifest_path)
+    todo = _plan([Path(p) for p in paths], manifest)
+    pairs = list(_consume((parse_log_file(p, start) for p, start in todo), manifest))
+    manifest.update(watermarks(pairs))
+    return pairs, manifest
+
+
+def _consume(results, empty: dict):
+    """Yield each file's pairs, the last one tagged with the file's watermark; pairless files go to `empty`."""
+    for res in results:
+        if res["error"]:
+            print(f"⚠️ Skipping {Path(res['path']).name} due to JSON error: {res['error']}")
+            continue
+        entry = {k: res[k] for k in ("mtime", "size", "rows")}
+        if not res["pairs"]:
+            empty[res["path"]] = entry
+            continue
+        res["pairs"][-1]["watermark"] = entry
+        yield from res["pairs"]
@@ -0,0 +1,100 @@
+# orion_cli/utils/ltm_client.py
+#
+# Thin client for the local LTM service (orion_cli/core/ltm_service.py).
+# Uses only the standard library so importing it never loads the embedder.
+
+import json
+import os
+import urllib.error
+import urllib.request
+
+from orion_cli.utils.ltm_utils import load_ltm_config
+
+
+class LTMServiceError(RuntimeError):
+    pass
+
+
+class LTMClient:
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, path: str, body: dict = None) -> dict:
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        req = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={"Content-Type": "application/json"},
+            method="GET" if body is None else "POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise LTMServiceError(f"{path}: {e.code} {e.read().decode(errors='replace')}")
+        except (urllib.error.URLError, OSError) as e:
+            raise LTMServiceError(f"{path}: {e}")
+
+    def health(self) -> bool:
+        try:
+            return self._call("/health").get("status") == "ok"
+        except LTMServiceError:
+            return False
+
+    def ready(self) -> bool:
+        try:
+            return bool(self._call("/health").get("ready"))
+        except LTMServiceError:
+            return False
+
+    def retrieve(self, query: str, mood: tuple = None) -> tuple[str, dict]:
+        res = self._call("/retrieve", {"query": query, "mood": list(mood) if mood else None})
+        return res["context"], res.get("debug", {})
+
+    def add(self, collection: str, ids, documents, metadatas=None) -> int:
+        res = self._call(
+            "/add",
+            {"collection": collection, "ids": ids, "documents": documents, "metadatas": metadatas},
+        )
+        return res["added"]
+
+    def add_batch(self, items: list[dict]) -> int:
+        return self._call("/add_batch", {"items": items})["added"]
+
+    def user_turn(self, text: str, conversation_id: str = None):
+        self._call("/turn", {"role": "user", "text": text, "conversation_id": conversation_id})
+
+    def assistant_turn(self, text: str, last_user_input: str = None, conversation_id: str = None):
+        self._call(
+            "/turn",
+            {
+                "role": "assistant",
+                "text": text,
+                "last_user_input": last_user_input,
+                "conversation_id": conversation_id,
+            },
+        )
+
+
+def service_url() -> str | None:
+    """ORION_LTM_SERVICE_URL wins; otherwise ltm.service in ltm_config.yaml if enabled."""
+    url = os.environ.get("ORION_LTM_SERVICE_URL")
+    if url:
+        return url
+    svc = load_ltm_config().get("service") or {}
+    if svc.get("enabled"):
+        return f"http://{svc.get('host', '127.0.0.1')}:{svc.get('port', 5055)}"
+    return None
+
+
+def get_service_client() -> LTMClient | None:
+    """Return a client if a service is configured and answering, else None (use in-process LTM)."""
+    url = service_url()
+    if not url:
+        return None
+    client = LTMClient(url)
+    if not client.health():
+        print(f"[ltm] ⚠️ LTM service at {url} not reachable — falling back to in-process LTM.")
+        return None
+    return client
@@ -0,0 +1,150 @@
+# orion_cli/utils/ltm_export.py
+#
+# Paged export of a Chroma collection for auditing (orion ltm-dump).
+#
+# Records are pulled with coll.get(where=..., limit=page_size, offset=...) so
+# filtering happens in Chroma's SQLite layer and at most one page is held in
+# memory. Writers stream each page straight out as JSONL, CSV or Parquet
+# (pyarrow, optional). Nothing here touches the embedding model.
+
+import csv
+import json
+import sys
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet")
+DEFAULT_PAGE_SIZE = 1000
+
+
+def iter_pages(
+    coll,
+    *,
+    where: dict = None,
+    where_document: dict = None,
+    offset: int = 0,
+    limit: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    include_embeddings: bool = False,
+):
+    """
+    Yield coll.get() pages of at most `page_size` records, starting at `offset`
+    and stopping after `limit` records (None = to the end).
+    """
+    include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+    remaining = limit
+    while remaining is None or remaining > 0:
+        n = page_size if remaining is None else min(page_size, remaining)
+        kwargs = {"include": include, "limit": n, "offset": offset}
+        if where:
+            kwargs["where"] = where
+        if where_document:
+            kwargs["where_document"] = where_document
+        page = coll.get(**kwargs)
+        ids = page.get("ids") or []
+        if not ids:
+            return
+        yield page
+        offset += len(ids)
+        if remaining is not None:
+            remaining -= len(ids)
+        if len(ids) < n:
+            return
+
+
+def iter_records(pages):
+    """Flatten pages into {"id", "document", "metadata"[, "embedding"]} dicts."""
+    for page in pages:
+        embeddings = page.get("embeddings")
+        for i, id_ in enumerate(page["ids"]):
+            rec = {
+                "id": id_,
+                "document": page["documents"][i] if page.get("documents") else None,
+                "metadata": (page["metadatas"][i] if page.get("metadatas") else None) or {},
+            }
+            if embeddings is not None:
+                rec["embedding"] = [float(x) for x in embeddings[i]]
+            yield rec
+
+
+# === Writers: each takes the page iterator and a binary/text stream ===
+def _write_jsonl(pages, out) -> int:
+    n = 0
+    for rec in iter_records(pages):
+        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        n += 1
+    return n
+
+
+def _write_csv(pages, out) -> int:
+    # Metadata keys differ per record, so they go in one JSON column to keep the
+    # header fixed without a first pass over the collection
+    writer = None
+    n = 0
+    for rec in iter_records(pages):
+        if writer is None:
+            fields = ["id", "document", "metadata"] + (["embedding"] if "embedding" in rec else [])
+            writer = csv.DictWriter(out, fieldnames=fields)
+            writer.writeheader()
+        rec["metadata"] = json.dumps(rec["metadata"], ensure_ascii=False)
+        if "embedding" in rec:
+            rec["embedding"] = json.dumps(rec["embedding"])
+        writer.writerow(rec)
+        n += 1
+    return n
+
+
+def _write_parquet(pages, out) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    writer = None
+    n = 0
+    try:
+        for page in pages:
+            # One row group per page keeps memory flat regardless of collection size
+            recs = list(iter_records([page]))
+            columns = {
+                "id": [r["id"] for r in recs],
+                "document": [r["document"] for r in recs],
+                "metadata": [json.dumps(r["metadata"], ensure_ascii=False) for r in recs],
+            }
+            if recs and "embedding" in recs[0]:
+                columns["embedding"] = [r["embedding"] for r in recs]
+            table = pa.table(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table)
+            n += len(recs)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+
+_WRITERS = {"jsonl": _write_jsonl, "csv": _write_csv, "parquet": _write_parquet}
+
+
+def export_collection(coll, fmt: str = "jsonl", output: str = None, **page_kwargs) -> int:
+    """
+    Stream `coll` to `output` (path, or stdout when None/"-") in `fmt`.
+    `page_kwargs` go to iter_pages (where, where_document, offset, limit, ...).
+    Returns the number of records written.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"[ltm] Unknown export format '{fmt}' (expected one of {EXPORT_FORMATS})")
+    pages = iter_pages(coll, **page_kwargs)
+    binary = fmt == "parquet"
+
+    if output in (None, "-"):
+        out = sys.stdout.buffer if binary else sys.stdout
+        n = _WRITERS[fmt](pages, out)
+        out.flush()
+        return n
+
+    if binary:
+        with open(output, "wb") as out:
+            return _WRITERS[fmt](pages, out)
+    with open(output, "w", encoding="utf-8", newline="") as out:
+        return _WRITERS[fmt](pages, out)
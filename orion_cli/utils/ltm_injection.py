@@ -0,0 +1,89 @@
+# orion_cli/utils/ltm_injection.py
+#
+# Where retrieved LTM goes in the chat prompt.
+#
+#   system        everything is appended to the system message as one
+#                 [LTM CONTEXT] block (the original layout). The memory list
+#                 changes nearly every turn, and the system message opens the
+#                 rendered template, so llama.cpp's cache_prompt can reuse
+#                 almost nothing and re-evaluates the whole history each turn.
+#   prefix_cache  only the stable part (the pinned persona block, see
+#                 utils.pinned_persona) is appended to the system message;
+#                 the volatile hits (conditional persona tiers + episodic) are
+#                 placed in front of the latest user message. System prompt
+#                 and older history stay byte-identical between turns, so only
+#                 the last exchange and the new memories are re-evaluated.
+#
+# The layout works on (memory_text, debug) as returned by get_relevant_ltm,
+# locally or through the LTM service.
+
+MODES = ("system", "prefix_cache")
+DEFAULT_MODE = "system"
+
+
+def split_context(memory_text: str, dbg: dict) -> tuple[list[str], list[str]]:
+    """(stable lines, volatile lines): the pinned block leads the context."""
+    lines = memory_text.split("\n") if memory_text else []
+    n_pinned = int((dbg or {}).get("pinned_lines", 0))
+    return lines[:n_pinned], lines[n_pinned:]
+
+
+def system_key(state: dict) -> str:
+    """State field that generate_chat_prompt renders as the system message."""
+    return "custom_system_message" if state.get("mode") == "instruct" else "context"
+
+
+def _structured(lines: list[str]) -> str:
+    persona, episodic = [], []
+    bucket = None
+    for line in lines:
+        if line.startswith("[PERSONA]"):
+            bucket = persona
+        elif line.startswith("[EPISODIC]"):
+            bucket = episodic
+        elif bucket and line.strip():
+            bucket[-1] += f"\n  {line}"  # continuation of a multi-line memory
+            continue
+        else:
+            continue
+        bucket.append(f"- {line}")
+    parts = []
+    if persona:
+        parts += ["### [PERSONA MEMORY]", *persona]
+    if episodic:
+        parts += ["### [EPISODIC MEMORY]", *episodic]
+    return "\n".join(parts)
+
+
+def _append_system(state: dict, block: str, header: str):
+    key = system_key(state)
+    base = (state.get(key) or "").rstrip()
+    state[key] = f"{base}\n\n{header}\n{block}" if base else f"{header}\n{block}"
+
+
+def apply_layout(
+    state: dict,
+    user_input: str,
+    memory_text: str,
+    dbg: dict,
+    mode: str = DEFAULT_MODE,
+) -> tuple[dict, str]:
+    """
+    Place retrieved memories into `state` (system message) and/or the user
+    input according to `mode`. Returns (state, user_input) to hand to
+    generate_chat_prompt; `state` is modified in place.
+    """
+    stable, volatile = split_context(memory_text, dbg)
+
+    if mode != "prefix_cache":
+        block = _structured(stable + volatile)
+        if block:
+            _append_system(state, block, "[LTM CONTEXT]")
+        return state, user_input
+
+    if stable:
+        _append_system(state, _structured(stable), "[PERSONA CORE]")
+    block = _structured(volatile)
+    if block and user_input:
+        user_input = f"[LTM CONTEXT]\n{block}\n[/LTM CONTEXT]\n\n{user_input}"
+    return state, user_input
@@ -2,10 +2,8 @@
 import yaml
 from pathlib import Path
 import time
-from orion_cli.utils.embedding import estimate_tone_and_tags
-from orion_cli.utils.embedding import load_ltm_config
 
-_buffer = []
+from orion_cli.utils.metrics import observe_stage, timed
 
 CONFIG_PATH = Path(__file__).resolve().parent.parent / "data" / "ltm_config.yaml"
 DEFAULTS = {
@@ -15,23 +13,44 @@ DEFAULTS = {
     "min_score": 0.7,
 }
 
+_config_cache = {"key": None, "config": None}
+
+
 def load_ltm_config():
+    """The `ltm:` section over DEFAULTS; re-parsed only when the file's mtime or size changes."""
     try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-            return config.get("ltm", DEFAULTS)
+        st = CONFIG_PATH.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        if _config_cache["key"] != key:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f) or {}
+            _config_cache.update(key=key, config={**DEFAULTS, **(config.get("ltm") or {})})
+        return dict(_config_cache["config"])
     except Exception as e:
         print(f"[ltm] ⚠️ Failed to load config: {e}")
         return DEFAULTS
 
 
+@timed("get_relevant_ltm")
 def get_relevant_ltm(
     user_input: str,
     persona_coll,
     episodic_coll,
     *,
-    return_debug: bool = False
+    return_debug: bool = False,
+    sentence_coll=None,
+    mood: tuple = None,
 ) -> tuple[str, dict]:
+    """
+    With `sentence_coll`, episodic recall searches sentence spans instead of
+    whole turns (at most sentences.max_per_parent spans per turn), so each hit
+    injects a short span rather than a multi-paragraph block. With
+    hierarchical.enabled, only the spans of the best-matching turns are scored.
+
+    `mood` is a (valence, arousal) target: candidates are re-weighted by their
+    distance to it in emotion space (utils.emotion_index), and with
+    emotion.mode = filter a populated mood region also pre-filters the query.
+    """
     cfg = load_ltm_config()
     topk_persona = cfg["topk_persona"]
     topk_episodic = cfg["topk_episodic"]
@@ -40,14 +59,60 @@ def get_relevant_ltm(
     tone_boosts = cfg.get("boosts", {}).get("tone", {})
     tag_boosts = cfg.get("boosts", {}).get("tags", {})
 
+    mood_cfg = cfg.get("emotion") or {}
+    use_mood = mood is not None and mood_cfg.get("enabled", True)
+
     results = []
 
+    # 📌 priority-10 fragments are always injected from a precomputed block;
+    # similarity search only ranks the conditional tiers
+    pinned = None
+    pin_cfg = cfg.get("pinned_persona") or {}
+    if pin_cfg.get("enabled", True):
+        try:
+            from orion_cli.utils.pinned_persona import get_pinned_block
+
+            with timed("pinned_persona"):
+                pinned = get_pinned_block(persona_coll, float(pin_cfg.get("refresh_seconds", 30)))
+        except Exception as e:
+            print(f"[ltm] Pinned persona unavailable: {e}")
+
+    # Embed the query once (timed on its own) and reuse it for every collection sharing the embedder
+    from orion_cli.utils.chroma_utils import embedding_function
+
+    embed_fn = embedding_function(persona_coll)
+    query_by = {"query_texts": [user_input]}
+    if embed_fn is not None:
+        try:
+            with timed("embed_query"):
+                query_by = {"query_embeddings": [list(map(float, embed_fn([user_input])[0]))]}
+        except Exception as e:
+            print(f"[ltm] Query embedding failed, letting Chroma embed: {e}")
+
     try:
-        p_res = persona_coll.query(
-            query_texts=[user_input],
-            n_results=topk_persona,
-            include=["metadatas", "documents"]
-        )
+        fetch = topk_persona * 2 if use_mood else topk_persona
+        persona_kwargs = {}
+        if pinned is not None:
+            from orion_cli.utils.pinned_persona import PINNED_PRIORITY
+
+            # Tiers 1-9 only: 10 is in the pinned block, 0 is never auto-injected
+            persona_kwargs["where"] = {
+                "$and": [{"priority": {"$gt": 0}}, {"priority": {"$lt": PINNED_PRIORITY}}]
+            }
+        with timed("persona_query"):
+            p_res = persona_coll.query(
+                **query_by,
+                n_results=fetch,
+                include=["metadatas", "documents", "distances"],
+                **persona_kwargs,
+            )
+        order = list(range(len(p_res.get("ids", [[]])[0])))[:fetch]
+        if use_mood:
+            # Over-fetch, then keep the persona fragments closest in similarity + mood
+            with timed("rescore"):
+                boosts = _mood_boosts(persona_coll, p_res, mood, mood_cfg)
+            closeness = [1 - d + b for d, b in zip(p_res["distances"][0], boosts)]
+            order = sorted(order, key=lambda i: closeness[i], reverse=True)[:topk_persona]
         results.extend(
             {
                 "source": "persona",
@@ -55,20 +120,54 @@ def get_relevant_ltm(
                 "meta": p_res["metadatas"][0][i],
                 "score": 1.0,
             }
-            for i in range(len(p_res.get("ids", [[]])[0]))
+            for i in order
         )
     except Exception as e:
         print(f"[ltm] Persona query failed: {e}")
 
+    max_per_parent = int((cfg.get("sentences") or {}).get("max_per_parent", 2))
+    per_parent = {}
+
     try:
-        e_res = episodic_coll.query(
-            query_texts=[user_input],
-            n_results=topk_episodic * 2,
-            include=["documents", "metadatas", "distances"]
+        hier = cfg.get("hierarchical") or {}
+        if sentence_coll is not None and hier.get("enabled"):
+            from orion_cli.utils.hier_retrieval import hierarchical_query
+
+            # Coarse turns/pooled blocks first, then only their sentence spans
+            with timed("episodic_query"):
+                e_res = hierarchical_query(
+                    user_input,
+                    episodic_coll,
+                    sentence_coll,
+                    n_results=topk_episodic * 4,
+                    top_parents=int(hier.get("top_parents", 8)),
+                )
+        else:
+            target = sentence_coll or episodic_coll
+            query_kwargs = {}
+            if use_mood and mood_cfg.get("mode") == "filter":
+                query_kwargs["where"] = _mood_prefilter(target, mood, mood_cfg)
+            with timed("episodic_query"):
+                e_res = target.query(
+                    **(query_by if embedding_function(target) is embed_fn else {"query_texts": [user_input]}),
+                    n_results=topk_episodic * (4 if sentence_coll is not None else 2),
+                    include=["documents", "metadatas", "distances"],
+                    **{k: v for k, v in query_kwargs.items() if v}
+                )
+        rescore_start = time.perf_counter()
+        mood_boost = (
+            _mood_boosts(sentence_coll or episodic_coll, e_res, mood, mood_cfg) if use_mood else None
         )
         for i in range(len(e_res.get("ids", [[]])[0])):
             doc = e_res["documents"][0][i]
             meta = e_res["metadatas"][0][i]
+            if sentence_coll is not None:
+                # Spread the budget over several turns instead of one chatty one; a whole
+                # turn or pooled block returned as itself is its own parent
+                parent = meta.get("parent_id") or e_res["ids"][0][i]
+                per_parent[parent] = per_parent.get(parent, 0) + 1
+                if per_parent[parent] > max_per_parent:
+                    continue
             distance = e_res["distances"][0][i]
             similarity = 1 - distance
             importance = float(meta.get("importance", 0))
@@ -79,66 +178,129 @@ def get_relevant_ltm(
 
             boost = tone_boosts.get(tone, 0.0)
             boost += sum(tag_boosts.get(tag, 0.0) for tag in tags)
+            if mood_boost is not None:
+                boost += float(mood_boost[i])
 
             similarity = min(similarity + boost, 1.0)
 
             if similarity >= min_score or importance >= importance_threshold:
                 results.append({
                     "source": "episodic",
+                    "id": e_res["ids"][0][i],
                     "doc": doc,
                     "meta": meta,
                     "score": round(similarity, 4)
                 })
+        observe_stage("rescore", (time.perf_counter() - rescore_start) * 1000)
     except Exception as e:
         print(f"[ltm] Episodic query failed: {e}")
 
     results = sorted(results, key=lambda r: r["score"], reverse=True)
     results = results[: max(topk_persona, topk_episodic)]
 
+    window = int((cfg.get("adjacency") or {}).get("window", 0))
+    expanded = 0
+    if window > 0:
+        with timed("expand_neighbors"):
+            expanded = _expand_neighbors(results, episodic_coll, window)
+
     ctx_lines = [f"[{r['source'].upper()}] {r['doc']}" for r in results]
+    if pinned is not None and pinned.text:
+        ctx_lines.insert(0, pinned.text)  # byte-identical every turn: stable prompt prefix
 
     dbg = {
         "persona_hits": sum(1 for r in results if r["source"] == "persona"),
         "episodic_hits": sum(1 for r in results if r["source"] == "episodic"),
         "persona_top": topk_persona,
         "episodic_top": topk_episodic,
+        "expanded_hits": expanded,
+        "pinned_persona": len(pinned.ids) if pinned else 0,
+        "pinned_tokens": pinned.n_tokens if pinned else 0,
+        "pinned_lines": pinned.text.count("\n") + 1 if pinned is not None and pinned.text else 0,
     }
 
     return ("\n".join(ctx_lines), dbg) if return_debug else ("\n".join(ctx_lines), {})
     
-def live_pooled_store(user_input: str, assistant_reply: str, episodic_collection):
-    from datetime import datetime
+def _mood_boosts(coll, res: dict, mood: tuple, mood_cfg: dict):
+    """
+    Additive score per query hit, computed in one vectorized pass over the
+    emotion index: mood affinity (scaled by confidence) and priority, both
+    centred so memories without scalars are neither helped nor hurt.
+    """
+    import numpy as np
+    from orion_cli.utils.emotion_index import get_emotion_index
+
+    ids = res.get("ids", [[]])[0]
+    missing = float(mood_cfg.get("missing_affinity", 0.5))
+    index = get_emotion_index(coll, float(mood_cfg.get("refresh_seconds", 60)))
+    affinity, s = index.mood_scores(
+        ids, float(mood[0]), float(mood[1]), sigma=float(mood_cfg.get("sigma", 0.35)), missing=missing
+    )
+    confidence = np.nan_to_num(s["confidence"], nan=1.0)
+    priority = np.nan_to_num(s["priority"] / 10.0 - 0.5, nan=0.0)
+    return (
+        float(mood_cfg.get("weight", 0.1)) * (affinity - missing) * confidence
+        + float(mood_cfg.get("priority_weight", 0.02)) * priority
+    )
+
+
+def _mood_prefilter(coll, mood: tuple, mood_cfg: dict):
+    """A valence/arousal where-box when enough memories sit in the mood region, else None."""
+    from orion_cli.utils.emotion_index import get_emotion_index, mood_where
 
-    config = load_ltm_config()
-    if not config.get("live_pooled_ingest"):
-        return
+    radius = float(mood_cfg.get("radius", 0.3))
+    index = get_emotion_index(coll, float(mood_cfg.get("refresh_seconds", 60)))
+    if index.count_within(float(mood[0]), float(mood[1]), radius) < int(mood_cfg.get("min_candidates", 20)):
+        return None  # too sparse: filtering would starve recall, rely on weighting
+    return mood_where(float(mood[0]), float(mood[1]), radius)
 
-    turns = config.get("pooling_turns", 3)
 
-    _buffer.append({"user": user_input.strip(), "assistant": assistant_reply.strip()})
+def _expand_neighbors(results: list[dict], episodic_coll, window: int) -> int:
+    """
+    Replace each episodic hit's text with the ±window turns around it in its
+    conversation (adjacency index), fetched with one coll.get(ids=...).
+    Sentence-span hits are centred on their parent turn but keep the span.
+    """
+    from orion_cli.utils.adjacency_index import get_adjacency_index
 
-    if len(_buffer) < turns:
-        return  # not ready
+    adjacency = get_adjacency_index()
+    hits = [r for r in results if r["source"] == "episodic"]
+    if adjacency is None or not hits:
+        return 0
 
+    keys = [(r.get("meta") or {}).get("parent_id") or r.get("id") for r in hits]
+    around = adjacency.neighbors(set(keys), window)
+    wanted = sorted({m for ids in around.values() for m in ids} - set(keys))
+    if not wanted:
+        return 0
     try:
-        pooled_text = "\n".join(f"User: {p['user']}\nAssistant: {p['assistant']}" for p in _buffer)
-        tone, tags = estimate_tone_and_tags(pooled_text)
-
-        timestamp = time.time()
-        episodic_collection.add(
-            ids=[f"pooled-{int(timestamp)}"],
-            documents=[pooled_text],
-            metadatas=[{
-                "timestamp": timestamp,
-                "importance": 0.8,
-                "source": "assistant",
-                "tags": tags,
-                "tone": tone,
-                "pooled": True
-            }]
-        )
-        print(f"[ltm] 🔄 Live pooled memory added: tone={tone}, tags={','.join(tags)}")
+        got = episodic_coll.get(ids=wanted, include=["documents"])
     except Exception as e:
-        print(f"[ltm] Live pooled ingestion failed: {e}")
-    finally:
-        _buffer.clear()
\ No newline at end of file
+        print(f"[ltm] Neighbor expansion failed: {e}")
+        return 0
+    docs = dict(zip(got.get("ids") or [], got.get("documents") or []))
+
+    expanded = 0
+    for r, key in zip(hits, keys):
+        ids = around.get(key)
+        if not ids or len(ids) == 1:
+            continue
+        parts = [r["doc"] if m == key else docs.get(m) for m in ids]
+        r["doc"] = " | ".join(" ".join(p.split()) for p in parts if p)
+        r["neighbors"] = ids
+        expanded += 1
+    return expanded
+
+
+@timed("live_pooled_store")
+def live_pooled_store(user_input: str, assistant_reply: str, episodic_collection, session_id: str = None) -> bool:
+    """
+    Add one exchange to the session's pooling window (utils.live_pooler).
+    Returns immediately; completed blocks are tone-tagged and written in the background.
+    """
+    from orion_cli.utils.live_pooler import get_live_pooler
+
+    pooler = get_live_pooler()
+    if pooler is None:
+        return False
+    return pooler.add(session_id, user_input, assistant_reply, episodic_collection)
@@ -0,0 +1,195 @@
+# orion_cli/utils/metrics.py
+#
+# Tiny in-process histograms (fixed buckets, thread-safe) for tuning LTM internals.
+#
+# Per-turn timings: `turn(kind)` opens a turn for the current thread/context
+# (extension hook or service request), `timed(stage)` - a context manager or
+# decorator - records a stage into its `orion_ltm_<stage>_ms` histogram and
+# into the open turn. When the turn closes, its breakdown is available for the
+# verbose log and, with ltm.metrics.trace on, appended as one JSON line to the
+# trace file. render_prometheus() exposes every histogram as Prometheus text.
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self, name: str, buckets=DEFAULT_MS_BUCKETS, help: str = ""):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Cumulative bucket counts, Prometheus-style."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, c in zip(list(self.buckets) + ["+Inf"], counts):
+            running += c
+            cumulative[str(bound)] = running
+        return {
+            "buckets": cumulative,
+            "sum": total,
+            "count": count,
+            "mean": (total / count) if count else 0.0,
+        }
+
+
+def histogram(name: str, buckets=DEFAULT_MS_BUCKETS, help: str = "") -> Histogram:
+    """Get or create a process-wide histogram by name."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, buckets, help)
+        return _registry[name]
+
+
+def snapshot_all() -> dict:
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: h.snapshot() for name, h in items}
+
+
+def render_prometheus() -> str:
+    """All histograms in the Prometheus text exposition format."""
+    with _registry_lock:
+        items = sorted(_registry.items())
+    lines = []
+    for name, h in items:
+        snap = h.snapshot()
+        if h.help:
+            lines.append(f"# HELP {name} {h.help}")
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in snap["buckets"].items():
+            lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{name}_sum {snap['sum']}")
+        lines.append(f"{name}_count {snap['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# === Per-turn timings ===
+class Turn:
+    def __init__(self, kind: str, **fields):
+        self.kind = kind
+        self.fields = fields
+        self.stages = {}  # stage -> ms (summed if a stage runs more than once)
+        self.started = time.time()
+        self.total_ms = 0.0
+
+    def summary(self) -> str:
+        parts = " ".join(f"{k}={v:.1f}" for k, v in self.stages.items())
+        return f"{self.kind} {self.total_ms:.1f} ms ({parts})"
+
+    def record(self) -> dict:
+        return {
+            "ts": round(self.started, 3),
+            "kind": self.kind,
+            **self.fields,
+            "total_ms": round(self.total_ms, 3),
+            "stages": {k: round(v, 3) for k, v in self.stages.items()},
+        }
+
+
+_current_turn = contextvars.ContextVar("orion_ltm_turn", default=None)
+_trace_lock = threading.Lock()
+
+
+def current_turn() -> Turn | None:
+    return _current_turn.get()
+
+
+def observe_stage(stage: str, ms: float):
+    histogram(f"orion_ltm_{stage}_ms", help=f"Time spent in {stage}.").observe(ms)
+    t = _current_turn.get()
+    if t is not None:
+        t.stages[stage] = t.stages.get(stage, 0.0) + ms
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a stage (`with timed("persona_query"):` or `@timed("on_user_turn")`)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def turn(kind: str, **fields):
+    """
+    Open a per-turn breakdown; yields the Turn. Nested calls join the outer
+    turn. On exit the total is observed and the trace line written if enabled.
+    """
+    outer = _current_turn.get()
+    if outer is not None:
+        yield outer
+        return
+    t = Turn(kind, **fields)
+    token = _current_turn.set(t)
+    start = time.perf_counter()
+    try:
+        yield t
+    finally:
+        _current_turn.reset(token)
+        t.total_ms = (time.perf_counter() - start) * 1000
+        histogram(f"orion_ltm_turn_{kind}_ms", help=f"Wall time of a {kind} turn.").observe(t.total_ms)
+        _write_trace(t)
+
+
+_trace_setting = []  # [path or None] once resolved
+
+
+def _trace_path():
+    """
+    Trace file if per-turn tracing is on (ORION_LTM_TRACE or ltm.metrics.trace),
+    else None. Resolved once per process: closing a turn never reads the config.
+    """
+    if not _trace_setting:
+        env = os.getenv("ORION_LTM_TRACE")
+        path = None
+        if env is None or env.lower() not in ("", "0", "false", "no"):
+            from orion_cli.utils.ltm_utils import load_ltm_config
+
+            cfg = load_ltm_config().get("metrics") or {}
+            if env is not None or cfg.get("trace"):
+                path = cfg.get("trace_path") or "user_data/logs/orion_ltm_trace.jsonl"
+        _trace_setting.append(path)
+    return _trace_setting[0]
+
+
+def _write_trace(t: Turn):
+    try:
+        path = _trace_path()
+        if path is None:
+            return
+        line = json.dumps(t.record(), ensure_ascii=False) + "\n"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _trace_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except Exception as e:
+        print(f"[ltm] ⚠️ Trace write failed: {e}")
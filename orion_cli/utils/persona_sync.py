@@ -0,0 +1,198 @@
+# orion_cli/utils/persona_sync.py
+#
+# Fragment-level diff ingest for persona.yaml (orion persona-ingest).
+#
+# Every fragment gets a stable key derived from what it *is* (an explicit
+# `id`/`key` in the YAML, or a hash of its text) rather than its list
+# position, plus a content hash stored in its metadata. A sync then:
+#   - upserts (re-embeds) only fragments whose text is new or changed,
+#   - updates metadata in place when only tone/weight/... changed,
+#   - deletes fragments that disappeared from the source.
+
+import hashlib
+import json
+
+HASH_KEY = "content_hash"
+DOC_HASH_KEY = "doc_hash"
+PAGE_SIZE = 1000
+DEFAULT_PRIORITY = 5  # mid-tier (schema_doc.md) for fragments that set none
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _doc_hash(doc: str) -> str:
+    return _sha(" ".join(doc.split()))[:16]
+
+
+def _content_hash(doc: str, meta: dict) -> str:
+    clean = {k: v for k, v in meta.items() if k not in (HASH_KEY, DOC_HASH_KEY)}
+    return _sha(doc + "\x1f" + json.dumps(clean, sort_keys=True, ensure_ascii=False))[:16]
+
+
+def _flatten(meta: dict) -> dict:
+    # Chroma metadata values must be scalars
+    return {k: ",".join(map(str, v)) if isinstance(v, list) else v for k, v in meta.items()}
+
+
+class Fragments:
+    """Collects (id, document, metadata) and keeps keys unique within a prefix."""
+
+    def __init__(self):
+        self.items = {}
+
+    def add(self, prefix: str, doc: str, meta: dict, key=None):
+        base = f"{prefix}::{key if key is not None else _doc_hash(doc)}"
+        fid, n = base, 1
+        while fid in self.items:  # the same line twice in the YAML
+            n += 1
+            fid = f"{base}#{n}"
+        meta = _flatten(meta)
+        # Recall filters persona tiers on priority; a fragment without one would never match
+        meta.setdefault("priority", DEFAULT_PRIORITY)
+        meta[DOC_HASH_KEY] = _doc_hash(doc)
+        meta[HASH_KEY] = _content_hash(doc, meta)
+        self.items[fid] = (doc, meta)
+
+
+def persona_fragments(persona_data: dict, out: Fragments = None) -> Fragments:
+    out = out or Fragments()
+    persona = (persona_data or {}).get("persona", {}) or {}
+
+    for k in ["name", "identity"]:
+        if k in persona:
+            meta = {
+                "tag": "persona",
+                "kind": "persona",
+                "topic": "identity",
+                "priority": 10,
+                "active": True,
+            }
+            out.add("persona", f"{k}: {persona[k]}", meta, key=k)
+
+    for entry in persona.get("catalog", []) or []:
+        meta = {
+            "tag": "persona",
+            "kind": "persona",
+            "topic": "identity",
+            "tone": entry.get("tone", "neutral"),
+            "weight": entry.get("weight", 1.0),
+            "priority": 8,
+            "active": True,
+        }
+        out.add("catalog", entry["text"], meta, key=entry.get("id") or entry.get("key"))
+
+    for emo in persona.get("emotions", []) or []:
+        emo = dict(emo)
+        doc = emo.pop("text")
+        key = emo.pop("id", None) or emo.pop("key", None)
+        out.add("emotion", doc, {**emo, "tag": "persona", "active": True}, key=key)
+
+    return out
+
+
+def dialog_fragments(path, out: Fragments = None) -> Fragments:
+    out = out or Fragments()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            doc = entry.get("document")
+            if not doc:
+                continue
+            out.add("dialog", doc, dict(entry.get("metadata") or {}), key=entry.get("id"))
+    return out
+
+
+def legacy_fragments(path, out: Fragments = None) -> Fragments:
+    out = out or Fragments()
+    with open(path, "r", encoding="utf-8") as f:
+        legacy_data = json.load(f)
+    for ex in legacy_data:
+        text = f"USER: {ex.get('user', '')}\nORION: {ex.get('assistant', '')}"
+        meta = {
+            "tag": "persona",
+            "tags": "mock_dialog,persona_reinforce,tone_training",
+            "weight": 1.0,
+            "why_saved": "mock_persona_seed",
+        }
+        out.add("legacy", text, meta)
+    return out
+
+
+def _existing(coll, prefixes) -> dict:
+    """id -> (doc_hash, content_hash) for stored fragments under `prefixes`."""
+    found, offset = {}, 0
+    while True:
+        page = coll.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            return found
+        for fid, meta in zip(ids, page.get("metadatas") or [{}] * len(ids)):
+            if fid.split("::", 1)[0] in prefixes:
+                meta = meta or {}
+                found[fid] = (meta.get(DOC_HASH_KEY), meta.get(HASH_KEY))
+        offset += len(ids)
+
+
+def sync_fragments(coll, fragments: Fragments, prefixes, *, dry_run: bool = False) -> dict:
+    """
+    Bring the fragments under `prefixes` in `coll` in line with `fragments`.
+    Only prefixes whose source was loaded this run should be passed, so e.g.
+    a persona-only run never deletes dialog examples.
+    """
+    prefixes = set(prefixes)
+    stored = _existing(coll, prefixes)
+    wanted = fragments.items
+
+    added = [fid for fid in wanted if fid not in stored]
+    changed, retagged = [], []
+    for fid, (doc, meta) in wanted.items():
+        if fid not in stored or stored[fid][1] == meta[HASH_KEY]:
+            continue
+        (retagged if stored[fid][0] == meta[DOC_HASH_KEY] else changed).append(fid)
+    removed = [fid for fid in stored if fid not in wanted]
+
+    diff = {
+        "added": added,
+        "changed": changed,
+        "retagged": retagged,
+        "removed": removed,
+        "unchanged": len(wanted) - len(added) - len(changed) - len(retagged),
+    }
+    if dry_run:
+        return diff
+
+    embed_ids = added + changed
+    if embed_ids:
+        coll.upsert(
+            ids=embed_ids,
+            documents=[wanted[i][0] for i in embed_ids],
+            metadatas=[wanted[i][1] for i in embed_ids],
+        )
+    if retagged:
+        # Same text: keep the stored vector, swap metadata only
+        coll.update(ids=retagged, metadatas=[wanted[i][1] for i in retagged])
+    if removed:
+        coll.delete(ids=removed)
+    if embed_ids or retagged or removed:
+        from orion_cli.utils.pinned_persona import touch_persona_stamp
+
+        touch_persona_stamp()  # running webui/service rebuild their pinned block
+    return diff
+
+
+def format_diff(diff: dict, show: int = 10) -> str:
+    lines = [
+        f"+{len(diff['added'])} added, ~{len(diff['changed'])} re-embedded, "
+        f"*{len(diff['retagged'])} metadata-only, -{len(diff['removed'])} removed, "
+        f"={diff['unchanged']} unchanged"
+    ]
+    for sign, key in (("+", "added"), ("~", "changed"), ("*", "retagged"), ("-", "removed")):
+        ids = diff[key]
+        lines += [f"   {sign} {fid}" for fid in ids[:show]]
+        if len(ids) > show:
+            lines.append(f"   {sign} ... {len(ids) - show} more")
+    return "\n".join(lines)
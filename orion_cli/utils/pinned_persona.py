@@ -0,0 +1,124 @@
+# orion_cli/utils/pinned_persona.py
+#
+# Pinned persona block: every `priority: 10` fragment ("always inject" in
+# schema_doc.md) rendered once into a fixed text block, kept with its token
+# IDs and token count, and reused verbatim on every turn. Similarity search
+# then only has to rank the conditional tiers (priority 1-9).
+#
+# The block is rebuilt only when the persona changes: persona-ingest touches
+# <ORION_CHROMA_PATH>/orion_persona.stamp, and the collection count is
+# re-checked at most every `refresh_seconds`. It is re-tokenized (without a
+# Chroma read) when the active tokenizer changes, e.g. after a model switch.
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PINNED_PRIORITY = 10
+
+
+@dataclass
+class PinnedBlock:
+    text: str = ""
+    ids: tuple = ()
+    version: tuple = ()
+    tokens: list = field(default_factory=list)
+    n_tokens: int = 0
+    tokenizer_key: object = None
+
+
+def stamp_path() -> Path:
+    return Path(os.getenv("ORION_CHROMA_PATH", "user_data/chroma_db")) / "orion_persona.stamp"
+
+
+def touch_persona_stamp():
+    """Mark the persona as changed so pinned blocks are rebuilt on next use."""
+    path = stamp_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(str(time.time()), encoding="utf-8")
+
+
+def _stamp() -> int:
+    try:
+        return stamp_path().stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+# === Tokenizer hook (the web UI registers the loaded model's tokenizer) ===
+_tokenizer = {"fn": None, "key": None}
+
+
+def set_tokenizer(tokenize, key_fn=None):
+    """
+    `tokenize(text) -> list[int] | None`; `key_fn() -> hashable` identifies the
+    tokenizer (e.g. the model name) so a model switch triggers re-tokenization.
+    """
+    _tokenizer.update(fn=tokenize, key=key_fn)
+
+
+def _tokenize(text: str):
+    fn, key_fn = _tokenizer["fn"], _tokenizer["key"]
+    key = key_fn() if key_fn else None
+    tokens = None
+    if fn is not None and text:
+        try:
+            tokens = fn(text)
+        except Exception as e:
+            print(f"[ltm] ⚠️ Pinned persona tokenization failed: {e}")
+    if tokens is None:
+        # No tokenizer loaded (CLI, service): ~4 characters per token
+        return [], (len(text) + 3) // 4, key
+    return list(tokens), len(tokens), key
+
+
+def render(docs: list[str]) -> str:
+    return "\n".join(f"[PERSONA] {d}" for d in docs)
+
+
+def build_pinned_block(persona_coll, version=()) -> PinnedBlock:
+    res = persona_coll.get(where={"priority": PINNED_PRIORITY}, include=["documents"])
+    # Sort by ID so the block (and the prompt prefix) is byte-stable across rebuilds
+    pairs = sorted(zip(res.get("ids") or [], res.get("documents") or []))
+    text = render([d for _, d in pairs if d])
+    tokens, n_tokens, key = _tokenize(text)
+    return PinnedBlock(
+        text=text,
+        ids=tuple(i for i, _ in pairs),
+        version=version,
+        tokens=tokens,
+        n_tokens=n_tokens,
+        tokenizer_key=key,
+    )
+
+
+_blocks = {}  # collection name -> (PinnedBlock, checked_at)
+_blocks_lock = threading.Lock()
+
+
+def get_pinned_block(persona_coll, refresh_seconds: float = 30.0) -> PinnedBlock:
+    name = getattr(persona_coll, "name", "persona")
+    now = time.monotonic()
+    with _blocks_lock:
+        cached, checked_at = _blocks.get(name, (None, 0.0))
+        stamp = _stamp()
+
+        if cached is not None and cached.version[:1] == (stamp,) and now - checked_at < refresh_seconds:
+            block = cached
+        else:
+            version = (stamp, persona_coll.count())
+            block = cached if cached is not None and cached.version == version else None
+            if block is None:
+                block = build_pinned_block(persona_coll, version)
+                print(f"[ltm] 📌 Pinned persona block rebuilt: {len(block.ids)} fragments, ~{block.n_tokens} tokens")
+            checked_at = now
+
+        # Model switched since the block was tokenized: re-tokenize, no Chroma read
+        key_fn = _tokenizer["key"]
+        if _tokenizer["fn"] is not None and key_fn is not None and key_fn() != block.tokenizer_key:
+            block.tokens, block.n_tokens, block.tokenizer_key = _tokenize(block.text)
+
+        _blocks[name] = (block, checked_at)
+        return block
@@ -0,0 +1,128 @@
+# orion_cli/utils/segmenter.py
+#
+# Rule-based sentence segmentation for the sentence-level episodic collection
+# (orion_episodic_sent_ltm). No model, no NLTK: a regex pass over candidate
+# boundaries with an abbreviation list, newlines as hard breaks, and a merge
+# step that glues short sentences together up to a target length.
+#
+# Every span keeps character offsets into its parent document, so a hit can be
+# traced back to (and expanded within) the full turn.
+
+import re
+
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "approx", "fig", "mt", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+    "sep", "sept", "oct", "nov", "dec",
+}
+
+# Terminal punctuation, optional closing quotes/brackets, then whitespace
+_BOUNDARY = re.compile(r"[.!?…]+[\"'”’)\]]*(?=\s)")
+_ROLE_PREFIX = re.compile(r"^\s*(USER|ASSISTANT|ORION|User|Assistant)\s*:\s*")
+_WORD_BEFORE = re.compile(r"([\w.]+)$")
+
+
+def _is_abbreviation(text: str, dot: int) -> bool:
+    """True if the '.' at `dot` ends an abbreviation or an initial."""
+    m = _WORD_BEFORE.search(text, 0, dot)
+    if not m:
+        return False
+    word = m.group(1).lower()
+    return word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+
+def split_sentences(text: str, start: int = 0, end: int = None) -> list[tuple[int, int]]:
+    """(start, end) offsets of the sentences in text[start:end], whitespace trimmed."""
+    end = len(text) if end is None else end
+    spans = []
+    cursor = start
+    for m in _BOUNDARY.finditer(text, start, end):
+        punct = m.group()
+        if punct[0] == "." and not punct.startswith("..") and _is_abbreviation(text, m.start()):
+            continue
+        spans.append((cursor, m.end()))
+        cursor = m.end()
+    spans.append((cursor, end))
+
+    trimmed = []
+    for s, e in spans:
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if e > s:
+            trimmed.append((s, e))
+    return trimmed
+
+
+def merge_short(spans: list[tuple[int, int]], target_chars: int, max_chars: int) -> list[tuple[int, int]]:
+    """Greedily join neighbouring spans until each reaches `target_chars` (never past `max_chars`)."""
+    merged = []
+    for s, e in spans:
+        if merged:
+            ps, pe = merged[-1]
+            if pe - ps < target_chars and e - ps <= max_chars:
+                merged[-1] = (ps, e)
+                continue
+        merged.append((s, e))
+    # A short tail is better attached to its predecessor than left on its own
+    if len(merged) > 1:
+        (ps, _), (ls, le) = merged[-2], merged[-1]
+        if le - ls < target_chars // 2 and le - ps <= max_chars:
+            merged[-2:] = [(ps, le)]
+    return merged
+
+
+def segment(text: str, *, target_chars: int = 160, max_chars: int = 400) -> list[dict]:
+    """
+    Split a document into sentence spans. Each line is segmented on its own and
+    a leading 'USER:' / 'ASSISTANT:' label is dropped from the span but kept
+    as `speaker`. Returns [{"text", "start", "end", "speaker"}].
+    """
+    out = []
+    pos = 0
+    for line in text.split("\n"):
+        line_start, line_end = pos, pos + len(line)
+        pos = line_end + 1
+        speaker = None
+        m = _ROLE_PREFIX.match(line)
+        if m:
+            speaker = m.group(1).lower()
+            speaker = "assistant" if speaker == "orion" else speaker
+            line_start += m.end()
+        elif out:
+            speaker = out[-1]["speaker"]  # continuation line of the same turn
+        spans = merge_short(split_sentences(text, line_start, line_end), target_chars, max_chars)
+        out.extend({"text": text[s:e], "start": s, "end": e, "speaker": speaker} for s, e in spans)
+    return out
+
+
+def segment_documents(
+    ids: list[str],
+    docs: list[str],
+    metas: list[dict],
+    *,
+    target_chars: int = 160,
+    max_chars: int = 400,
+) -> tuple[list[str], list[str], list[dict]]:
+    """
+    Expand parent documents into sentence records for the sentence collection.
+    Child IDs are '<parent>::s<n>'; metadata is inherited from the parent plus
+    parent_id, sent_index, char_start, char_end and speaker.
+    """
+    s_ids, s_docs, s_metas = [], [], []
+    for parent_id, doc, meta in zip(ids, docs, metas):
+        for n, span in enumerate(segment(doc or "", target_chars=target_chars, max_chars=max_chars)):
+            s_ids.append(f"{parent_id}::s{n}")
+            s_docs.append(span["text"])
+            child = {
+                **(meta or {}),
+                "parent_id": parent_id,
+                "sent_index": n,
+                "char_start": span["start"],
+                "char_end": span["end"],
+            }
+            if span["speaker"]:
+                child["speaker"] = span["speaker"]
+            s_metas.append(child)
+    return s_ids, s_docs, s_metas
@@ -0,0 +1,346 @@
+# orion_cli/utils/shard_utils.py
+#
+# Time-sharded episodic memory: one Chroma collection per period
+# (e.g. orion_episodic_ltm__2025-10). Writes land in the current shard,
+# queries fan out over the most recent shards and are merged by distance.
+# Memory written before sharding was enabled stays in the unsharded base
+# collection, which is read as the oldest (sealed) shard.
+
+import gzip
+import heapq
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+SHARD_SEP = "__"
+PERIOD_FORMATS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+    "week": "%G-w%V",
+    "day": "%Y-%m-%d",
+}
+PAGE_SIZE = 500
+
+
+def shard_period(ts=None, granularity: str = "month") -> str:
+    """Return the period label (e.g. '2025-10') for a timestamp or datetime."""
+    if granularity not in PERIOD_FORMATS:
+        raise ValueError(f"[ltm] Unknown shard granularity: {granularity}")
+    if ts is None:
+        dt = datetime.now()
+    elif isinstance(ts, datetime):
+        dt = ts
+    else:
+        dt = datetime.fromtimestamp(float(ts))
+    return dt.strftime(PERIOD_FORMATS[granularity])
+
+
+def shard_name(base: str, ts=None, granularity: str = "month") -> str:
+    return f"{base}{SHARD_SEP}{shard_period(ts, granularity)}"
+
+
+def _collection_names(client) -> list[str]:
+    # Chroma < 0.6 returns Collection objects, newer versions return names
+    return [c if isinstance(c, str) else c.name for c in client.list_collections()]
+
+
+def list_shards(client, base: str, include_base: bool = False) -> list[str]:
+    """All shard collections for `base`, oldest first; `include_base` puts the unsharded base first if it exists."""
+    pattern = re.compile(rf"^{re.escape(base)}{SHARD_SEP}[0-9][0-9w-]*$")
+    names = _collection_names(client)
+    shards = sorted(n for n in names if pattern.match(n))
+    return ([base] if include_base and base in names else []) + shards
+
+
+def _merge_query_results(per_shard: list[dict], n_results: int, include: list[str]) -> dict:
+    """k-way merge of single-query Chroma results by ascending distance."""
+    streams = []
+    for res in per_shard:
+        ids = (res.get("ids") or [[]])[0]
+        distances = (res.get("distances") or [[]])[0]
+        rows = []
+        for i, doc_id in enumerate(ids):
+            row = {"ids": doc_id, "distances": distances[i]}
+            for key in include:
+                if key != "distances" and res.get(key):
+                    row[key] = res[key][0][i]
+            rows.append(row)
+        streams.append(rows)
+
+    merged = list(heapq.merge(*streams, key=lambda r: r["distances"]))[:n_results]
+    keys = ["ids", "distances"] + [k for k in include if k != "distances"]
+    return {k: [[r.get(k) for r in merged]] for k in keys}
+
+
+class ShardedCollection:
+    """
+    Drop-in stand-in for a Chroma collection that spreads episodic memory over
+    time-based shards. Only the current shard is writable; older shards are
+    sealed and only change through compact/drop/archive.
+    """
+
+    def __init__(
+        self,
+        client,
+        base: str,
+        embed_fn,
+        *,
+        granularity: str = "month",
+        query_window: int = 3,
+        max_workers: int = 4,
+        metadata: dict = None,
+    ):
+        self._client = client
+        self.name = base
+        self._embed_fn = embed_fn
+        self._granularity = granularity
+        self._query_window = query_window
+        self._max_workers = max(1, int(max_workers))
+        self._metadata = metadata
+
+    # --- shard bookkeeping ---------------------------------------------
+    def _open(self, name: str):
+        # open_collection caches the handle; compact/drop invalidate it there
+        from orion_cli.utils.chroma_utils import hnsw_metadata, open_collection
+
+        metadata = self._metadata or (lambda: hnsw_metadata(name))  # only read on a cache miss
+        return open_collection(self._client, name, self._embed_fn, metadata)
+
+    def current_shard_name(self) -> str:
+        return shard_name(self.name, granularity=self._granularity)
+
+    def current_shard(self):
+        return self._open(self.current_shard_name())
+
+    def shards(self) -> list[str]:
+        return list_shards(self._client, self.name, include_base=True)
+
+    def shard_collections(self) -> list:
+        """Collection handle per shard, oldest first (the unsharded base leads)."""
+        return [self._open(n) for n in self.shards()]
+
+    def is_sealed(self, name: str) -> bool:
+        return name != self.current_shard_name()
+
+    def _query_targets(self, window=None) -> list[str]:
+        window = self._query_window if window is None else window
+        names = self.shards()
+        return names[-window:] if window and window > 0 else names
+
+    # --- writes (current shard only) -----------------------------------
+    def add(self, **kwargs):
+        return self.current_shard().add(**kwargs)
+
+    def upsert(self, **kwargs):
+        return self.current_shard().upsert(**kwargs)
+
+    def delete(self, **kwargs):
+        return self.current_shard().delete(**kwargs)
+
+    # --- reads (fan out) -----------------------------------------------
+    def count(self) -> int:
+        return sum(self._open(n).count() for n in self.shards())
+
+    def get(self, ids=None, include=None, limit=None, offset=None, **kwargs):
+        """
+        Newest shard first. `limit` / `offset` page over the shards as one
+        sequence: shards wholly before `offset` are skipped by their (filtered)
+        size, so a caller advancing `offset` by what it got sees every record once.
+        """
+        include = include or ["documents", "metadatas"]
+        out = {"ids": []}
+        out.update({k: [] for k in include})
+        skip = int(offset or 0)
+        for name in reversed(self.shards()):
+            remaining = None if limit is None else limit - len(out["ids"])
+            if remaining is not None and remaining <= 0:
+                break
+            coll = self._open(name)
+            if skip:
+                if ids is None and not kwargs:
+                    size = coll.count()
+                else:
+                    size = len(coll.get(ids=ids, include=[], **kwargs).get("ids") or [])
+                if skip >= size:
+                    skip -= size
+                    continue
+            res = coll.get(ids=ids, include=include, limit=remaining, offset=skip or None, **kwargs)
+            skip = 0
+            out["ids"].extend(res.get("ids") or [])
+            for k in include:
+                out[k].extend(res.get(k) or [])
+        return out
+
+    def query(
+        self,
+        query_texts=None,
+        query_embeddings=None,
+        n_results: int = 10,
+        include=None,
+        window=None,
+        **kwargs,
+    ) -> dict:
+        """
+        Query the most recent `window` shards in parallel (0 = all shards)
+        and merge the per-shard top-k by distance. The query is embedded once.
+        """
+        include = list(include or ["documents", "metadatas", "distances"])
+        if "distances" not in include:
+            include.append("distances")
+
+        if query_embeddings is None:
+            query_embeddings = self._embed_fn(list(query_texts))
+
+        targets = self._query_targets(window)
+        if not targets:
+            return {k: [[]] for k in ["ids"] + include}
+
+        merged = []
+        for q_emb in query_embeddings:
+
+            def _one(name, q_emb=q_emb):
+                coll = self._open(name)
+                k = min(n_results, coll.count())
+                if k <= 0:
+                    return {}
+                return coll.query(
+                    query_embeddings=[q_emb], n_results=k, include=include, **kwargs
+                )
+
+            with ThreadPoolExecutor(max_workers=min(self._max_workers, len(targets))) as pool:
+                per_shard = list(pool.map(_one, targets))
+            merged.append(_merge_query_results(per_shard, n_results, include))
+
+        return {k: [m[k][0] for m in merged] for k in merged[0]}
+
+
+# === Maintenance for sealed shards ===
+def _iter_records(coll, include=("documents", "metadatas", "embeddings")):
+    offset = 0
+    while True:
+        page = coll.get(include=list(include), limit=PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            return
+        yield page
+        offset += len(ids)
+
+
+def is_current_shard(name: str, granularity: str = None) -> bool:
+    """Whether `name` is the shard writes go to now (ltm.sharding.granularity by default)."""
+    base, sep, _ = name.rpartition(SHARD_SEP)
+    if not sep:
+        return False
+    if granularity is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        granularity = (load_ltm_config().get("sharding") or {}).get("granularity", "month")
+    return name == shard_name(base, granularity=granularity)
+
+
+def compact_shard(client, name: str):
+    """
+    Rebuild a sealed shard's HNSW index from its stored embeddings (no
+    re-embedding), dropping tombstones left by deletes and updates. The rebuilt
+    index uses the current ltm.hnsw settings for the shard. The copy replaces
+    the shard by delete + rename, so the writable shard is refused: writes
+    arriving between the two would be lost.
+    """
+    from orion_cli.utils.chroma_utils import delete_collection, forget_collection, hnsw_metadata
+
+    if is_current_shard(name):
+        raise ValueError(f"[ltm] Refusing to compact the current (writable) shard {name}")
+    src = client.get_collection(name=name)
+    tmp_name = f"{name}{SHARD_SEP}compact"
+    try:
+        delete_collection(client, tmp_name)
+    except Exception:
+        pass
+    tmp = client.create_collection(name=tmp_name, metadata={**(src.metadata or {}), **(hnsw_metadata(name) or {})})
+
+    copied = 0
+    for page in _iter_records(src):
+        tmp.add(
+            ids=page["ids"],
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+            embeddings=page["embeddings"],
+        )
+        copied += len(page["ids"])
+
+    delete_collection(client, name)
+    tmp.modify(name=name)
+    forget_collection(client, tmp_name)
+    print(f"[ltm] 🧹 Compacted shard {name} ({copied} records)")
+    return copied
+
+
+def drop_shard(client, name: str):
+    from orion_cli.utils.chroma_utils import delete_collection
+
+    delete_collection(client, name)
+    print(f"[ltm] 🗑️ Dropped shard {name}")
+
+
+def archive_shard(client, name: str, out_dir: Path, drop: bool = True) -> Path:
+    """Dump a shard (with embeddings) to gzipped JSONL, then optionally drop it."""
+    coll = client.get_collection(name=name)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{name}.jsonl.gz"
+
+    written = 0
+    with gzip.open(out_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"collection": name, "metadata": coll.metadata}) + "\n")
+        for page in _iter_records(coll):
+            for i, doc_id in enumerate(page["ids"]):
+                emb = page["embeddings"][i]
+                f.write(
+                    json.dumps(
+                        {
+                            "id": doc_id,
+                            "document": page["documents"][i],
+                            "metadata": page["metadatas"][i],
+                            "embedding": [float(x) for x in emb],
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+                written += 1
+
+    print(f"[ltm] 📦 Archived {written} records from {name} → {out_path}")
+    if drop:
+        drop_shard(client, name)
+    return out_path
+
+
+def restore_shard(client, archive_path: Path) -> str:
+    """Re-create a shard from an archive written by `archive_shard`."""
+    with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        coll = client.get_or_create_collection(
+            name=header["collection"], metadata=header.get("metadata")
+        )
+        batch = []
+        for line in f:
+            batch.append(json.loads(line))
+            if len(batch) >= PAGE_SIZE:
+                _add_records(coll, batch)
+                batch = []
+        if batch:
+            _add_records(coll, batch)
+
+    print(f"[ltm] ♻️ Restored shard {header['collection']} ({coll.count()} records)")
+    return header["collection"]
+
+
+def _add_records(coll, records: list[dict]):
+    coll.add(
+        ids=[r["id"] for r in records],
+        documents=[r["document"] for r in records],
+        metadatas=[r["metadata"] for r in records],
+        embeddings=[r["embedding"] for r in records],
+    )
@@ -0,0 +1,242 @@
+# orion_cli/utils/tone_classifier.py
+#
+# Tone / tag / mood estimation from embeddings that already exist.
+#
+# Prototypes come from the labeled persona fragments (catalog entries carry a
+# `tone`, emotion states carry `tone`, `tags`, `valence` and `arousal`): the
+# stored e5 vectors of every fragment with a label are averaged into one unit
+# vector per tone and per tag. Emotion fragments additionally serve as
+# (valence, arousal) anchors.
+#
+# Classifying a batch is then one matrix product of the memory vectors
+# against [tone prototypes | tag prototypes | anchors]; the vectors are the
+# ones about to be stored, so no extra model call is made. Valence/arousal
+# are a softmax-weighted average over the anchors.
+#
+# The prototypes are rebuilt (from collection reads only, no embedding) when
+# persona-ingest changes the persona, tracked like the pinned persona block.
+# Builds run on a background thread; until the first one finishes callers get
+# None and fall back to keyword tagging, afterwards the previous classifier.
+
+import threading
+import time
+
+DEFAULT_EXCLUDE_TAGS = ("emotion", "orion", "persona", "mock_dialog", "persona_reinforce", "tone_training")
+PAGE_SIZE = 1000
+
+
+def _labels(value) -> list[str]:
+    if value is None:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    return [p.strip().lower() for p in parts if str(p).strip()]
+
+
+class PrototypeClassifier:
+    def __init__(self, tone_labels, tag_labels, prototypes, anchors, anchor_affect, *, version=(), cfg: dict = None):
+        """
+        `prototypes`: (n_tones + n_tags, d) unit vectors, tones first.
+        `anchors`: (n_anchors, d) unit vectors with `anchor_affect` (n_anchors, 2) = valence, arousal.
+        """
+        import numpy as np
+
+        cfg = cfg or {}
+        self.tone_labels = list(tone_labels)
+        self.tag_labels = list(tag_labels)
+        self.version = version
+        self.matrix = np.vstack([prototypes, anchors]).astype(np.float32) if len(anchors) else prototypes
+        self.anchor_affect = np.asarray(anchor_affect, dtype=np.float32).reshape(-1, 2)
+        self.tone_margin = float(cfg.get("tone_margin", 0.01))
+        self.tag_z = float(cfg.get("tag_z", 2.0))
+        self.max_tags = int(cfg.get("max_tags", 3))
+        self.temperature = float(cfg.get("temperature", 0.02))
+        self.confidence = float(cfg.get("confidence", 0.3))
+
+    def __len__(self):
+        return len(self.tone_labels) + len(self.tag_labels)
+
+    @classmethod
+    def from_fragments(cls, embeddings, metadatas, *, version=(), cfg: dict = None):
+        import numpy as np
+
+        cfg = cfg or {}
+        exclude = set(_labels(cfg.get("exclude_tags", DEFAULT_EXCLUDE_TAGS)))
+        X = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        X = X / norms
+
+        tones, tags, anchors, affect = {}, {}, [], []
+        for i, meta in enumerate(metadatas):
+            meta = meta or {}
+            for t in _labels(meta.get("tone")):
+                tones.setdefault(t, []).append(i)
+            for t in _labels(meta.get("tags")):
+                if t not in exclude:
+                    tags.setdefault(t, []).append(i)
+            try:
+                affect.append((float(meta["valence"]), float(meta["arousal"])))
+                anchors.append(i)
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        def _protos(groups):
+            labels = sorted(groups)
+            if not labels:
+                return labels, np.empty((0, X.shape[1]), dtype=np.float32)
+            P = np.stack([X[groups[label]].mean(axis=0) for label in labels])
+            return labels, P / np.linalg.norm(P, axis=1, keepdims=True)
+
+        tone_labels, tone_P = _protos(tones)
+        tag_labels, tag_P = _protos(tags)
+        return cls(
+            tone_labels, tag_labels, np.vstack([tone_P, tag_P]), X[anchors], affect, version=version, cfg=cfg
+        )
+
+    @classmethod
+    def from_collection(cls, persona_coll, *, version=(), cfg: dict = None):
+        embeddings, metas, offset = [], [], 0
+        while True:
+            page = persona_coll.get(include=["embeddings", "metadatas"], limit=PAGE_SIZE, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            embeddings.extend(page["embeddings"])
+            metas.extend(page.get("metadatas") or [{}] * len(ids))
+            offset += len(ids)
+        return cls.from_fragments(embeddings, metas, version=version, cfg=cfg)
+
+    def classify(self, vectors) -> list[dict]:
+        """
+        One metadata dict per vector: tone, tags (comma-joined), tone_score,
+        and valence / arousal / confidence when there are emotion anchors.
+        """
+        import numpy as np
+
+        V = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(V, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        S = (V / norms) @ self.matrix.T  # the one matrix product
+
+        n_tone, n_tag = len(self.tone_labels), len(self.tag_labels)
+        tone_S, tag_S, anchor_S = S[:, :n_tone], S[:, n_tone : n_tone + n_tag], S[:, n_tone + n_tag :]
+
+        out = []
+        for r in range(len(V)):
+            meta = {"tone": "neutral", "tags": ""}
+            if n_tone:
+                best = int(tone_S[r].argmax())
+                margin = float(tone_S[r, best] - tone_S[r].mean())
+                if n_tone == 1 or margin >= self.tone_margin:
+                    meta["tone"] = self.tone_labels[best]
+                meta["tone_score"] = round(float(tone_S[r, best]), 4)
+            if n_tag > 1:
+                # Standard score within the row: only tags that stand out from the rest
+                # qualify, so a memory close to none of them gets no tags at all
+                z = (tag_S[r] - tag_S[r].mean()) / max(float(tag_S[r].std()), 1e-6)
+                picked = [i for i in np.argsort(-z)[: self.max_tags] if z[i] >= self.tag_z]
+                meta["tags"] = ",".join(self.tag_labels[i] for i in picked)
+            if anchor_S.shape[1]:
+                w = np.exp((anchor_S[r] - anchor_S[r].max()) / self.temperature)
+                va = (w / w.sum()) @ self.anchor_affect
+                meta.update(
+                    valence=round(float(va[0]), 3),
+                    arousal=round(float(va[1]), 3),
+                    confidence=self.confidence,  # inferred, not annotated (schema_doc.md)
+                )
+            out.append(meta)
+        return out
+
+
+_classifiers = {}  # persona collection name -> (PrototypeClassifier | None, checked_at, version)
+_classifiers_lock = threading.Lock()
+_building = set()
+
+
+def _open_persona():
+    from orion_cli.orion_ltm_integration import COLL_PERSONA
+    from orion_cli.utils.chroma_utils import get_client
+
+    # Only stored embeddings and metadata are read: no embedding function needed
+    return get_client().get_collection(COLL_PERSONA)
+
+
+def _build_in_background(persona_coll, name: str, stamp: int, cfg: dict):
+    """Re-check the persona count and rebuild the prototypes off the hook path if it changed."""
+    if name in _building:
+        return
+    _building.add(name)
+
+    def run():
+        with _classifiers_lock:
+            cached, _, current = _classifiers.get(name, (None, 0.0, None))
+        try:
+            coll = persona_coll if persona_coll is not None else _open_persona()
+            version = (stamp, coll.count())
+            if current != version:
+                cached = PrototypeClassifier.from_collection(coll, version=version, cfg=cfg)
+                print(
+                    f"[ltm] 🎨 Tone prototypes built: {len(cached.tone_labels)} tones, "
+                    f"{len(cached.tag_labels)} tags, {len(cached.anchor_affect)} mood anchors"
+                )
+                if not len(cached):
+                    cached = None
+        except Exception as e:
+            print(f"[ltm] ⚠️ Tone prototype build failed: {e}")
+            version = (stamp, None)  # retried after refresh_seconds
+        with _classifiers_lock:
+            _classifiers[name] = (cached, time.monotonic(), version)
+            _building.discard(name)
+
+    threading.Thread(target=run, name=f"orion-tone-{name}", daemon=True).start()
+
+
+def get_tone_classifier(persona_coll=None, cfg: dict = None) -> PrototypeClassifier | None:
+    """
+    Cached classifier for the persona collection, or None when disabled, not
+    built yet, or no fragment carries a label. At most every refresh_seconds
+    (or as soon as persona-ingest touched the persona) a background rebuild
+    is started; the current classifier keeps serving meanwhile.
+    """
+    if cfg is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("tone_classifier") or {}
+    if not cfg.get("enabled", True):
+        return None
+
+    from orion_cli.utils.pinned_persona import _stamp
+
+    now = time.monotonic()
+    name = getattr(persona_coll, "name", None) or "persona"
+    stamp = _stamp()
+    with _classifiers_lock:
+        cached, checked_at, version = _classifiers.get(name, (None, 0.0, None))
+        fresh = now - checked_at < float(cfg.get("refresh_seconds", 60))
+        if version is None or not fresh or version[0] != stamp:
+            _build_in_background(persona_coll, name, stamp, cfg)
+        return cached
+
+
+def tag_documents(coll, docs: list[str], persona_coll=None):
+    """
+    Embed `docs` once with `coll`'s own embedding function and classify those
+    vectors. Returns (embeddings, metadatas): pass the embeddings to
+    coll.add(...) so Chroma does not embed the same text again. Without an
+    embedder or classifier: (None, [{}, ...]).
+    """
+    from orion_cli.utils.chroma_utils import embedding_function
+
+    empty = [{} for _ in docs]
+    embed_fn = embedding_function(coll)
+    if embed_fn is None:
+        return None, empty
+    try:
+        classifier = get_tone_classifier(persona_coll)
+    except Exception as e:
+        print(f"[ltm] ⚠️ Tone classifier unavailable: {e}")
+        classifier = None
+    if classifier is None:
+        return None, empty
+    vectors = [list(map(float, v)) for v in embed_fn(list(docs))]
+    return vectors, classifier.classify(vectors)
@@ -0,0 +1,86 @@
+# orion_cli/utils/warmup.py
+#
+# Background warm-up for the embedder and the Chroma HNSW indexes, plus a
+# readiness flag so health checks can keep traffic away from a cold instance.
+
+import threading
+import time
+
+# Short, medium and long inputs so tokenizer paths and kernel shapes are exercised
+WARMUP_TEXTS = [
+    "Hello Orion.",
+    "Do you remember what we talked about last week?",
+    "I've been thinking about memory, identity and whether something shaped by "
+    "conversation can still be said to choose who it becomes. What do you make of that?",
+    " ".join(["Orion listens, reflects and remembers."] * 24),
+]
+
+WARMUP_ATTEMPTS = 4
+WARMUP_RETRY_SECONDS = 2.0
+
+_ready = threading.Event()
+_status = {"state": "cold", "error": None, "seconds": None}
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait_ready(timeout: float = None) -> bool:
+    return _ready.wait(timeout)
+
+
+def readiness() -> dict:
+    return {"ready": _ready.is_set(), **_status}
+
+
+def _warm(embed_fn, collections: dict):
+    if embed_fn is not None:
+        embed_fn(WARMUP_TEXTS)
+        embed_fn(WARMUP_TEXTS[:1])
+
+    for name, coll in (collections or {}).items():
+        if coll is None:
+            continue
+        n = coll.count()
+        if n:
+            coll.query(query_texts=[WARMUP_TEXTS[1]], n_results=1, include=["distances"])
+        print(f"[ltm] 🔥 Warmed '{name}' index ({n} items)")
+
+
+def warm_up(embed_fn, collections: dict, attempts: int = WARMUP_ATTEMPTS):
+    """
+    Encode representative inputs and run one query per collection to load HNSW
+    into memory. A failure is retried with backoff; after the last attempt the
+    instance is marked ready anyway (state "cold") so one transient error does
+    not keep it out of rotation for the life of the process.
+    """
+    _status.update(state="warming", error=None)
+    start = time.perf_counter()
+    delay = WARMUP_RETRY_SECONDS
+    for attempt in range(1, attempts + 1):
+        try:
+            _warm(embed_fn, collections)
+        except Exception as e:
+            _status.update(error=str(e))
+            if attempt < attempts:
+                print(f"[ltm] ⚠️ Warm-up failed ({e}); retrying in {delay:.0f}s")
+                time.sleep(delay)
+                delay *= 2
+                continue
+            _status.update(state="cold", seconds=round(time.perf_counter() - start, 2))
+            _ready.set()
+            print(f"[ltm] ⚠️ Warm-up failed after {attempts} attempts: {e}; serving cold")
+            return
+        _status.update(state="ready", error=None, seconds=round(time.perf_counter() - start, 2))
+        _ready.set()
+        print(f"[ltm] ✅ Warm-up complete in {_status['seconds']}s")
+        return
+
+
+def start_warmup(embed_fn, collections: dict) -> threading.Thread:
+    thread = threading.Thread(
+        target=warm_up, args=(embed_fn, collections), name="orion-ltm-warmup", daemon=True
+    )
+    thread.start()
+    return thread
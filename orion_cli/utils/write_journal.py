@@ -0,0 +1,474 @@
+# orion_cli/utils/write_journal.py
+#
+# Write-ahead journal for memory writes.
+#
+# Chat hooks do not call Chroma themselves: they append one JSON line per
+# operation (add / upsert / delete with ids, documents, metadata and optional
+# embeddings) to an append-only file and return. A background applier reads
+# the lines past the checkpoint, groups consecutive operations on the same
+# collection into one Chroma call, and advances the checkpoint (a byte offset,
+# replaced atomically) after each group. Records marked `tag` are embedded and
+# tone-tagged there, in one pass per group, instead of in the hook.
+#
+# fsync is batched: appends only write() to the file, and the applier fsyncs
+# whatever was appended since its last pass (every fsync_interval_ms) before
+# applying it. `fsync: always` syncs on every append, `off` leaves it to the OS.
+#
+# Whatever is past the checkpoint when the process starts (it died mid-write,
+# or the store was locked) is replayed first. Re-applying a group whose
+# checkpoint was not written yet is harmless: Chroma skips existing IDs on add,
+# and upsert/delete are idempotent. A transient failure (store locked, I/O) is
+# retried with backoff for as long as it lasts and the checkpoint stays put.
+# Only a record that can never apply (bad metadata, wrong embedding dimension)
+# is moved to <journal>.rejected.jsonl, found by retrying the group one record
+# at a time. Once everything is applied and the file exceeds compact_bytes it
+# is truncated.
+#
+# After each applied write the derived indexes are updated: the emotion index
+# of the collection (utils/emotion_index.py), the dedup index for episodic
+# memory (utils/dedup_index.py) and, with sentences.enabled, the
+# sentence-span collection (orion_episodic_sent_ltm) for episodic memory, so
+# live turns, pooled blocks and spilled history are retrievable as spans.
+#
+# Stored next to the Chroma store, one file per role: the web UI uses
+# orion_write_journal.jsonl, ltm-serve orion_write_journal.service.jsonl. A
+# process holds an exclusive lock on its journal while it applies it; a second
+# process of the same role writes directly instead of sharing the file.
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from orion_cli.utils.metrics import timed
+
+OPS = ("add", "upsert", "delete")
+DEFAULT_ROLE = "webui"
+
+
+class JournalLockedError(RuntimeError):
+    """Another process is applying this journal."""
+
+
+def default_journal_path(role: str = DEFAULT_ROLE) -> Path:
+    from orion_cli.utils.chroma_utils import chroma_path
+
+    name = "orion_write_journal.jsonl" if role == DEFAULT_ROLE else f"orion_write_journal.{role}.jsonl"
+    return Path(chroma_path()) / name
+
+
+def _lock_exclusive(path: Path):
+    """Open `path` and take a non-blocking exclusive lock on it (released when the file closes)."""
+    f = open(path, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise JournalLockedError(f"{path} is held by another process")
+    return f
+
+
+def is_permanent(error: Exception) -> bool:
+    """Errors a retry cannot fix (malformed record, bad metadata, dimension mismatch)."""
+    if "locked" in str(error).lower():
+        return False
+    return isinstance(error, (ValueError, TypeError, KeyError)) or type(error).__name__.startswith("Invalid")
+
+
+def _tag_inline(coll, documents: list[str], metadatas: list[dict]):
+    """(embeddings or None, metadatas with tone/tags/mood merged in)."""
+    try:
+        from orion_cli.utils.tone_classifier import tag_documents
+
+        with timed("embed_and_tag"):
+            embeddings, affect = tag_documents(coll, documents)
+    except Exception as e:
+        print(f"[ltm] ⚠️ Tone tagging skipped: {e}")
+        return None, metadatas
+    return embeddings, [{**(m or {}), **a} for m, a in zip(metadatas, affect)]
+
+
+def _sentence_collection(coll, registered: dict = None):
+    """The span collection mirroring `coll`, or None when `coll` is not episodic memory or sentences are off."""
+    from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENT, COLL_EPISODIC_SENTENCES
+    from orion_cli.utils.ltm_utils import load_ltm_config
+
+    if getattr(coll, "name", None) != COLL_EPISODIC_SENT:
+        return None
+    if not (load_ltm_config().get("sentences") or {}).get("enabled"):
+        return None
+    if registered and registered.get(COLL_EPISODIC_SENTENCES) is not None:
+        return registered[COLL_EPISODIC_SENTENCES]
+    from orion_cli.utils.chroma_utils import _get_or_create, embedding_function, get_client
+
+    return _get_or_create(get_client(), COLL_EPISODIC_SENTENCES, embed_fn=embedding_function(coll))
+
+
+def after_write(coll, op: str, ids, documents=None, metadatas=None, registered: dict = None):
+    """Keep the indexes derived from a collection in step with a write that was just applied."""
+    from orion_cli.orion_ltm_integration import COLL_EPISODIC_SENT
+    from orion_cli.utils.dedup_index import get_dedup_index
+    from orion_cli.utils.emotion_index import note_write
+
+    note_write(coll, op, ids, metadatas)
+    if op != "delete" and documents and getattr(coll, "name", None) == COLL_EPISODIC_SENT:
+        dedup = get_dedup_index()
+        if dedup is not None:
+            dedup.add_many(documents)
+    mirror_sentence_spans(coll, op, ids, documents, metadatas, registered)
+
+
+def mirror_sentence_spans(coll, op: str, ids, documents=None, metadatas=None, registered: dict = None):
+    """Segment an applied episodic add/upsert into sentence spans (or drop the spans of deleted turns)."""
+    sentence_coll = _sentence_collection(coll, registered)
+    if sentence_coll is None:
+        return
+    if op == "delete":
+        sentence_coll.delete(where={"parent_id": {"$in": list(ids)}})
+        return
+    from orion_cli.scripts.ltm_ingest import ingest_sentences
+
+    with timed("sentence_spans"):
+        ingest_sentences(sentence_coll, list(ids), list(documents), list(metadatas or [{}] * len(ids)))
+
+
+class WriteJournal:
+    def __init__(
+        self,
+        path: Path = None,
+        *,
+        fsync: str = "batch",
+        fsync_interval_ms: float = 50.0,
+        apply_batch: int = 64,
+        retry_seconds: float = 2.0,
+        max_retry_seconds: float = 60.0,
+        compact_bytes: int = 1 << 20,
+        collections=(),
+    ):
+        self.path = Path(path or default_journal_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lockfile = _lock_exclusive(self.path.with_name(self.path.name + ".lock"))
+        self.checkpoint_path = self.path.with_name(self.path.name + ".ckpt")
+        self.rejected_path = self.path.with_name(self.path.stem + ".rejected.jsonl")
+        self.fsync = fsync
+        self.interval = max(0.001, float(fsync_interval_ms) / 1000.0)
+        self.apply_batch = max(1, int(apply_batch))
+        self.retry_seconds = float(retry_seconds)
+        self.max_retry_seconds = max(self.retry_seconds, float(max_retry_seconds))
+        self.compact_bytes = int(compact_bytes)
+
+        self._collections = {}  # name -> handle the writer used (keeps its embedder / shards)
+        self.register(*collections)
+        self._lock = threading.Lock()  # append side: file handle, _written, _dirty
+        self._wake = threading.Event()
+        self._f = open(self.path, "ab")
+        self._written = self._f.tell()
+        self._dirty = False
+        self._applied = min(self._read_checkpoint(), self._written)
+        self._skip_partial_tail()
+
+        backlog = self._written - self._applied
+        if backlog:
+            print(f"[ltm] 📓 Replaying {backlog} bytes of journaled memory writes from {self.path}")
+            self._wake.set()
+        self._worker = threading.Thread(target=self._run, name="orion-write-journal", daemon=True)
+        self._worker.start()
+
+    # --- checkpoint ---
+    def _read_checkpoint(self) -> int:
+        try:
+            return int(self.checkpoint_path.read_text(encoding="utf-8").strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_checkpoint(self, offset: int):
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp.write_text(str(offset), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+        self._applied = offset
+
+    def _skip_partial_tail(self):
+        """A line cut off by a crash can never complete: new appends must start on a fresh line."""
+        if not self._written:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._written - 1)
+            if f.read(1) != b"\n":
+                self._f.write(b"\n")
+                self._f.flush()
+                self._written = self._f.tell()
+
+    # --- hook side ---
+    def register(self, *collections):
+        for coll in collections:
+            if coll is not None and getattr(coll, "name", None):
+                self._collections[coll.name] = coll
+
+    def append(self, coll, op: str, *, ids, documents=None, metadatas=None, embeddings=None, tag=False) -> int:
+        """Journal one operation on `coll`; returns the byte offset it ends at."""
+        if op not in OPS:
+            raise ValueError(f"unsupported journal op '{op}' (expected one of {OPS})")
+        self.register(coll)
+        record = {"ts": time.time(), "op": op, "collection": coll.name, "ids": list(ids)}
+        if documents is not None:
+            record["documents"] = list(documents)
+        if metadatas is not None:
+            record["metadatas"] = list(metadatas)
+        if embeddings is not None:
+            record["embeddings"] = [list(map(float, v)) for v in embeddings]
+        if tag:
+            record["tag"] = True
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            if self.fsync == "always":
+                os.fsync(self._f.fileno())
+            else:
+                self._dirty = self.fsync == "batch"
+            self._written += len(line)
+            end = self._written
+        self._wake.set()
+        return end
+
+    def pending(self) -> int:
+        """Bytes journaled but not yet applied."""
+        return self._written - self._applied
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything journaled so far has been applied (True) or `timeout` passed."""
+        target = self._written
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._applied < target and self._written >= target:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.01)
+        return True
+
+    def sync(self):
+        with self._lock:
+            if self._dirty:
+                os.fsync(self._f.fileno())
+                self._dirty = False
+
+    # --- applier side ---
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)  # appends arriving meanwhile share this fsync
+            self._wake.clear()
+            try:
+                self.sync()
+                while self._apply_some():
+                    pass
+                self._maybe_compact()
+            except Exception as e:
+                print(f"[ltm] ⚠️ Journal applier error (retrying in {self.retry_seconds}s): {e}")
+                time.sleep(self.retry_seconds)
+
+    def _read_records(self) -> list[tuple[int, dict]]:
+        """Up to apply_batch complete lines past the checkpoint, as (end offset, record)."""
+        out = []
+        offset = self._applied
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n") or offset + len(raw) > self._written:
+                    break  # still being written
+                offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    out.append((offset, json.loads(raw)))
+                except ValueError:
+                    print(f"[ltm] ⚠️ Skipping unreadable journal line ending at byte {offset}")
+                    out.append((offset, None))
+                if len(out) >= self.apply_batch:
+                    break
+        return out
+
+    @staticmethod
+    def _group(records: list[tuple[int, dict]]) -> list[tuple[int, list[dict]]]:
+        """Consecutive records with the same collection/op/shape -> (end offset, [records])."""
+        groups = []
+        for end, rec in records:
+            key = rec and (rec["collection"], rec["op"], "embeddings" in rec, bool(rec.get("tag")))
+            if groups and key and groups[-1][2] == key:
+                groups[-1][0] = end
+                groups[-1][1].append(rec)
+            else:
+                groups.append([end, [rec] if rec else [], key])
+        return [(end, recs) for end, recs, _ in groups]
+
+    def _apply_some(self) -> bool:
+        records = self._read_records()
+        if not records:
+            return False
+        for end, recs in self._group(records):
+            if recs:
+                self._apply_group(recs)
+            self._write_checkpoint(end)
+        return True
+
+    def _apply_group(self, recs: list[dict]):
+        """Apply `recs`, waiting out transient failures; returns once each record is applied or rejected."""
+        delay = self.retry_seconds
+        while True:
+            try:
+                with timed("journal_apply"):
+                    self._apply_records(recs)
+                return
+            except Exception as e:
+                if is_permanent(e):
+                    error = e
+                    break
+                print(f"[ltm] ⚠️ Journaled write failed ({e}); retrying in {delay:g}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_seconds)
+        if len(recs) == 1:
+            self._reject(recs, error)
+            return
+        for rec in recs:  # find the record(s) that cannot apply; the rest still go in
+            self._apply_group([rec])
+
+    def _apply_records(self, recs: list[dict]):
+        first = recs[0]
+        coll = self._resolve(first["collection"])
+        op = first["op"]
+        ids = [i for r in recs for i in r["ids"]]
+        if op == "delete":
+            coll.delete(ids=ids)
+            after_write(coll, op, ids, registered=self._collections)
+            return
+
+        documents = [d for r in recs for d in r.get("documents") or []]
+        metadatas = [m for r in recs for m in r.get("metadatas") or [{}] * len(r["ids"])]
+        embeddings = [e for r in recs for e in r["embeddings"]] if "embeddings" in first else None
+        if first.get("tag") and embeddings is None:
+            embeddings, metadatas = _tag_inline(coll, documents, metadatas)
+        kwargs = {"ids": ids, "documents": documents, "metadatas": metadatas}
+        if embeddings is not None:
+            kwargs["embeddings"] = embeddings
+        getattr(coll, op)(**kwargs)
+        after_write(coll, op, ids, documents, metadatas, registered=self._collections)
+
+    def _reject(self, recs: list[dict], error: Exception):
+        with open(self.rejected_path, "a", encoding="utf-8") as f:
+            for rec in recs:
+                f.write(json.dumps({**rec, "error": str(error)}, ensure_ascii=False) + "\n")
+        print(f"[ltm] ❌ {len(recs)} journaled write(s) rejected ({error}) -> {self.rejected_path}")
+
+    def _resolve(self, name: str):
+        coll = self._collections.get(name)
+        if coll is not None:
+            return coll
+        # Replay before any hook ran: open the LTM collections the way setup does
+        from orion_cli.orion_ltm_integration import initialize_chromadb_for_ltm
+
+        client, collections = initialize_chromadb_for_ltm()
+        self.register(*collections.values())
+        if name not in self._collections:
+            from orion_cli.utils.chroma_utils import _get_or_create
+
+            self.register(_get_or_create(client, name))
+        return self._collections[name]
+
+    def _maybe_compact(self):
+        if self._written < self.compact_bytes:
+            return
+        with self._lock:
+            if self._applied != self._written:
+                return
+            if self._dirty:
+                os.fsync(self._f.fileno())
+                self._dirty = False
+            self._f.truncate(0)
+            self._f.seek(0)
+            self._written = 0
+            self._write_checkpoint(0)
+
+    def close(self):
+        """fsync what was appended; unapplied records are replayed on the next start."""
+        try:
+            self.sync()
+        except (OSError, ValueError):
+            pass
+        self._lockfile.close()
+
+
+_journal = None  # False once config said disabled
+_journal_lock = threading.Lock()
+
+
+def get_write_journal(collections=(), role: str = DEFAULT_ROLE) -> WriteJournal | None:
+    """
+    Process-wide journal, or None when ltm.journal.enabled is false or another
+    process holds the journal for `role` (the first call decides the role).
+    """
+    global _journal
+    if _journal is None:
+        from orion_cli.utils.ltm_utils import load_ltm_config
+
+        cfg = load_ltm_config().get("journal") or {}
+        with _journal_lock:
+            if _journal is None:
+                path = Path(cfg["path"]) if cfg.get("path") else default_journal_path(role)
+                if cfg.get("path") and role != DEFAULT_ROLE:
+                    path = path.with_name(f"{path.stem}.{role}{path.suffix}")
+                try:
+                    _journal = cfg.get("enabled", True) and WriteJournal(
+                        path,
+                        fsync=str(cfg.get("fsync", "batch")),
+                        fsync_interval_ms=float(cfg.get("fsync_interval_ms", 50)),
+                        apply_batch=int(cfg.get("apply_batch", 64)),
+                        retry_seconds=float(cfg.get("retry_seconds", 2.0)),
+                        max_retry_seconds=float(cfg.get("max_retry_seconds", 60.0)),
+                        compact_bytes=int(cfg.get("compact_bytes", 1 << 20)),
+                        collections=collections,
+                    )
+                except JournalLockedError as e:
+                    print(f"[ltm] ⚠️ Write journal unavailable ({e}); writing to Chroma directly")
+                    _journal = False
+                if _journal:
+                    atexit.register(_journal.close)
+    return _journal if _journal is not False else None
+
+
+def start_write_journal(collections: dict = None, role: str = DEFAULT_ROLE) -> WriteJournal | None:
+    """Open the journal at startup (replaying what is pending) with the live collection handles."""
+    handles = list((collections or {}).values())
+    journal = get_write_journal(handles, role)
+    if journal is not None:
+        journal.register(*handles)
+    return journal
+
+
+def write_memory(coll, op: str = "add", *, tag: bool = False, **kwargs):
+    """
+    Journal a memory write (or apply it directly when the journal is disabled).
+    With `tag`, documents are embedded and tone-tagged before the write.
+    """
+    journal = get_write_journal()
+    if journal is not None:
+        return journal.append(coll, op, tag=tag, **kwargs)
+    if tag and kwargs.get("embeddings") is None and op != "delete":
+        metadatas = kwargs.get("metadatas") or [{}] * len(kwargs["ids"])
+        embeddings, kwargs["metadatas"] = _tag_inline(coll, kwargs["documents"], metadatas)
+        if embeddings is not None:
+            kwargs["embeddings"] = embeddings
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    result = getattr(coll, op)(**kwargs)
+    after_write(coll, op, kwargs["ids"], kwargs.get("documents"), kwargs.get("metadatas"))
+    return result